@@ -0,0 +1,86 @@
+import collections
+
+from modularodm import Q
+from rest_framework.mixins import ListModelMixin
+from rest_framework.request import Request
+
+from framework.auth import User
+from website.project.model import Node
+
+from .requests import EmbeddedRequest
+
+# Models loaded in bulk ahead of embedding, keyed by the view kwarg used to
+# look them up. Loading fills the per-request object cache used by
+# `get_object_or_error`.
+PREFETCH_MODELS = {
+    'node_id': Node,
+    'user_id': User,
+}
+
+
+def get_embed_resolver(request):
+    """Return the `EmbedResolver` shared by ``request`` and every embedded
+    request made on its behalf.
+    """
+    while isinstance(request, Request):
+        request = request._request
+    resolver = getattr(request, '_embed_resolver', None)
+    if resolver is None:
+        resolver = EmbedResolver()
+        request._embed_resolver = resolver
+    return resolver
+
+
+class EmbedResolver(object):
+    """Resolve embedded fields for a whole request. Identical embeds, i.e. the
+    same view called with the same kwargs, are only dispatched once, and the
+    objects looked up by the embeds of a page of results are loaded with one
+    query per model before any of them are dispatched.
+    """
+
+    def __init__(self):
+        self._results = {}
+        self.calls = 0
+        self.hits = 0
+
+    def resolve(self, request, field, item):
+        view, view_args, view_kwargs = field.resolve(item)
+        if issubclass(view.cls, ListModelMixin) and field.always_embed:
+            raise Exception("Cannot auto-embed a list view.")
+        key = (view, tuple(view_args), tuple(sorted(view_kwargs.items())))
+        if key in self._results:
+            self.hits += 1
+            return self._results[key]
+        view_kwargs.update({
+            'request': EmbeddedRequest(request),
+            'is_embedded': True
+        })
+        self.calls += 1
+        response = view(*view_args, **view_kwargs)
+        self._results[key] = response.data
+        return response.data
+
+    def prefetch(self, fields, items):
+        """Load the objects that embedding ``fields`` of each of ``items`` will
+        look up.
+        """
+        keys = collections.defaultdict(set)
+        for field in fields:
+            for item in items:
+                try:
+                    match = field.resolve(item)
+                except Exception:
+                    # Prefetching is best-effort; errors are raised when the
+                    # embed itself is resolved
+                    continue
+                for kwarg, value in match.kwargs.items():
+                    if kwarg in PREFETCH_MODELS:
+                        keys[kwarg].add(value)
+        for kwarg, values in keys.items():
+            list(PREFETCH_MODELS[kwarg].find(Q('_id', 'in', list(values))))
+
+    def get_stats(self):
+        return {
+            'embed_calls': self.calls,
+            'embed_cache_hits': self.hits,
+        }
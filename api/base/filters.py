@@ -269,6 +269,13 @@ class ODMFilterMixin(FilterMixin):
         else:
             query = default_query
 
+        # Let cursor pagination skip to its position in the database
+        paginator = getattr(self, 'paginator', None)
+        if hasattr(paginator, 'get_cursor_query'):
+            cursor_query = paginator.get_cursor_query(self.request, self)
+            if cursor_query:
+                query = query & cursor_query
+
         return query
 
     def query_params_to_odm_query(self, query_params):
@@ -324,37 +331,94 @@ class ListFilterMixin(FilterMixin):
             return default_queryset
 
     def param_queryset(self, query_params, default_queryset):
-        """filters default queryset based on query parameters"""
-        filters = self.parse_query_params(query_params)
-        queryset = set(default_queryset)
-        if filters:
-            for field_name, params in filters.iteritems():
-                for group in params:
-                    queryset = queryset.intersection(set(self.get_filtered_queryset(field_name, group, default_queryset)))
-        return list(queryset)
+        """filters default queryset based on query parameters
 
-    def get_filtered_queryset(self, field_name, params, default_queryset):
-        """filters default queryset based on the serializer field type"""
-        field = self.serializer_class._declared_fields[field_name]
+        All filter groups are compiled into one predicate that is evaluated in
+        a single pass, so the original ordering is preserved. When the default
+        queryset is an ODM queryset, filters on stored fields are pushed down
+        into a query against its model first.
+        """
+        filters = self.parse_query_params(query_params)
+        if not filters:
+            return list(default_queryset)
+        if isinstance(default_queryset, modularodm_queryset.BaseQuerySet):
+            default_queryset, filters = self.push_down_filters(filters, default_queryset)
+        predicate = self.compile_filters(filters)
+        return [item for item in default_queryset if predicate(item)]
+
+    def compile_filters(self, filters):
+        """Build a predicate matching the items that satisfy every filter group"""
+        predicates = [
+            self.get_filter_predicate(field_name, group)
+            for field_name, groups in filters.iteritems()
+            for group in groups
+        ]
+        return lambda item: all(predicate(item) for predicate in predicates)
+
+    def get_filter_predicate(self, field_name, params):
+        """Build a predicate for one filter group based on the serializer field type"""
+        field = self.get_filter_field(field_name)
         field_name = self.convert_key(field_name, field)
+        value = params['value']
 
         if isinstance(field, ser.SerializerMethodField):
-            return_val = [
-                item for item in default_queryset
-                if self.FILTERS[params['op']](self.get_serializer_method(field_name)(item), params['value'])
-            ]
+            compare = self.FILTERS[params['op']]
+            # Instantiate the serializer once rather than once per item
+            get_value = self.get_serializer_method(field_name)
+            return lambda item: compare(get_value(item), value)
         elif isinstance(field, ser.CharField):
-            return_val = [
-                item for item in default_queryset
-                if params['value'] in getattr(item, field_name, {}).lower()
-            ]
+            value = value.lower()
+            return lambda item: value in getattr(item, field_name, {}).lower()
         else:
-            return_val = [
-                item for item in default_queryset
-                if self.FILTERS[params['op']](getattr(item, field_name, None), params['value'])
-            ]
+            compare = self.FILTERS[params['op']]
+            return lambda item: compare(getattr(item, field_name, None), value)
 
-        return return_val
+    def get_filter_field(self, field_name):
+        """Return the serializer field for a key of ``parse_query_params``,
+        which may be either the field name or its source
+        """
+        fields = self.serializer_class._declared_fields
+        if field_name in fields:
+            return fields[field_name]
+        for field in fields.values():
+            if field.source == field_name:
+                return field
+        raise KeyError(field_name)
+
+    def push_down_filters(self, filters, queryset):
+        """Evaluate the filters on stored fields of the model of ``queryset``
+        as a single ODM query.
+
+        :return tuple: the matching items, in the order of ``queryset``, and
+            the filters left to evaluate in Python
+        """
+        schema = queryset.schema
+        query_parts = []
+        remaining = {}
+        for field_name, groups in filters.iteritems():
+            field = self.get_filter_field(field_name)
+            source = self.convert_key(field_name, field)
+            if isinstance(field, ser.SerializerMethodField) or source not in schema._fields:
+                remaining[field_name] = groups
+                continue
+            for group in groups:
+                # Character fields are always matched by case-insensitive containment
+                op = 'icontains' if isinstance(field, ser.CharField) else group['op']
+                query_parts.append(Q(source, op, group['value']))
+
+        if not query_parts:
+            return queryset, filters
+
+        keys = queryset.get_keys()
+        position = {key: index for index, key in enumerate(keys)}
+        query = functools.reduce(operator.and_, query_parts, Q(schema._primary_name, 'in', keys))
+        items = sorted(schema.find(query), key=lambda item: position[item._primary_key])
+        return items, remaining
+
+    def get_filtered_queryset(self, field_name, params, default_queryset):
+        """filters default queryset based on the serializer field type"""
+        predicate = self.get_filter_predicate(field_name, params)
+        return [item for item in default_queryset if predicate(item)]
 
     def get_serializer_method(self, field_name):
         """
@@ -1,20 +1,39 @@
+from django.core.urlresolvers import resolve, Resolver404
 from pymongo.errors import OperationFailure
 from raven.contrib.django.raven_compat.models import sentry_exception_handler
 
-from framework.transactions import commands, messages, utils
+from framework.mongo.handlers import client_manager
+from framework.transactions import commands, messages, utils, read_only
 
 from .api_globals import api_globals
 
 from api.base import settings
 
 
+def get_view(request):
+    """Return the view class (or function) that will handle ``request``."""
+    try:
+        func = resolve(request.path_info).func
+    except Resolver404:
+        return None
+    return getattr(func, 'cls', func)
+
+
 # TODO: Verify that a transaction is being created for every
 # individual request.
 class TokuTransactionsMiddleware(object):
-    """TokuMX transaction middleware."""
+    """TokuMX transaction middleware. Read-only requests skip the
+    transaction commands but still use a pinned connection.
+    """
 
     def process_request(self, request):
-        """Begin a transaction if one doesn't already exist."""
+        """Pin a pooled connection and begin a transaction if one doesn't
+        already exist.
+        """
+        client_manager.start_request()
+        if read_only.is_read_only(request.method, get_view(request)):
+            read_only.mark(request, commands_skipped=1)
+            return
         try:
             commands.begin()
         except OperationFailure as err:
@@ -27,6 +46,9 @@ class TokuTransactionsMiddleware(object):
         if it exists.
         """
         sentry_exception_handler(request=request)
+        if read_only.is_marked(request):
+            commands.disconnect()
+            return None
         try:
             commands.rollback()
         except OperationFailure as err:
@@ -40,6 +62,10 @@ class TokuTransactionsMiddleware(object):
         """Commit transaction if it exists, rolling back in an
         exception occurs.
         """
+        if read_only.is_marked(request):
+            read_only.record_skipped()
+            commands.disconnect()
+            return response
 
         try:
             if response.status_code >= 400:
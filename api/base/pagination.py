@@ -1,8 +1,15 @@
-from django.utils import six
+import json
+import base64
+import datetime
 from collections import OrderedDict
+
+from dateutil import parser as date_parser
+from django.utils import six
 from django.core.urlresolvers import reverse
 from django.core.paginator import InvalidPage, Paginator as DjangoPaginator
 
+from modularodm import Q
+from modularodm.query import queryset as modularodm_queryset
 from rest_framework import pagination
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
@@ -10,15 +17,99 @@ from rest_framework.utils.urls import (
     replace_query_param, remove_query_param
 )
 
+def encode_cursor(values, reverse=False):
+    """Return an opaque cursor for the position ``values`` of the ordering
+    keys. A ``reverse`` cursor selects the items before that position.
+    """
+    payload = {
+        'v': [
+            {'d': value.isoformat()} if isinstance(value, datetime.datetime) else value
+            for value in values
+        ],
+        'r': reverse,
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload))
+
+
+def decode_cursor(cursor):
+    """Return the ``(values, reverse)`` encoded in ``cursor``."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(str(cursor)))
+        values = [
+            date_parser.parse(value['d']) if isinstance(value, dict) else value
+            for value in payload['v']
+        ]
+        return values, bool(payload['r'])
+    except (TypeError, ValueError, KeyError):
+        raise NotFound('Invalid cursor.')
+
+
 class JSONAPIPagination(pagination.PageNumberPagination):
     """
     Custom paginator that formats responses in a JSON-API compatible format.
 
     Properly handles pagination of embedded objects.
 
+    Passing ``page[cursor]`` switches to cursor pagination: items are ordered
+    on the view's ``cursor_ordering`` field, with ``_id`` breaking ties, and
+    the links carry opaque cursors to the neighbouring pages instead of page
+    numbers. The first page is requested with an empty cursor. The total is
+    not counted in this mode.
     """
 
     page_size_query_param = 'page[size]'
+    cursor_query_param = 'page[cursor]'
+
+    cursor_page = None
+    cursor_query_used = False
+
+    def is_cursor_request(self, request):
+        return (
+            self.cursor_query_param in request.query_params and
+            not request.parser_context['kwargs'].get('is_embedded')
+        )
+
+    def get_cursor_fields(self, view):
+        """Return the fields ordering items in cursor mode, and whether they
+        are sorted in descending order.
+        """
+        ordering = getattr(view, 'cursor_ordering', '_id')
+        field = ordering.lstrip('-')
+        fields = [field] if field == '_id' else [field, '_id']
+        return fields, ordering.startswith('-')
+
+    def get_cursor(self, request):
+        """Return the position and direction of the requested cursor; the
+        position is None for the first page.
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        return decode_cursor(cursor)
+
+    def get_cursor_query(self, request, view):
+        """Return the ODM query selecting the items past the requested cursor,
+        or None if there is none. Views that build their queryset from this
+        query are paginated without reading the items before the cursor.
+        """
+        if not self.is_cursor_request(request):
+            return None
+        values, reverse = self.get_cursor(request)
+        if values is None:
+            return None
+        fields, descending = self.get_cursor_fields(view)
+        operator = 'lt' if descending != reverse else 'gt'
+        # (a, b) > (x, y) if a > x, or a == x and b > y
+        query = None
+        equal = None
+        for field, value in zip(fields, values):
+            part = Q(field, operator, value)
+            if equal is not None:
+                part = equal & part
+            query = part if query is None else query | part
+            equal = Q(field, 'eq', value) if equal is None else equal & Q(field, 'eq', value)
+        self.cursor_query_used = True
+        return query
 
     def page_number_query(self, url, page_number):
         """
@@ -55,6 +146,72 @@ class JSONAPIPagination(pagination.PageNumberPagination):
         page_number = self.page.next_page_number()
         return self.page_number_query(url, page_number)
 
+    def paginate_queryset_by_cursor(self, queryset, request, view):
+        """Return the page of ``queryset`` following (or, for a reverse
+        cursor, preceding) the requested cursor.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        fields, descending = self.get_cursor_fields(view)
+        values, reverse = self.get_cursor(request)
+        # Previous pages are read walking backwards from the cursor
+        backwards = descending != reverse
+
+        def get_key(item):
+            return [getattr(item, field) for field in fields]
+
+        if isinstance(queryset, modularodm_queryset.BaseQuerySet) and (values is None or self.cursor_query_used):
+            prefix = '-' if backwards else ''
+            items = list(queryset.sort(*[prefix + field for field in fields]).limit(page_size + 1))
+        else:
+            items = sorted(queryset, key=get_key, reverse=backwards)
+            if values is not None:
+                items = [
+                    item for item in items
+                    if (get_key(item) < values if backwards else get_key(item) > values)
+                ]
+            items = items[:page_size + 1]
+
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        if reverse:
+            items.reverse()
+
+        next_cursor = prev_cursor = None
+        if items:
+            if has_more or reverse:
+                next_cursor = encode_cursor(get_key(items[-1]))
+            if values is not None and (has_more or not reverse):
+                prev_cursor = encode_cursor(get_key(items[0]), reverse=True)
+        elif values is not None and not reverse:
+            prev_cursor = encode_cursor(values, reverse=True)
+        self.cursor_page = {
+            'next': next_cursor,
+            'prev': prev_cursor,
+            'per_page': page_size,
+        }
+        return items
+
+    def cursor_query(self, url, cursor):
+        """
+        Builds uri and adds cursor param.
+        """
+        url = self.request.build_absolute_uri(url)
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_cursor_links(self, url):
+        return OrderedDict([
+            ('first', self.cursor_query(url, '')),
+            ('last', None),
+            ('prev', self.cursor_query(url, self.cursor_page['prev']) if self.cursor_page['prev'] else None),
+            ('next', self.cursor_query(url, self.cursor_page['next']) if self.cursor_page['next'] else None),
+            ('meta', OrderedDict([
+                ('total', None),
+                ('per_page', self.cursor_page['per_page']),
+            ]))
+        ])
+
     def get_paginated_response(self, data):
         """
         Formats paginated response in accordance with JSON API.
@@ -69,6 +226,12 @@ class JSONAPIPagination(pagination.PageNumberPagination):
         if embedded:
             reversed_url = reverse(view_name, kwargs=kwargs)
 
+        if self.cursor_page is not None:
+            return Response(OrderedDict([
+                ('data', data),
+                ('links', self.get_cursor_links(reversed_url)),
+            ]))
+
         response_dict = OrderedDict([
             ('data', data),
             ('links', OrderedDict([
@@ -90,6 +253,9 @@ class JSONAPIPagination(pagination.PageNumberPagination):
 
         If this is an embedded resource, returns first page, ignoring query params.
         """
+        if self.is_cursor_request(request):
+            return self.paginate_queryset_by_cursor(queryset, request, view)
+
         if request.parser_context['kwargs'].get('is_embedded'):
             page_size = self.get_page_size(request)
             if not page_size:
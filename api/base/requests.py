@@ -13,6 +13,10 @@ class EmbeddedRequest(Request):
         self.original_user = request.user
         super(EmbeddedRequest, self).__init__(request, parsers, authenticators,
                                               negotiator, parser_context)
+        # Views wrapping this request use the original credentials instead of
+        # authenticating again
+        self._force_auth_user = request.user
+        self._force_auth_token = request.auth
 
     @property
     def method(self):
@@ -53,6 +53,8 @@ def absolute_reverse(view_name, query_kwargs=None, args=None, kwargs=None):
 
 
 def get_object_or_error(model_cls, query_or_pk, display_name=None):
+    # Prevent circular import with website.project.model
+    from website.project.model import Node
     display_name = display_name or None
 
     if isinstance(query_or_pk, basestring):
@@ -61,7 +63,13 @@ def get_object_or_error(model_cls, query_or_pk, display_name=None):
         query = query_or_pk
 
     try:
-        obj = model_cls.find_one(query)
+        if isinstance(query_or_pk, basestring) and model_cls in (Node, User):
+            # Reuse an object already loaded in this request, e.g. prefetched for embeds
+            obj = model_cls.load(query_or_pk)
+            if obj is None:
+                raise NoResultsFound
+        else:
+            obj = model_cls.find_one(query)
         if getattr(obj, 'is_deleted', False) is True:
             if display_name is None:
                 raise Gone
@@ -2,12 +2,11 @@ from django.http import JsonResponse
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import generics
-from rest_framework.mixins import ListModelMixin
 
 from api.users.serializers import UserSerializer
 from website import settings
 from .utils import absolute_reverse
-from .requests import EmbeddedRequest
+from .embeds import get_embed_resolver
 
 class JSONAPIBaseView(generics.GenericAPIView):
 
@@ -27,20 +26,36 @@ class JSONAPIBaseView(generics.GenericAPIView):
         """
         if getattr(field, 'field', None):
                 field = field.field
+        resolver = get_embed_resolver(self.request)
         def partial(item):
             # resolve must be implemented on the field
-            view, view_args, view_kwargs = field.resolve(item)
-            if issubclass(view.cls, ListModelMixin) and field.always_embed:
-                raise Exception("Cannot auto-embed a list view.")
-            request = EmbeddedRequest(self.request)
-            view_kwargs.update({
-                'request': request,
-                'is_embedded': True
-            })
-            response = view(*view_args, **view_kwargs)
-            return response.data
+            return resolver.resolve(self.request, field, item)
+        partial.field = field
         return partial
 
+    def get_serializer(self, *args, **kwargs):
+        """Load the objects needed by the embeds of a page of results in bulk
+        before serializing it.
+        """
+        serializer = super(JSONAPIBaseView, self).get_serializer(*args, **kwargs)
+        if args and kwargs.get('many') and isinstance(args[0], list):
+            embeds = serializer.context.get('embed', {})
+            if embeds:
+                fields = [partial.field for partial in embeds.values()]
+                get_embed_resolver(self.request).prefetch(fields, args[0])
+        return serializer
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """In debug mode, report how many embedded views were dispatched for
+        the request.
+        """
+        response = super(JSONAPIBaseView, self).finalize_response(request, response, *args, **kwargs)
+        if settings.DEBUG_MODE and not self.kwargs.get('is_embedded') and isinstance(response.data, dict):
+            resolver = get_embed_resolver(request)
+            if resolver.calls or resolver.hits:
+                response.data.setdefault('meta', {}).update(resolver.get_stats())
+        return response
+
     def get_serializer_context(self):
         """Inject request into the serializer context. Additionally, inject partial functions
         (request, object -> embed items) if the query string contains embeds.  Allows
@@ -247,12 +247,7 @@ class NodeList(JSONAPIBaseView, bulk_views.BulkUpdateJSONAPIView, bulk_views.Bul
         return query
 
     def filter_non_retracted_nodes(self, query):
-        nodes = Node.find(query)
-        # Refetching because this method needs to return a queryset instead of a
-        # list comprehension for subsequent filtering on ordering.
-        non_retracted_list = [node._id for node in nodes if not node.is_retracted]
-        non_retracted_nodes = Node.find(Q('_id', 'in', non_retracted_list))
-        return non_retracted_nodes
+        return Node.find(query & Q('retracted', 'ne', True))
 
     # overrides ListBulkCreateJSONAPIView, BulkUpdateJSONAPIView
     def get_queryset(self):
@@ -1727,6 +1722,8 @@ class NodeLogList(JSONAPIBaseView, generics.ListAPIView, NodeMixin, ODMFilterMix
     log_lookup_url_kwarg = 'node_id'
 
     ordering = ('-date', )
+    # Log ids are ObjectIds, so they sort by creation time
+    cursor_ordering = '-_id'
 
     permission_classes = (
         drf_permissions.IsAuthenticatedOrReadOnly,
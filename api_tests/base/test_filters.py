@@ -12,7 +12,7 @@ from tests.base import ApiTestCase
 from tests import factories
 
 from api.base.settings.defaults import API_BASE
-from api.base.filters import FilterMixin
+from api.base.filters import FilterMixin, ListFilterMixin
 
 from api.base.exceptions import (
     InvalidFilterError,
@@ -227,3 +227,83 @@ class TestFilterMixin(ApiTestCase):
         field = FakeSerializer._declared_fields['float_field']
         value = self.view.convert_value(value, field)
         assert_equal(value, 42.0)
+
+
+class FakeItem(object):
+
+    def __init__(self, _id, title, size):
+        self._id = _id
+        self.title = title
+        self.size = size
+
+
+class FakeListSerializer(ser.Serializer):
+
+    filterable_fields = ('id', 'title', 'size', 'even')
+
+    id = ser.CharField(source='_id')
+    title = ser.CharField()
+    size = ser.IntegerField()
+    even = ser.SerializerMethodField()
+
+    def get_even(self, obj):
+        return obj.size % 2 == 0
+
+
+class FakeListView(ListFilterMixin):
+
+    serializer_class = FakeListSerializer
+
+    def __init__(self, items):
+        super(FakeListView, self).__init__()
+        self.items = items
+        self.serializer_calls = 0
+
+    def get_default_queryset(self):
+        return self.items
+
+    def get_serializer(self):
+        self.serializer_calls += 1
+        return self.serializer_class()
+
+
+class TestListFilterMixin(ApiTestCase):
+
+    def setUp(self):
+        super(TestListFilterMixin, self).setUp()
+        self.items = [
+            FakeItem('item{0}'.format(i), 'Title {0}'.format(i), i)
+            for i in range(20, 0, -1)
+        ]
+        self.view = FakeListView(self.items)
+
+    def test_param_queryset_preserves_order(self):
+        query_params = {'filter[size][gt]': '10'}
+        results = self.view.param_queryset(query_params, self.items)
+        assert_equal(results, [item for item in self.items if item.size > 10])
+
+    def test_param_queryset_combines_filters(self):
+        query_params = {
+            'filter[size][lte]': '15',
+            'filter[title]': 'TITLE 1',
+        }
+        results = self.view.param_queryset(query_params, self.items)
+        assert_equal([item.size for item in results], [15, 14, 13, 12, 11, 10, 1])
+
+    def test_param_queryset_source_field(self):
+        query_params = {'filter[id]': 'item7'}
+        results = self.view.param_queryset(query_params, self.items)
+        assert_equal([item._id for item in results], ['item7'])
+
+    def test_compile_filters_serializer_method_field(self):
+        predicate = self.view.compile_filters({
+            'even': [{'op': 'eq', 'value': True}],
+            'size': [{'op': 'gt', 'value': 15}],
+        })
+        results = [item for item in self.items if predicate(item)]
+        assert_equal([item.size for item in results], [20, 18, 16])
+        assert_equal(self.view.serializer_calls, 1)
+
+    def test_param_queryset_no_filters(self):
+        results = self.view.param_queryset({'page': '2'}, self.items)
+        assert_equal(results, self.items)
@@ -31,3 +31,23 @@ class TestMiddlewareRollback(ApiTestCase):
         assert_true(mock_commands.commit.called)
 
 
+
+    @mock.patch('api.base.middleware.commands')
+    @mock.patch('website.settings.READ_ONLY_SAFE_METHODS', True)
+    def test_safe_method_skips_transaction(self, mock_commands):
+        request = mock.Mock(method='GET', path_info='/v2/')
+        self.mock_response.status_code = 200
+        self.middleware.process_request(request)
+        self.middleware.process_response(request, self.mock_response)
+
+        assert_false(mock_commands.begin.called)
+        assert_false(mock_commands.commit.called)
+        assert_true(mock_commands.disconnect.called)
+
+    @mock.patch('api.base.middleware.commands')
+    @mock.patch('website.settings.READ_ONLY_SAFE_METHODS', True)
+    def test_unsafe_method_begins_transaction(self, mock_commands):
+        request = mock.Mock(method='POST', path_info='/v2/')
+        self.middleware.process_request(request)
+
+        assert_true(mock_commands.begin.called)
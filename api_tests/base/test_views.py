@@ -102,4 +102,21 @@ class TestJSONAPIBaseView(ApiTestCase):
         self.app.get(self.url, auth=self.user.auth)
         assert_in('request', mock_to_representation.call_args[0][0].context)
 
+    @mock.patch('api.base.views.settings.DEBUG_MODE', True)
+    def test_identical_embeds_dispatched_once(self):
+        url = '/{0}nodes/{1}/children/?embed=parent'.format(API_BASE, self.node._id)
+        res = self.app.get(url, auth=self.user.auth)
+        children = res.json['data']
+        assert_greater(len(children), 1)
+        for child in children:
+            assert_equal(child['embeds']['parent']['data']['id'], self.node._id)
+        assert_equal(res.json['meta']['embed_calls'], 1)
+        assert_equal(res.json['meta']['embed_cache_hits'], len(children) - 1)
+
+    @mock.patch('api.base.views.settings.DEBUG_MODE', False)
+    def test_embed_stats_hidden_outside_debug_mode(self):
+        url = '/{0}nodes/{1}/children/?embed=parent'.format(API_BASE, self.node._id)
+        res = self.app.get(url, auth=self.user.auth)
+        assert_not_in('meta', res.json)
+
 
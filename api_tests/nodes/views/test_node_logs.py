@@ -130,3 +130,31 @@ class TestNodeLogList(ApiTestCase):
         retraction = RetractedRegistrationFactory(registration=registration, user=self.user)
         res = self.app.get(url, auth=self.user.auth, expect_errors=True)
         assert_equal(res.status_code, 403)
+
+    def test_cursor_pagination(self):
+        for tag in ['one', 'two', 'three', 'four']:
+            self.public_project.add_tag(tag, auth=self.user_auth)
+        expected = sorted(self.public_project.logs._to_primary_keys(), reverse=True)
+
+        url = '{}?page[cursor]=&page[size]=2'.format(self.public_url)
+        seen = []
+        while url:
+            res = self.app.get(url, auth=self.user.auth)
+            assert_equal(res.status_code, 200)
+            assert_is_none(res.json['links']['meta']['total'])
+            seen.extend(log['id'] for log in res.json['data'])
+            last = url
+            url = res.json['links']['next']
+        assert_equal(seen, expected)
+
+        # Walk back from the last page
+        res = self.app.get(last, auth=self.user.auth)
+        res = self.app.get(res.json['links']['prev'], auth=self.user.auth)
+        last_start = (len(expected) - 1) // 2 * 2
+        assert_equal([log['id'] for log in res.json['data']], expected[last_start - 2:last_start])
+        assert_is_not_none(res.json['links']['next'])
+
+    def test_invalid_cursor(self):
+        url = '{}?page[cursor]=nonsense'.format(self.public_url)
+        res = self.app.get(url, auth=self.user.auth, expect_errors=True)
+        assert_equal(res.status_code, 404)
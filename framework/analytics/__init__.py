@@ -6,43 +6,42 @@ from datetime import datetime
 
 from framework.mongo import database
 from framework.sessions import session
+from framework.analytics import counters
+from framework.analytics.bloom import BloomFilter
 
-from flask import request
-
+from website import settings
 
-collection = database['pagecounters']
+from flask import request
 
 
 def increment_user_activity_counters(user_id, action, date, db=None):
-    db = db or database  # default to local proxy
-    collection = database['useractivitycounters']
     date = date.strftime('%Y/%m/%d')
-    query = {
-        '$inc': {
+    counters.user_activity_counters.increment(
+        user_id,
+        {
             'total': 1,
             'date.{0}.total'.format(date): 1,
             'action.{0}.total'.format(action): 1,
             'action.{0}.date.{1}'.format(action, date): 1,
-        }
-    }
-    collection.update(
-        {'_id': user_id},
-        query,
-        upsert=True,
-        manipulate=False,
+        },
+        db=db,
     )
     return True
 
 
 def get_total_activity_count(user_id, db=None):
+    """Return the number of actions of user ``user_id``, including actions not
+    yet written by this process.
+    """
     db = db or database
-    collection = database['useractivitycounters']
+    collection = db['useractivitycounters']
     result = collection.find_one(
         {'_id': user_id}, {'total': 1}
     )
+    total = counters.user_activity_counters.get_pending(user_id).get('total', 0)
     if result and 'total' in result:
-        return result['total']
-    return 0
+        total += result['total']
+    return total
 
 
 def clean_page(page):
@@ -72,15 +71,28 @@ def build_page(rex, kwargs):
         return None
 
 
+def load_visited(value):
+    """Return the `BloomFilter` of visited pages stored as ``value``. Lists of
+    page keys stored by earlier versions are converted, and a filter that has
+    reached capacity is replaced by an empty one.
+    """
+    if isinstance(value, dict):
+        visited = BloomFilter.from_dict(value)
+        if visited.count < settings.SESSION_VISITED_FILTER_CAPACITY:
+            return visited
+        return BloomFilter()
+    visited = BloomFilter()
+    for page in value or []:
+        visited.add(page)
+    return visited
+
+
 def update_counter(page, db=None):
     """Update counters for page.
 
     :param str page: Colon-delimited page key in analytics collection
     :param db: MongoDB database or `None`
     """
-    db = db or database
-    collection = db['pagecounters']
-
     date = datetime.utcnow()
     date = date.strftime('%Y/%m/%d')
 
@@ -89,32 +101,22 @@ def update_counter(page, db=None):
     d = {'$inc': {}}
 
     visited_by_date = session.data.get('visited_by_date')
-    if not visited_by_date:
-        visited_by_date = {'date': date, 'pages': []}
-
-    if date == visited_by_date['date']:
-        if page not in visited_by_date['pages']:
-            d['$inc']['date.%s.unique' % date] = 1
-            visited_by_date['pages'].append(page)
-            session.data['visited_by_date'] = visited_by_date
+    if visited_by_date and visited_by_date['date'] == date:
+        visited_today = load_visited(visited_by_date['pages'])
     else:
-        visited_by_date['date'] = date
-        visited_by_date['pages'] = []
+        visited_today = BloomFilter()
+    if visited_today.add(page):
         d['$inc']['date.%s.unique' % date] = 1
-        visited_by_date['pages'].append(page)
-        session.data['visited_by_date'] = visited_by_date
+        session.data['visited_by_date'] = {'date': date, 'pages': visited_today.to_dict()}
 
     d['$inc']['date.%s.total' % date] = 1
 
-    visited = session.data.get('visited')  # '/project/x/, project/y/'
-    if not visited:
-        visited = []
-    if page not in visited:
+    visited = load_visited(session.data.get('visited'))
+    if visited.add(page):
         d['$inc']['unique'] = 1
-        visited.append(page)
-        session.data['visited'] = visited
+        session.data['visited'] = visited.to_dict()
     d['$inc']['total'] = 1
-    collection.update({'_id': page}, d, True, False)
+    counters.page_counters.increment(page, d['$inc'], db=db)
 
 
 def update_counters(rex, db=None):
@@ -137,20 +139,20 @@ def update_counters(rex, db=None):
 
 
 def get_basic_counters(page, db=None):
+    """Return the unique and total counts of ``page``, including views not yet
+    written by this process, or ``(None, None)`` if it was never viewed.
+    """
     db = db or database
     collection = db['pagecounters']
-    unique = 0
-    total = 0
-    collection = database['pagecounters']
+    page = clean_page(page)
     result = collection.find_one(
-        {'_id': clean_page(page)},
+        {'_id': page},
         {'total': 1, 'unique': 1}
     )
-    if result:
-        if 'unique' in result:
-            unique = result['unique']
-        if 'total' in result:
-            total = result['total']
-        return unique, total
-    else:
+    pending = counters.page_counters.get_pending(page)
+    if not result and not pending:
         return None, None
+    result = result or {}
+    unique = result.get('unique', 0) + pending.get('unique', 0)
+    total = result.get('total', 0) + pending.get('total', 0)
+    return unique, total
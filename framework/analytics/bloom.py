@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Fixed-size Bloom filter used to record the pages visited by a session. The
+filter serializes to a small dictionary of strings and integers, so it can be
+stored in `Session.data` in place of an ever-growing list of page keys.
+"""
+
+import base64
+import struct
+import hashlib
+
+from website import settings
+
+
+class BloomFilter(object):
+    """Set of strings with no false negatives and a false positive rate
+    bounded by its size and the number of strings added.
+
+    :param int bits: Size of the filter in bits; rounded up to a whole byte
+    :param int hashes: Number of bit positions set per string
+    """
+    def __init__(self, bits=None, hashes=None, data=None, count=0):
+        bits = bits or settings.SESSION_VISITED_FILTER_BITS
+        self.data = bytearray(data) if data is not None else bytearray((bits + 7) // 8)
+        self.bits = len(self.data) * 8
+        self.hashes = hashes or settings.SESSION_VISITED_FILTER_HASHES
+        self.count = count
+
+    @classmethod
+    def from_dict(cls, value):
+        return cls(
+            data=base64.b64decode(value['bits']),
+            hashes=value['hashes'],
+            count=value['count'],
+        )
+
+    def to_dict(self):
+        return {
+            'bits': base64.b64encode(str(self.data)),
+            'hashes': self.hashes,
+            'count': self.count,
+        }
+
+    def _positions(self, key):
+        if isinstance(key, unicode):
+            key = key.encode('utf-8')
+        # Double hashing: derive every position from two halves of one digest
+        first, second = struct.unpack('<QQ', hashlib.md5(key).digest())
+        return [(first + index * second) % self.bits for index in range(self.hashes)]
+
+    def __contains__(self, key):
+        return all(
+            self.data[position // 8] & (1 << position % 8)
+            for position in self._positions(key)
+        )
+
+    def add(self, key):
+        """Add ``key`` to the filter. Return `False` if it was (or collides
+        with) a key already added, else `True`.
+        """
+        added = False
+        for position in self._positions(key):
+            mask = 1 << position % 8
+            if not self.data[position // 8] & mask:
+                self.data[position // 8] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Write-behind buffer for analytics counters. Increments are aggregated per
+document in process memory and written with one ``$inc`` upsert per document
+when the buffer holds ``settings.ANALYTICS_COUNTER_BUFFER_SIZE`` increments or
+its oldest increment is ``settings.ANALYTICS_COUNTER_FLUSH_INTERVAL`` seconds
+old, so a crash loses at most that many increments per buffer.
+
+Buffered increments belong to many requests, so they are written through a
+client of their own that never takes part in a request's TokuMX transaction;
+a request that rolls back cannot take other requests' counts with it. A
+background thread flushes increments that would otherwise wait for the next
+one.
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+import collections
+
+from framework.mongo import database
+from framework.mongo.handlers import ClientManager
+
+from website import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Not pinned to request sockets, so writes are never part of a transaction
+client_manager = ClientManager()
+
+
+def get_flush_database():
+    return client_manager.client[settings.DB_NAME]
+
+
+class CounterBuffer(object):
+    """Buffer of pending ``$inc`` updates to ``collection``.
+
+    :param str collection: Name of the counters collection
+    :param int max_pending: Number of increments that triggers a flush; a
+        falsy value writes every increment through. Defaults to
+        ``settings.ANALYTICS_COUNTER_BUFFER_SIZE``
+    :param int flush_interval: Seconds after which pending increments are
+        flushed. Defaults to ``settings.ANALYTICS_COUNTER_FLUSH_INTERVAL``
+    """
+    def __init__(self, collection, max_pending=None, flush_interval=None):
+        self.collection = collection
+        self._max_pending = max_pending
+        self._flush_interval = flush_interval
+        self._pending = collections.defaultdict(collections.Counter)
+        self._count = 0
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._flusher_pid = None
+
+    @property
+    def max_pending(self):
+        if self._max_pending is None:
+            return settings.ANALYTICS_COUNTER_BUFFER_SIZE
+        return self._max_pending
+
+    @property
+    def flush_interval(self):
+        if self._flush_interval is None:
+            return settings.ANALYTICS_COUNTER_FLUSH_INTERVAL
+        return self._flush_interval
+
+    def _write(self, key, increments, db=None):
+        (db or database)[self.collection].update(
+            {'_id': key},
+            {'$inc': dict(increments)},
+            upsert=True,
+            manipulate=False,
+        )
+
+    def increment(self, key, increments, db=None):
+        """Add ``increments``, a dict of field names to amounts, to the counters
+        of document ``key``.
+
+        :param db: Database that increments are written through to when
+            buffering is disabled; buffered increments are always flushed
+            with `get_flush_database`
+        """
+        if not self.max_pending:
+            self._write(key, increments, db=db)
+            return
+        self._start_flusher()
+        now = time.time()
+        with self._lock:
+            self._pending[key].update(increments)
+            self._count += 1
+            if self._oldest is None:
+                self._oldest = now
+            due = (
+                self._count >= self.max_pending or
+                now - self._oldest >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def _start_flusher(self):
+        """Start the thread that flushes pending increments once they are
+        ``flush_interval`` seconds old. Threads do not survive a fork, so each
+        process starts its own.
+        """
+        pid = os.getpid()
+        if self._flusher_pid == pid and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher_pid == pid and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(target=self._flush_periodically)
+            self._flusher.daemon = True
+            self._flusher_pid = pid
+            self._flusher.start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(max(self.flush_interval, 1))
+            oldest = self._oldest
+            if oldest is not None and time.time() - oldest >= self.flush_interval:
+                self.flush()
+
+    def flush(self, db=None):
+        """Write every pending increment. Increments that fail to be written
+        are kept for the next flush.
+
+        :param db: Database to write to. Defaults to `get_flush_database`
+        :return: Number of documents updated
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = collections.defaultdict(collections.Counter)
+            self._count = 0
+            self._oldest = None
+        written = 0
+        try:
+            db = db or get_flush_database()
+            for key, increments in pending.iteritems():
+                self._write(key, increments, db=db)
+                written += 1
+        except Exception:
+            logger.exception('Failed to flush {0} counters'.format(self.collection))
+            with self._lock:
+                for key, increments in pending.items()[written:]:
+                    self._pending[key].update(increments)
+                    self._count += 1
+                if self._oldest is None:
+                    self._oldest = time.time()
+        return written
+
+    def get_pending(self, key):
+        """Return the increments to document ``key`` not yet written."""
+        with self._lock:
+            return dict(self._pending.get(key, {}))
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._count = 0
+            self._oldest = None
+
+
+page_counters = CounterBuffer('pagecounters')
+user_activity_counters = CounterBuffer('useractivitycounters')
+
+
+@atexit.register
+def flush_all():
+    for counter_buffer in (page_counters, user_activity_counters):
+        counter_buffer.flush()
@@ -2,8 +2,7 @@
 
 from datetime import datetime
 
-from framework.sessions import session, create_session, Session
-from modularodm import Q
+from framework.sessions import session, create_session, get_backend
 from framework import bcrypt
 from framework.auth import signals
 from framework.auth.exceptions import DuplicateEmailError
@@ -54,7 +53,7 @@ def logout():
             del session.data[key]
         except KeyError:
             pass
-    Session.remove(Q('_id', 'eq', session._id))
+    get_backend().remove(session._id)
     return True
 
 
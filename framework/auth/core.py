@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import datetime as dt
+import heapq
 import itertools
 import logging
 import re
@@ -23,6 +24,7 @@ from framework.auth.exceptions import (ChangePasswordError, ExpiredTokenError, I
 from framework.bcrypt import generate_password_hash, check_password_hash
 from framework.exceptions import PermissionsError
 from framework.guid.model import GuidStoredObject
+from framework.mongo import database
 from framework.mongo.validators import string_required
 from framework.sentry import log_exception
 from framework.sessions import session
@@ -1119,31 +1121,85 @@ class User(GuidStoredObject, AddonModelMixin):
         watched_node_ids = set([config.node._id for config in self.watched])
         return node._id in watched_node_ids
 
-    def get_recent_log_ids(self, since=None):
-        '''Return a generator of recent logs' ids.
+    def get_watched_node_ids(self):
+        """Return the ids of the nodes this user is watching, read from the
+        user's WatchConfigs with a single query.
+        """
+        config_ids = self.watched._to_primary_keys()
+        if not config_ids:
+            return []
+        configs = database['watchconfig'].find(
+            {'_id': {'$in': config_ids}},
+            {'node': True},
+        )
+        return list({config['node'] for config in configs if config.get('node')})
+
+    def _get_recent_logs_query(self, node_ids, since=None, before=None):
+        # Default since to 60 days before today if since is None
+        # timezone aware utcnow
+        utcnow = dt.datetime.utcnow().replace(tzinfo=pytz.utc)
+        since_date = since or (utcnow - dt.timedelta(days=60))
+        # The first 4 bytes of Mongo's ObjectId encode its creation time, so
+        # log ids compare in the order the logs were created
+        id_range = {'$gt': str(bson.ObjectId.from_datetime(since_date))}
+        if before:
+            id_range['$lt'] = before
+        return {
+            '__backrefs.logged.node.logs': {'$in': node_ids},
+            '_id': id_range,
+        }
+
+    def get_recent_log_ids(self, since=None, before=None, offset=0, limit=None):
+        '''Return a generator of recent logs' ids, newest first.
+
+        Logs are read with an indexed query on the watched nodes; users
+        watching more than ``settings.WATCHED_LOGS_MAX_QUERY_NODES`` nodes get
+        a merge of each node's log ids instead.
 
         :param since: A datetime specifying the oldest time to retrieve logs
         from. If ``None``, defaults to 60 days before today. Must be a tz-aware
         datetime because PyMongo's generation times are tz-aware.
+        :param before: Only return logs older than the log with this id, for
+        paginating with a cursor
+        :param offset: Number of logs to skip
+        :param limit: Maximum number of logs to return
 
         :rtype: generator of log ids (strings)
         '''
-        log_ids = []
-        # Default since to 60 days before today if since is None
-        # timezone aware utcnow
-        utcnow = dt.datetime.utcnow().replace(tzinfo=pytz.utc)
-        since_date = since or (utcnow - dt.timedelta(days=60))
-        for config in self.watched:
-            # Extract the timestamps for each log from the log_id (fast!)
-            # The first 4 bytes of Mongo's ObjectId encodes time
-            # This prevents having to load each Log Object and access their
-            # date fields
-            node_log_ids = [log_id for log_id in config.node.logs._to_primary_keys()
-                                   if bson.ObjectId(log_id).generation_time > since_date and
-                                   log_id not in log_ids]
-            # Log ids in reverse chronological order
-            log_ids = _merge_into_reversed(log_ids, node_log_ids)
-        return (l_id for l_id in log_ids)
+        node_ids = self.get_watched_node_ids()
+        if not node_ids:
+            return iter([])
+        query = self._get_recent_logs_query(node_ids, since=since, before=before)
+        if len(node_ids) > settings.WATCHED_LOGS_MAX_QUERY_NODES:
+            since_id = query['_id']['$gt']
+            log_ids = _merge_into_reversed(*[
+                sorted(
+                    log_id for log_id in config.node.logs._to_primary_keys()
+                    if log_id > since_id and (before is None or log_id < before)
+                )
+                for config in self.watched
+            ])
+            stop = offset + limit if limit is not None else None
+            return itertools.islice(log_ids, offset, stop)
+        cursor = database['nodelog'].find(
+            query,
+            {'_id': True},
+        ).sort('_id', -1).skip(offset)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return (log['_id'] for log in cursor)
+
+    def count_recent_logs(self, since=None):
+        """Return the number of logs `get_recent_log_ids` would return for
+        ``since``, counted by the database without reading the logs.
+        """
+        node_ids = self.get_watched_node_ids()
+        if not node_ids:
+            return 0
+        if len(node_ids) > settings.WATCHED_LOGS_MAX_QUERY_NODES:
+            return sum(1 for _ in self.get_recent_log_ids(since=since))
+        query = self._get_recent_logs_query(node_ids, since=since)
+        return database['nodelog'].find(query).count()
 
     def get_daily_digest_log_ids(self):
         '''Return a generator of log ids generated in the past day
@@ -1333,6 +1389,9 @@ class User(GuidStoredObject, AddonModelMixin):
 
 
 def _merge_into_reversed(*iterables):
-    '''Merge multiple sorted inputs into a single output in reverse order.
+    '''Merge multiple sorted inputs into a single output in reverse order,
+    dropping duplicates.
     '''
-    return sorted(itertools.chain(*iterables), reverse=True)
+    merged = [key for key, _ in itertools.groupby(heapq.merge(*iterables))]
+    merged.reverse()
+    return merged
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""SMTP delivery of many messages over a pool of reusable, authenticated
+connections. Each connection sends up to ``settings.MAIL_BATCH_SIZE`` messages
+before it is closed; failed messages are retried on a fresh connection.
+"""
+
+import time
+import Queue
+import socket
+import smtplib
+import logging
+import threading
+import collections
+from email.mime.text import MIMEText
+
+from website import settings
+
+
+logger = logging.getLogger(__name__)
+
+Message = collections.namedtuple('Message', ['from_addr', 'to_addr', 'subject', 'message', 'mimetype'])
+
+# Errors after which the message is retried on a new connection
+RETRY_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, socket.error)
+
+
+def build_message(from_addr, to_addr, subject, message, mimetype='html'):
+    msg = MIMEText(message, mimetype, _charset='utf-8')
+    msg['Subject'] = subject
+    msg['From'] = from_addr
+    msg['To'] = to_addr
+    return msg.as_string()
+
+
+class SMTPConnectionPool(object):
+    """Pool of up to ``size`` open SMTP connections.
+
+    :param int batch_size: Number of messages sent over a connection before it
+        is closed
+    """
+    def __init__(self, mail_server=None, username=None, password=None, ttls=True, login=True,
+                 size=None, batch_size=None):
+        self.mail_server = mail_server or settings.MAIL_SERVER
+        self.username = username or settings.MAIL_USERNAME
+        self.password = password or settings.MAIL_PASSWORD
+        self.ttls = ttls
+        self.login = login
+        self.size = size or settings.MAIL_POOL_SIZE
+        self.batch_size = batch_size or settings.MAIL_BATCH_SIZE
+        self.connections_opened = 0
+        self._idle = Queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        connection = smtplib.SMTP(self.mail_server)
+        connection.ehlo()
+        if self.ttls:
+            connection.starttls()
+            connection.ehlo()
+        if self.login:
+            connection.login(self.username, self.password)
+        with self._lock:
+            self.connections_opened += 1
+        return connection
+
+    def acquire(self):
+        """Return a ``[connection, messages_sent]`` pair, opening a connection
+        if none is idle. Blocks while ``size`` connections are in use.
+        """
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except Queue.Empty:
+            pass
+        try:
+            return [self._connect(), 0]
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, entry):
+        if entry[1] >= self.batch_size:
+            self._quit(entry[0])
+        else:
+            self._idle.put(entry)
+        self._slots.release()
+
+    def discard(self, entry):
+        """Close a connection that failed instead of returning it to the pool."""
+        self._quit(entry[0])
+        self._slots.release()
+
+    def _quit(self, connection):
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, socket.error):
+            connection.close()
+
+    def close(self):
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except Queue.Empty:
+                return
+            self._quit(connection)
+
+
+class Mailer(object):
+    """Send `Message` objects through a `SMTPConnectionPool`, retrying each
+    message up to ``retries`` times, and keep throughput metrics.
+    """
+    def __init__(self, pool=None, retries=None, backoff=None):
+        self.pool = pool or SMTPConnectionPool()
+        self.retries = settings.MAIL_RETRIES if retries is None else retries
+        self.backoff = settings.MAIL_RETRY_BACKOFF if backoff is None else backoff
+        self.stats = collections.Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    def send(self, message):
+        """Send ``message``. Return whether it was accepted by the server."""
+        start = time.time()
+        try:
+            for attempt in range(self.retries + 1):
+                entry = None
+                try:
+                    entry = self.pool.acquire()
+                    entry[0].sendmail(
+                        message.from_addr,
+                        [message.to_addr],
+                        build_message(*message),
+                    )
+                except RETRY_ERRORS as error:
+                    if entry is not None:
+                        self.pool.discard(entry)
+                    if attempt == self.retries:
+                        logger.error(u'Failed to send email to {0}: {1}'.format(message.to_addr, error))
+                        break
+                    self._count('retries')
+                    time.sleep(self.backoff * 2 ** attempt)
+                except smtplib.SMTPException as error:
+                    # Rejected by the server; retrying will not help
+                    if entry is not None:
+                        self.pool.discard(entry)
+                    logger.error(u'Failed to send email to {0}: {1}'.format(message.to_addr, error))
+                    break
+                else:
+                    entry[1] += 1
+                    self.pool.release(entry)
+                    self._count('sent')
+                    return True
+            self._count('failed')
+            return False
+        finally:
+            self._count('seconds', time.time() - start)
+
+    def send_many(self, messages):
+        """Send ``messages`` with one thread per connection in the pool.
+        Return a list of booleans, whether each message was sent.
+        """
+        results = [False] * len(messages)
+        pending = Queue.Queue()
+        for index, message in enumerate(messages):
+            pending.put((index, message))
+
+        def work():
+            while True:
+                try:
+                    index, message = pending.get_nowait()
+                except Queue.Empty:
+                    return
+                results[index] = self.send(message)
+
+        start = time.time()
+        workers = [threading.Thread(target=work) for _ in range(min(self.pool.size, len(messages)))]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self._count('elapsed_seconds', time.time() - start)
+        return results
+
+    def close(self):
+        self.pool.close()
+
+    def get_stats(self):
+        with self._lock:
+            stats = {
+                'sent': self.stats['sent'],
+                'failed': self.stats['failed'],
+                'retries': self.stats['retries'],
+                'send_seconds': self.stats['seconds'],
+                'elapsed_seconds': self.stats['elapsed_seconds'],
+            }
+        stats['connections_opened'] = self.pool.connections_opened
+        stats['messages_per_second'] = (
+            stats['sent'] / stats['elapsed_seconds']
+            if stats['elapsed_seconds'] else 0
+        )
+        return stats
@@ -1,8 +1,8 @@
 import smtplib
 import logging
-from email.mime.text import MIMEText
 
 from framework.tasks import app
+from framework.email.mailer import build_message
 from website import settings
 
 logger = logging.getLogger(__name__)
@@ -32,11 +32,6 @@ def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True,
         logger.error('Mail username and password not set; skipping send.')
         return
 
-    msg = MIMEText(message, mimetype, _charset='utf-8')
-    msg['Subject'] = subject
-    msg['From'] = from_addr
-    msg['To'] = to_addr
-
     s = smtplib.SMTP(mail_server)
     s.ehlo()
     if ttls:
@@ -47,7 +42,7 @@ def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True,
     s.sendmail(
         from_addr=from_addr,
         to_addrs=[to_addr],
-        msg=msg.as_string()
+        msg=build_message(from_addr, to_addr, subject, message, mimetype)
     )
     s.quit()
     return True
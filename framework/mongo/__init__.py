@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
 
+import collections
+
 from flask import request
+from modularodm import Q
 from modularodm.storedobject import StoredObject as GenericStoredObject
 from modularodm.ext.concurrency import with_proxies, proxied_members
 
 from bson import ObjectId
 from .handlers import client, database, set_up_storage
 
+from framework.transactions import read_only
+
 
 from api.base.api_globals import api_globals
 
@@ -33,7 +38,57 @@ def get_cache_key():
 
 @with_proxies(proxied_members, get_cache_key)
 class StoredObject(GenericStoredObject):
-    pass
+
+    # ForeignList fields that `prefetch` may load in bulk, mapped to the name
+    # of the schema they reference; None for AbstractForeignField lists
+    __prefetch__ = {}
+
+    @classmethod
+    def load_many(cls, keys):
+        """Load objects by primary key with a single query for those not
+        already in the request's object cache.
+
+        :param keys: Iterable of primary keys
+        :return list: Objects in the order of ``keys``; None for missing keys
+        """
+        keys = list(keys)
+        missing = [key for key in set(keys) if cls._load_from_cache(key) is None]
+        if missing:
+            # Loading the results stores them in the object cache
+            list(cls.find(Q(cls._primary_name, 'in', missing)))
+        return [cls._load_from_cache(key) for key in keys]
+
+    def prefetch(self, *field_names):
+        """Load the objects referenced by the ForeignList fields
+        ``field_names`` with one query per referenced schema, so that
+        iterating the fields does not query for each item. Fields must be
+        declared in ``__prefetch__``.
+        """
+        keys = collections.defaultdict(set)
+        for field_name in field_names:
+            schema = self.__prefetch__[field_name]
+            if schema is None:
+                # Abstract lists store a (key, schema) pair for each item
+                for key, key_schema in getattr(self, field_name)._to_data():
+                    keys[key_schema].add(key)
+            else:
+                keys[schema].update(getattr(self, field_name)._to_primary_keys())
+        for schema, schema_keys in keys.items():
+            self.get_collection(schema).load_many(schema_keys)
+
+    def save(self, *args, **kwargs):
+        read_only.check_write(self)
+        return super(StoredObject, self).save(*args, **kwargs)
+
+    @classmethod
+    def remove_one(cls, *args, **kwargs):
+        read_only.check_write(cls)
+        return super(StoredObject, cls).remove_one(*args, **kwargs)
+
+    @classmethod
+    def remove(cls, *args, **kwargs):
+        read_only.check_write(cls)
+        return super(StoredObject, cls).remove(*args, **kwargs)
 
 
 __all__ = [
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 
+import os
 import logging
+import threading
+import collections
 
 import pymongo
 from flask import g
@@ -13,9 +16,14 @@ logger = logging.getLogger(__name__)
 
 
 def get_mongo_client():
-    """Create MongoDB client and authenticate database.
+    """Create MongoDB client and authenticate database. Credentials are cached
+    on the client, so every socket in its pool is authenticated on checkout.
     """
-    client = pymongo.MongoClient(settings.DB_HOST, settings.DB_PORT)
+    client = pymongo.MongoClient(
+        settings.DB_HOST,
+        settings.DB_PORT,
+        max_pool_size=settings.DB_MAX_POOL_SIZE,
+    )
 
     db = client[settings.DB_NAME]
 
@@ -25,17 +33,81 @@ def get_mongo_client():
     return client
 
 
+class ClientManager(object):
+    """Owner of the process-wide pooled MongoDB client.
+
+    The client is created lazily and re-created after a fork, since pymongo
+    sockets must not be shared between processes. TokuMX transactions are
+    bound to a connection, so each request pins one socket from the pool with
+    ``start_request`` and returns it with ``end_request``.
+
+    :param factory: Callable returning a new authenticated client
+    """
+    def __init__(self, factory=get_mongo_client):
+        self.factory = factory
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stats = collections.Counter()
+
+    @property
+    def client(self):
+        pid = os.getpid()
+        if self._client is None or self._pid != pid:
+            with self._lock:
+                if self._client is None or self._pid != pid:
+                    if self._client is not None:
+                        self._stats['forks'] += 1
+                    self._client = self.factory()
+                    self._pid = pid
+                    self._stats['clients_created'] += 1
+        return self._client
+
+    def start_request(self):
+        """Pin a pooled socket to the current thread and return the client."""
+        client = self.client
+        client.start_request()
+        self._stats['requests_started'] += 1
+        return client
+
+    def end_request(self, client=None):
+        """Return the socket pinned to the current thread to the pool."""
+        (client or self.client).end_request()
+        self._stats['requests_ended'] += 1
+
+    def get_stats(self):
+        """Return counts of the clients this manager created and of the
+        requests that pinned a socket through it. ``requests_active`` is the
+        number of requests holding a pinned socket, which bounds how many
+        pooled sockets requests use; pymongo does not report the sockets its
+        pool actually holds or the threads waiting for one.
+        """
+        stats = {
+            'clients_created': 0,
+            'forks': 0,
+            'requests_started': 0,
+            'requests_ended': 0,
+        }
+        stats.update(self._stats)
+        stats['requests_active'] = stats['requests_started'] - stats['requests_ended']
+        stats['max_pool_size'] = settings.DB_MAX_POOL_SIZE
+        return stats
+
+
+client_manager = ClientManager()
+
+
 def connection_before_request():
-    """Attach MongoDB client to `g`.
+    """Pin a socket from the shared pool and attach the client to `g`.
     """
-    g._mongo_client = get_mongo_client()
+    g._mongo_client = client_manager.start_request()
 
 
 def connection_teardown_request(error=None):
-    """Close MongoDB client if attached to `g`.
+    """Release the socket pinned by `connection_before_request`.
     """
     try:
-        g._mongo_client.close()
+        client_manager.end_request(g._mongo_client)
     except AttributeError:
         if not settings.DEBUG_MODE:
             logger.error('MongoDB client not attached to request.')
@@ -47,10 +119,6 @@ handlers = {
 }
 
 
-# Set up getters for `LocalProxy` objects
-_mongo_client = get_mongo_client()
-
-
 def _get_current_client():
     """Getter for `client` proxy. Return default client if no client attached
     to `g` or no request context.
@@ -58,7 +126,7 @@ def _get_current_client():
     try:
         return g._mongo_client
     except (AttributeError, RuntimeError):
-        return _mongo_client
+        return client_manager.client
 
 
 def _get_current_database():
@@ -1,17 +1,19 @@
 # -*- coding: utf-8 -*-
 import os
+import re
+import time
 import logging
 import copy
 import json
 import functools
+import HTMLParser
 import httplib as http
 
-import lxml.html
 import werkzeug.wrappers
 from werkzeug.exceptions import NotFound
 from mako.template import Template
 from mako.lookup import TemplateLookup
-from flask import request, make_response
+from flask import g, request, make_response
 
 from framework import sentry
 from framework.flask import app, redirect
@@ -217,7 +219,9 @@ def render_mako_string(tpldir, tplname, data, trust=True):
 
     lookup_obj = _TPL_LOOKUP_SAFE if trust is False else _TPL_LOOKUP
 
-    tpl = mako_cache.get(tplname)
+    # Trusted and escaped compilations of a template differ
+    cache_key = (tpldir, tplname, trust is not False)
+    tpl = mako_cache.get(cache_key)
     if tpl is None:
         with open(os.path.join(tpldir, tplname)) as f:
             tpl_text = f.read()
@@ -232,7 +236,7 @@ def render_mako_string(tpldir, tplname, data, trust=True):
         )
     # Don't cache in debug mode
     if not app.debug:
-        mako_cache[tplname] = tpl
+        mako_cache[cache_key] = tpl
     return tpl.render(**data)
 
 
@@ -296,6 +300,110 @@ def call_url(url, view_kwargs=None):
 
     return rv
 
+### Page assembly ###
+
+# Opening tag of an element with a mod-meta attribute, or an HTML comment
+# (which is skipped)
+_MOD_META_PATTERN = re.compile(
+    r'<!--.*?-->|'
+    r'<(?P<tag>[a-zA-Z][\w-]*)\b[^>]*?\smod-meta\s*=\s*'
+    r'(?P<quote>[\'"])(?P<meta>.*?)(?P=quote)[^>]*?(?P<empty>/?)>',
+    re.DOTALL,
+)
+_tag_patterns = {}
+_html_parser = HTMLParser.HTMLParser()
+
+
+class Include(object):
+    """Point in rendered HTML where a nested template is rendered.
+
+    :param str meta: JSON value of the element's mod-meta attribute
+    :param str open_tag: Opening tag of the element
+    :param str close_tag: Closing tag of the element
+    """
+    def __init__(self, meta, open_tag, close_tag):
+        self.meta = meta
+        self.open_tag = open_tag
+        self.close_tag = close_tag
+
+
+def _get_tag_pattern(tag):
+    tag = tag.lower()
+    if tag not in _tag_patterns:
+        _tag_patterns[tag] = re.compile(
+            r'<(?P<close>/?){0}\b[^>]*?(?P<empty>/?)>'.format(re.escape(tag)),
+            re.IGNORECASE,
+        )
+    return _tag_patterns[tag]
+
+
+def _find_close_tag(html, tag, start):
+    """Return the span of the tag closing the ``tag`` element whose content
+    starts at ``start``, or None if it is never closed.
+    """
+    depth = 1
+    for match in _get_tag_pattern(tag).finditer(html, start):
+        if match.group('close'):
+            depth -= 1
+            if depth == 0:
+                return match.span()
+        elif not match.group('empty'):
+            depth += 1
+    return None
+
+
+def compile_fragments(html):
+    """Split rendered HTML into a plan of literal strings and `Include`
+    points, one for each element with a mod-meta attribute. Elements nested
+    in an include point are part of it and are not planned separately.
+
+    :param str html: Rendered HTML
+    :return list: Strings and `Include` objects, in document order
+    """
+    if 'mod-meta' not in html:
+        return [html]
+    plan = []
+    position = 0
+    for match in _MOD_META_PATTERN.finditer(html):
+        if match.start() < position or not match.group('tag'):
+            continue
+        if match.group('empty'):
+            span = (match.end(), match.end())
+        else:
+            span = _find_close_tag(html, match.group('tag'), match.end())
+            if span is None:
+                continue
+        plan.append(html[position:match.start()])
+        plan.append(Include(
+            meta=_html_parser.unescape(match.group('meta')),
+            open_tag=match.group(0),
+            close_tag=html[span[0]:span[1]],
+        ))
+        position = span[1]
+    plan.append(html[position:])
+    return plan
+
+
+def get_fragment_timings():
+    """Return ``(template, uri, seconds)`` for each nested template rendered
+    in the current request.
+    """
+    return getattr(g, '_fragment_timings', [])
+
+
+def _record_fragment_timing(include, seconds):
+    try:
+        meta = json.loads(include.meta)
+    except ValueError:
+        meta = {}
+    timing = (meta.get('tpl'), meta.get('uri'), seconds)
+    logger.debug('Rendered fragment {0} ({1}) in {2:.1f} ms'.format(timing[0], timing[1], seconds * 1000))
+    try:
+        g._fragment_timings = get_fragment_timings() + [timing]
+    except RuntimeError:  # Not in an application context
+        pass
+
+
 ### Renderers ###
 
 class Renderer(object):
@@ -470,8 +578,16 @@ class WebRenderer(Renderer):
         :param data: Dictionary to be passed to the template as context
         :return: 2-tuple: (<result>, <flag: replace div>)
         """
-        attributes_string = element.get("mod-meta")
+        return self.render_meta(element.get("mod-meta"), data)
+
+    def render_meta(self, attributes_string, data):
+        """Render the embedded template described by the value of a mod-meta
+        attribute.
 
+        :param str attributes_string: JSON value of the mod-meta attribute
+        :param data: Dictionary to be passed to the template as context
+        :return: 2-tuple: (<result>, <flag: replace div>)
+        """
         # Return debug <div> if JSON cannot be parsed
         try:
             element_meta = json.loads(attributes_string)
@@ -548,49 +664,29 @@ class WebRenderer(Renderer):
         except IOError:
             return '<div>Template {} not found.</div>'.format(template_name)
 
-        html = lxml.html.fragment_fromstring(rendered, create_parent='remove')
-
-        for element in html.findall('.//*[@mod-meta]'):
+        return self.assemble(compile_fragments(rendered), data)
 
-            # Render nested template
-            template_rendered, is_replace = self.render_element(element, data)
+    def assemble(self, plan, data):
+        """Render the include points of a fragment plan and concatenate the
+        page. Nested templates are planned from their own output only.
 
-            original = lxml.html.tostring(element)
+        :param list plan: Output of `compile_fragments`
+        :param data: Data dictionary from view function
+        :return: Rendered HTML
+        """
+        parts = []
+        for fragment in plan:
+            if not isinstance(fragment, Include):
+                parts.append(fragment)
+                continue
+            start = time.time()
+            template_rendered, is_replace = self.render_meta(fragment.meta, data)
+            _record_fragment_timing(fragment, time.time() - start)
             if is_replace:
-                replacement = template_rendered
+                parts.append(template_rendered)
             else:
-                replacement = original
-                replacement = replacement.replace('><', '>' + template_rendered + '<')
-
-            rendered = rendered.replace(original, replacement)
-
-        ## Parse HTML using html5lib; lxml is too strict and e.g. throws
-        ## errors if missing parent container; htmlparser mangles whitespace
-        ## and breaks replacement
-        #parsed = BeautifulSoup(rendered, 'html5lib')
-        #subtemplates = parsed.find_all(
-        #    lambda tag: tag.has_attr('mod-meta')
-        #)
-        #
-        #for element in subtemplates:
-        #
-        #    # Extract HTML of original element
-        #    element_html = str(element)
-        #
-        #    # Render nested template
-        #    template_rendered, is_replace = self.render_element(element, data)
-        #
-        #    # Build replacement
-        #    if is_replace:
-        #        replacement = template_rendered
-        #    else:
-        #        element.string = template_rendered
-        #        replacement = str(element)
-        #
-        #    # Replace
-        #    rendered = rendered.replace(element_html, replacement)
-
-        return rendered
+                parts.extend((fragment.open_tag, template_rendered, fragment.close_tag))
+        return ''.join(parts)
 
     def render(self, data, redirect_url, *args, **kwargs):
         """Render output of view function to HTML, following redirects
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import time
 import furl
 import urllib
 import urlparse
@@ -19,6 +20,7 @@ from framework.mongo import database
 from website import settings
 
 from .model import Session
+from .backends import get_backend
 
 
 def add_key_to_url(url, scheme, key):
@@ -98,12 +100,12 @@ def create_session(response, data=None):
     current_session = get_session()
     if current_session:
         current_session.data.update(data or {})
-        current_session.save()
+        get_backend().save(current_session)
         cookie_value = itsdangerous.Signer(settings.SECRET_KEY).sign(current_session._id)
     else:
         session_id = str(bson.objectid.ObjectId())
         session = Session(_id=session_id, data=data or {})
-        session.save()
+        get_backend().save(session)
         cookie_value = itsdangerous.Signer(settings.SECRET_KEY).sign(session_id)
         set_session(session)
     if response is not None:
@@ -173,15 +175,32 @@ def before_request():
     if cookie:
         try:
             session_id = itsdangerous.Signer(settings.SECRET_KEY).unsign(cookie)
-            session = Session.load(session_id) or Session(_id=session_id)
+            session = get_backend().load(session_id)
         except itsdangerous.BadData:
             return
+        if session is None:
+            session = Session(_id=session_id)
+            session.mark_clean()
         if session.data.get('auth_user_id'):
-            database['user'].update({'_id': session.data.get('auth_user_id')}, {'$set': {'date_last_login': datetime.utcnow()}}, w=0)
+            touch_session(session)
         set_session(session)
 
+
+def touch_session(session):
+    """Record activity on an authenticated session at most once every
+    ``settings.SESSION_TOUCH_INTERVAL`` seconds: update the user's
+    ``date_last_login`` and change the session, so that its next save resets
+    its expiry.
+    """
+    now = time.time()
+    if now - session.data.get('last_touched', 0) < settings.SESSION_TOUCH_INTERVAL:
+        return
+    session.data['last_touched'] = now
+    database['user'].update({'_id': session.data.get('auth_user_id')}, {'$set': {'date_last_login': datetime.utcnow()}}, w=0)
+
+
 def after_request(response):
-    if session.data.get('auth_user_id'):
-        session.save()
+    if session.data.get('auth_user_id') and session.is_dirty:
+        get_backend().save(session)
 
     return response
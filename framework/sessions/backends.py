@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Storage backends for `Session` objects used by the request handlers. Each
+backend records the number and latency of its loads and saves.
+"""
+
+import copy
+import time
+import functools
+import threading
+import collections
+
+from modularodm import Q
+
+from website import settings
+
+from .model import Session
+
+
+def timed(operation):
+    def wrapper(func):
+        @functools.wraps(func)
+        def wrapped(self, *args, **kwargs):
+            start = time.time()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                self._record(operation, time.time() - start)
+        return wrapped
+    return wrapper
+
+
+class SessionBackend(object):
+
+    OPERATIONS = ('load', 'save', 'remove')
+
+    def __init__(self):
+        self._stats = collections.Counter()
+        self._max = collections.Counter()
+        self._lock = threading.Lock()
+
+    def _record(self, operation, seconds):
+        with self._lock:
+            self._stats['{0}_count'.format(operation)] += 1
+            self._stats['{0}_seconds'.format(operation)] += seconds
+            key = '{0}_max_seconds'.format(operation)
+            self._max[key] = max(self._max[key], seconds)
+
+    def load(self, session_id):
+        """Return the stored session ``session_id``, marked clean, or `None`."""
+        raise NotImplementedError
+
+    def save(self, session):
+        """Store ``session`` and mark it clean."""
+        raise NotImplementedError
+
+    def remove(self, session_id):
+        raise NotImplementedError
+
+    def get_stats(self):
+        with self._lock:
+            stats = {}
+            for operation in self.OPERATIONS:
+                count = self._stats['{0}_count'.format(operation)]
+                seconds = self._stats['{0}_seconds'.format(operation)]
+                stats['{0}_count'.format(operation)] = count
+                stats['{0}_seconds'.format(operation)] = seconds
+                stats['{0}_mean_seconds'.format(operation)] = seconds / count if count else 0
+                stats['{0}_max_seconds'.format(operation)] = self._max['{0}_max_seconds'.format(operation)]
+            return stats
+
+
+class MongoSessionBackend(SessionBackend):
+
+    @timed('load')
+    def load(self, session_id):
+        session = Session.load(session_id)
+        if session is not None:
+            session.mark_clean()
+        return session
+
+    @timed('save')
+    def save(self, session):
+        session.save()
+
+    @timed('remove')
+    def remove(self, session_id):
+        Session.remove(Q('_id', 'eq', session_id))
+
+
+class MemorySessionBackend(SessionBackend):
+    """Process-local stand-in for `MongoSessionBackend`; stores a copy of the
+    data of each session.
+    """
+    def __init__(self):
+        super(MemorySessionBackend, self).__init__()
+        self._data = {}
+
+    @timed('load')
+    def load(self, session_id):
+        data = self._data.get(session_id)
+        if data is None:
+            return None
+        session = Session(_id=session_id, data=copy.deepcopy(data))
+        session.mark_clean()
+        return session
+
+    @timed('save')
+    def save(self, session):
+        self._data[session._id] = copy.deepcopy(session.data)
+        session.mark_clean()
+
+    @timed('remove')
+    def remove(self, session_id):
+        self._data.pop(session_id, None)
+
+    def clear(self):
+        self._data.clear()
+
+
+BACKENDS = {
+    'mongo': MongoSessionBackend,
+    'memory': MemorySessionBackend,
+}
+
+_backends = {}
+
+
+def get_backend(name=None):
+    """Return the shared instance of backend ``name``, by default
+    ``settings.SESSION_BACKEND``.
+    """
+    name = name or settings.SESSION_BACKEND
+    if name not in _backends:
+        _backends[name] = BACKENDS[name]()
+    return _backends[name]
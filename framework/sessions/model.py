@@ -1,13 +1,25 @@
 # -*- coding: utf-8 -*-
 
+import json
+import hashlib
+
+import pymongo
 from bson import ObjectId
 from modularodm import fields
 
 from framework.mongo import StoredObject
 
+from website import settings
+
 
 class Session(StoredObject):
 
+    # Expire sessions that have not been saved for SESSION_TTL seconds
+    __indices__ = [{
+        'key_or_list': [('date_modified', pymongo.ASCENDING)],
+        'expireAfterSeconds': settings.SESSION_TTL,
+    }]
+
     _id = fields.StringField(primary=True, default=lambda: str(ObjectId()))
     date_created = fields.DateTimeField(auto_now_add=True)
     date_modified = fields.DateTimeField(auto_now=True)
@@ -16,3 +28,24 @@ class Session(StoredObject):
     @property
     def is_authenticated(self):
         return 'auth_user_id' in self.data
+
+    def get_data_hash(self):
+        return hashlib.md5(json.dumps(self.data, sort_keys=True, default=str)).hexdigest()
+
+    def mark_clean(self):
+        """Record the current data as the data last read from or written to
+        the database.
+        """
+        self._clean_hash = self.get_data_hash()
+
+    @property
+    def is_dirty(self):
+        """Whether the data has changed since `mark_clean` was last called.
+        Sessions never marked clean are always dirty.
+        """
+        return self.get_data_hash() != getattr(self, '_clean_hash', None)
+
+    def save(self, *args, **kwargs):
+        rv = super(Session, self).save(*args, **kwargs)
+        self.mark_clean()
+        return rv
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import logging
 from framework.mongo import database as proxy_database
+from framework.mongo.handlers import client_manager
 from website import settings as osfsettings
 
 logger = logging.getLogger(__name__)
@@ -27,9 +28,11 @@ def show_live(database=None):
 
 
 def disconnect(database=None):
+    """Return the socket pinned to the current thread to the shared pool.
+    """
     database = database or proxy_database
     try:
-        database.connection.close()
+        client_manager.end_request(database.connection)
     except AttributeError:
         if not osfsettings.DEBUG_MODE:
             logger.error('MongoDB client not attached to request.')
@@ -6,7 +6,7 @@ import logging
 from flask import request, current_app
 from pymongo.errors import OperationFailure
 
-from framework.transactions import utils, commands, messages
+from framework.transactions import utils, commands, messages, read_only
 
 from website import settings
 
@@ -22,20 +22,40 @@ def no_auto_transaction(func):
     return func
 
 
-def view_has_annotation(attr):
+def get_current_view():
     try:
         endpoint = request.url_rule.endpoint
     except (RuntimeError, AttributeError):
+        return None
+    return current_app.view_functions[endpoint]
+
+
+def view_has_annotation(attr):
+    return getattr(get_current_view(), attr, False)
+
+
+def skip_transaction():
+    """Whether the current request should run without a transaction, either
+    because the view manages its own transactions or because the request is
+    read-only.
+    """
+    if view_has_annotation(NO_AUTO_TRANSACTION_ATTR):
+        return True
+    try:
+        return read_only.is_marked(request._get_current_object())
+    except RuntimeError:
         return False
-    view = current_app.view_functions[endpoint]
-    return getattr(view, attr, False)
 
 
 def transaction_before_request():
-    """Setup transaction before handling the request.
+    """Setup transaction before handling the request. Read-only requests
+    skip both the rollback probe and `beginTransaction`.
     """
     if view_has_annotation(NO_AUTO_TRANSACTION_ATTR):
         return None
+    if read_only.is_read_only(request.method, get_current_view()):
+        read_only.mark(request._get_current_object(), commands_skipped=2)
+        return None
     try:
         commands.rollback()
         logger.error('Transaction already in progress; rolling back.')
@@ -51,7 +71,9 @@ def transaction_after_request(response):
     uncaught exception occurred, else commit. If the commit fails due to a lock
     error, rollback and return error response.
     """
-    if view_has_annotation(NO_AUTO_TRANSACTION_ATTR):
+    if skip_transaction():
+        if read_only.is_marked(request._get_current_object()):
+            read_only.record_skipped()
         return response
     if response.status_code >= 500:
         commands.rollback()
@@ -72,7 +94,7 @@ def transaction_teardown_request(error=None):
     reached in debug mode, since uncaught errors are raised for use in the
     Werkzeug debugger.
     """
-    if view_has_annotation(NO_AUTO_TRANSACTION_ATTR):
+    if skip_transaction():
         return None
     if error is not None:
         if not settings.DEBUG_MODE:
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Read-only request mode. Requests in this mode skip the TokuMX
+begin/commit commands entirely; any write attempted through a
+`StoredObject` is counted and logged so that misclassified views can be
+found and fixed.
+"""
+
+import logging
+import collections
+
+from website import settings
+
+
+READ_ONLY_ATTR = '_read_only'
+SAFE_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+logger = logging.getLogger(__name__)
+
+_stats = collections.Counter()
+
+
+def read_only(func):
+    """Mark a view as read-only: no transaction is started for it and writes
+    made while handling it are reported.
+    """
+    setattr(func, READ_ONLY_ATTR, True)
+    return func
+
+
+def is_read_only(method, view=None):
+    """Whether a request for ``view`` using HTTP ``method`` should run in
+    read-only mode.
+    """
+    if getattr(view, READ_ONLY_ATTR, False):
+        return True
+    return settings.READ_ONLY_SAFE_METHODS and method in SAFE_METHODS
+
+
+def mark(request, commands_skipped=0):
+    """Flag ``request`` as read-only and count the transaction commands that
+    will not be sent for it.
+    """
+    setattr(request, READ_ONLY_ATTR, True)
+    record_skipped(commands_skipped)
+
+
+def is_marked(request=None):
+    if request is None:
+        # TODO: Remove circular import
+        from framework.mongo import get_cache_key
+        request = get_cache_key()
+    return getattr(request, READ_ONLY_ATTR, False) is True
+
+
+def record_skipped(count=1):
+    _stats['commands_skipped'] += count
+
+
+def check_write(obj):
+    """Report a write made during a read-only request. The write is not
+    blocked; outside a transaction it is committed immediately.
+    """
+    if not is_marked():
+        return
+    _stats['writes_detected'] += 1
+    logger.warning(
+        'Write to {0!r} during read-only request; this view should not be '
+        'marked read-only'.format(getattr(obj, '_name', obj))
+    )
+
+
+def get_stats():
+    stats = {'commands_skipped': 0, 'writes_detected': 0}
+    stats.update(_stats)
+    return stats
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Compare the single-pass filter planner of `ListFilterMixin` with the former
+set-intersection implementation on large in-memory lists.
+
+    python -m scripts.benchmark_list_filters [size]
+"""
+
+import os
+import sys
+import timeit
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.base.settings')
+
+from rest_framework import serializers as ser
+
+from api.base.filters import ListFilterMixin
+
+
+class Item(object):
+
+    def __init__(self, index):
+        self._id = 'item{0}'.format(index)
+        self.title = 'Title {0}'.format(index)
+        self.size = index
+
+
+class ItemSerializer(ser.Serializer):
+
+    filterable_fields = ('id', 'title', 'size')
+
+    id = ser.CharField(source='_id')
+    title = ser.CharField()
+    size = ser.IntegerField()
+
+
+class PlannerView(ListFilterMixin):
+
+    serializer_class = ItemSerializer
+
+
+class LegacyView(PlannerView):
+    """The former implementation, which filters the whole list once per
+    filter group and intersects the results.
+    """
+
+    def param_queryset(self, query_params, default_queryset):
+        filters = self.parse_query_params(query_params)
+        queryset = set(default_queryset)
+        if filters:
+            for field_name, params in filters.iteritems():
+                for group in params:
+                    queryset = queryset.intersection(set(self.get_filtered_queryset(field_name, group, default_queryset)))
+        return list(queryset)
+
+    def get_filtered_queryset(self, field_name, params, default_queryset):
+        field = self.serializer_class._declared_fields[field_name]
+        field_name = self.convert_key(field_name, field)
+
+        if isinstance(field, ser.SerializerMethodField):
+            return_val = [
+                item for item in default_queryset
+                if self.FILTERS[params['op']](self.get_serializer_method(field_name)(item), params['value'])
+            ]
+        elif isinstance(field, ser.CharField):
+            return_val = [
+                item for item in default_queryset
+                if params['value'] in getattr(item, field_name, {}).lower()
+            ]
+        else:
+            return_val = [
+                item for item in default_queryset
+                if self.FILTERS[params['op']](getattr(item, field_name, None), params['value'])
+            ]
+
+        return return_val
+
+
+QUERIES = [
+    {'filter[size][gte]': '100'},
+    {'filter[size][gte]': '100', 'filter[size][lt]': '5000'},
+    {'filter[size][gte]': '100', 'filter[title]': 'title 9'},
+]
+
+
+def main(size=10000, repeat=5):
+    items = [Item(index) for index in range(size)]
+    for query_params in QUERIES:
+        timings = {}
+        for name, view in (('legacy', LegacyView()), ('planner', PlannerView())):
+            timings[name] = min(timeit.repeat(
+                lambda: view.param_queryset(query_params, items),
+                repeat=repeat,
+                number=1,
+            ))
+        print '{0}: legacy {1:.4f}s, planner {2:.4f}s ({3:.1f}x)'.format(
+            sorted(query_params.items()),
+            timings['legacy'],
+            timings['planner'],
+            timings['legacy'] / timings['planner'],
+        )
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,42 @@
+""" Backfill Node.retracted for registrations retracted before the field was
+added, and for their primary descendants.
+"""
+
+import logging
+import sys
+from modularodm import Q
+from website import models
+from website.app import init_app
+from scripts import utils as scripts_utils
+from framework.transactions.context import TokuTransaction
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+def main():
+    init_app(routes=False)
+    dry_run = 'dry' in sys.argv
+    count = 0
+
+    if not dry_run:
+        scripts_utils.add_file_logger(logger, __file__)
+    logger.info("Iterating approved retractions")
+    with TokuTransaction():
+        for registration in get_retracted_registrations():
+            for node in registration.node_and_primary_descendants():
+                if node.retracted:
+                    continue
+                node.retracted = True
+                count += 1
+                logger.info(repr(node))
+                if not dry_run:
+                    node.save()
+
+    logger.info('Done with {} nodes migrated'.format(count))
+
+def get_retracted_registrations():
+    retractions = models.Retraction.find(Q('state', 'eq', models.Retraction.APPROVED))
+    return models.Node.find(Q('retraction', 'in', [retraction._id for retraction in retractions]))
+
+if __name__ == '__main__':
+    main()
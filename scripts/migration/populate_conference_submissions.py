@@ -0,0 +1,28 @@
+""" Build the materialized submission lists and counts of every conference.
+"""
+
+import logging
+import sys
+from website.app import init_app
+from website.conferences.model import Conference
+from website.conferences.submissions import rebuild_submissions
+from scripts import utils as scripts_utils
+from framework.transactions.context import TokuTransaction
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+def main():
+    init_app(routes=False)
+    dry_run = 'dry' in sys.argv
+
+    if not dry_run:
+        scripts_utils.add_file_logger(logger, __file__)
+    with TokuTransaction():
+        for conf in Conference.find():
+            if not dry_run:
+                rebuild_submissions(conf)
+            logger.info('{0}: {1} submissions'.format(conf.endpoint, conf.num_submissions))
+
+if __name__ == '__main__':
+    main()
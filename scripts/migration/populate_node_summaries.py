@@ -0,0 +1,31 @@
+""" Build the dashboard summary of every node.
+"""
+
+import logging
+import sys
+from website.app import init_app
+from website.models import Node
+from website.project.summaries import update_summary
+from scripts import utils as scripts_utils
+from framework.transactions.context import TokuTransaction
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+def main():
+    init_app(routes=False)
+    dry_run = 'dry' in sys.argv
+    count = 0
+
+    if not dry_run:
+        scripts_utils.add_file_logger(logger, __file__)
+    with TokuTransaction():
+        for node in Node.find():
+            if not dry_run:
+                update_summary(node)
+            count += 1
+
+    logger.info('Done with {} nodes summarized'.format(count))
+
+if __name__ == '__main__':
+    main()
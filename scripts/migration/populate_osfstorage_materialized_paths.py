@@ -0,0 +1,55 @@
+""" Store the materialized path and ancestors of every OsfStorage file node.
+Each tree is walked from its root one level at a time, with one query per
+level. Set ``OSFSTORAGE_ANCESTORS_POPULATED`` once this has run.
+"""
+
+import logging
+import sys
+from website.app import init_app
+from framework.mongo import database
+from scripts import utils as scripts_utils
+from framework.transactions.context import TokuTransaction
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+COLLECTION = 'storedfilenode'
+
+
+def update_tree(collection, root, dry_run=False):
+    """Update every file node under ``root``; return the number updated."""
+    count = 0
+    if not dry_run:
+        collection.update({'_id': root['_id']}, {'$set': {'materialized_path': '/', 'ancestors': []}})
+    parents = {root['_id']: ('/', [])}
+    while parents:
+        children = {}
+        for child in collection.find({'parent': {'$in': parents.keys()}}, {'name': 1, 'parent': 1, 'is_file': 1}):
+            path, ancestors = parents[child['parent']]
+            path = path + child['name'] + ('' if child['is_file'] else '/')
+            ancestors = ancestors + [child['parent']]
+            if not dry_run:
+                collection.update({'_id': child['_id']}, {'$set': {'materialized_path': path, 'ancestors': ancestors}})
+            if not child['is_file']:
+                children[child['_id']] = (path, ancestors)
+            count += 1
+        parents = children
+    return count
+
+
+def main():
+    init_app(routes=False)
+    dry_run = 'dry' in sys.argv
+    count = 0
+
+    if not dry_run:
+        scripts_utils.add_file_logger(logger, __file__)
+    collection = database[COLLECTION]
+    with TokuTransaction():
+        for root in collection.find({'provider': 'osfstorage', 'parent': None}, {'_id': 1}):
+            count += update_tree(collection, root, dry_run=dry_run)
+
+    logger.info('Done with {} file nodes migrated'.format(count))
+
+if __name__ == '__main__':
+    main()
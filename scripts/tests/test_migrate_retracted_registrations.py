@@ -0,0 +1,28 @@
+from modularodm import Q
+from tests.base import OsfTestCase
+from tests.factories import RegistrationFactory, RetractedRegistrationFactory, NodeFactory, UserFactory
+from nose.tools import *
+
+from website.models import Node
+from scripts.migration.migrate_retracted_registrations import main as do_migration
+
+class TestMigrateRetractedRegistrations(OsfTestCase):
+    def setUp(self):
+        super(TestMigrateRetractedRegistrations, self).setUp()
+        self.user = UserFactory()
+        self.project = NodeFactory(creator=self.user, is_public=True)
+        NodeFactory(creator=self.user, parent=self.project)
+        self.registration = RegistrationFactory(project=self.project, is_public=True)
+        RetractedRegistrationFactory(registration=self.registration, user=self.user)
+        self.other_registration = RegistrationFactory(creator=self.user, is_public=True)
+        # Simulate data written before Node.retracted existed
+        Node._storage[0].store.update({}, {'$unset': {'retracted': ''}}, multi=True)
+        Node._clear_caches()
+
+    def test_migrate_retracted_registrations(self):
+        do_migration()
+        retracted = Node.find(Q('retracted', 'eq', True))
+        expected = [self.registration] + self.registration.get_descendants_recursive()
+        assert_equal(set(retracted.get_keys()), set(node._id for node in expected))
+        self.other_registration.reload()
+        assert_false(self.other_registration.retracted)
@@ -361,10 +361,14 @@ def elasticsearch():
         print("Your system is not recognized, you will have to start elasticsearch manually")
 
 @task
-def migrate_search(delete=False, index=settings.ELASTIC_INDEX):
-    """Migrate the search-enabled models."""
+def migrate_search(delete=False, index=settings.ELASTIC_INDEX, processes=None, restart=False):
+    """Migrate the search-enabled models. An interrupted migration resumes
+    from its last checkpoint unless ``restart`` is given.
+    """
+    import multiprocessing
     from website.search_migration.migrate import migrate
-    migrate(delete, index=index)
+    processes = int(processes) if processes else multiprocessing.cpu_count()
+    migrate(delete, index=index, processes=processes, resume=not restart)
 
 @task
 def rebuild_search():
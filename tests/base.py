@@ -129,6 +129,10 @@ class DbTestCase(unittest.TestCase):
         cls._original_bcrypt_log_rounds = settings.BCRYPT_LOG_ROUNDS
         settings.BCRYPT_LOG_ROUNDS = 1
 
+        # Write analytics counters through, so they never outlive a test database
+        cls._original_analytics_counter_buffer_size = settings.ANALYTICS_COUNTER_BUFFER_SIZE
+        settings.ANALYTICS_COUNTER_BUFFER_SIZE = 0
+
         teardown_database(database=database_proxy._get_current_object())
         # TODO: With `database` as a `LocalProxy`, we should be able to simply
         # this logic
@@ -151,6 +155,7 @@ class DbTestCase(unittest.TestCase):
         settings.PIWIK_HOST = cls._original_piwik_host
         settings.ENABLE_EMAIL_SUBSCRIPTIONS = cls._original_enable_email_subscriptions
         settings.BCRYPT_LOG_ROUNDS = cls._original_bcrypt_log_rounds
+        settings.ANALYTICS_COUNTER_BUFFER_SIZE = cls._original_analytics_counter_buffer_size
 
 
 class AppTestCase(unittest.TestCase):
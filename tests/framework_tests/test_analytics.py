@@ -5,15 +5,21 @@ Unit tests for analytics logic in framework/analytics/__init__.py
 
 import unittest
 
+import mock
+
 from nose.tools import *  # flake8: noqa  (PEP8 asserts)
 from flask import Flask
 
 from datetime import datetime
 
 from framework import analytics, sessions
+from framework.analytics import counters
+from framework.analytics.bloom import BloomFilter
+from framework.analytics.counters import CounterBuffer
 from framework.sessions import session
 
 from tests.base import OsfTestCase
+from website import settings
 from tests.factories import UserFactory, ProjectFactory
 
 
@@ -40,6 +46,104 @@ class TestAnalytics(OsfTestCase):
         assert_equal(user.get_activity_points(db=self.db), 1)
 
 
+class TestBloomFilter(unittest.TestCase):
+
+    def test_add(self):
+        visited = BloomFilter(bits=1024, hashes=4)
+        assert_not_in('node:abc12', visited)
+        assert_true(visited.add('node:abc12'))
+        assert_in('node:abc12', visited)
+        assert_false(visited.add('node:abc12'))
+        assert_equal(visited.count, 1)
+
+    def test_unicode(self):
+        visited = BloomFilter(bits=1024, hashes=4)
+        visited.add(u'download:abc12:\u2603')
+        assert_in(u'download:abc12:\u2603', visited)
+
+    def test_round_trip(self):
+        visited = BloomFilter(bits=1024, hashes=4)
+        for index in range(50):
+            visited.add('node:{0}'.format(index))
+        loaded = BloomFilter.from_dict(visited.to_dict())
+        assert_equal(loaded.bits, 1024)
+        assert_equal(loaded.count, visited.count)
+        for index in range(50):
+            assert_in('node:{0}'.format(index), loaded)
+
+    def test_size_is_fixed(self):
+        visited = BloomFilter(bits=1024, hashes=4)
+        size = len(visited.to_dict()['bits'])
+        for index in range(500):
+            visited.add('node:{0}'.format(index))
+        assert_equal(len(visited.to_dict()['bits']), size)
+
+    def test_load_visited_resets_full_filter(self):
+        visited = BloomFilter()
+        visited.count = settings.SESSION_VISITED_FILTER_CAPACITY
+        visited.add('node:abc12')
+        assert_not_in('node:abc12', analytics.load_visited(visited.to_dict()))
+
+
+class TestCounterBuffer(OsfTestCase):
+
+    def setUp(self):
+        super(TestCounterBuffer, self).setUp()
+        self.buffer = CounterBuffer('pagecounters', max_pending=3, flush_interval=60)
+
+    def test_increments_are_aggregated(self):
+        self.buffer.increment('node:abc12', {'total': 1, 'unique': 1})
+        self.buffer.increment('node:abc12', {'total': 1})
+        assert_is_none(self.db['pagecounters'].find_one({'_id': 'node:abc12'}))
+        assert_equal(self.buffer.get_pending('node:abc12'), {'total': 2, 'unique': 1})
+        assert_equal(self.buffer.flush(), 1)
+        assert_equal(self.buffer.get_pending('node:abc12'), {})
+        result = self.db['pagecounters'].find_one({'_id': 'node:abc12'})
+        assert_equal((result['unique'], result['total']), (1, 2))
+
+    def test_flush_at_max_pending(self):
+        for _ in range(3):
+            self.buffer.increment('node:abc12', {'total': 1})
+        assert_equal(self.db['pagecounters'].find_one({'_id': 'node:abc12'})['total'], 3)
+        assert_equal(self.buffer.get_pending('node:abc12'), {})
+
+    def test_flush_after_interval(self):
+        self.buffer = CounterBuffer('pagecounters', max_pending=100, flush_interval=0)
+        self.buffer.increment('node:abc12', {'total': 1})
+        assert_equal(self.db['pagecounters'].find_one({'_id': 'node:abc12'})['total'], 1)
+
+    def test_flush_does_not_use_request_database(self):
+        request_db = mock.Mock()
+        with mock.patch.object(counters, 'get_flush_database', return_value=self.db) as mock_get_db:
+            for _ in range(3):
+                self.buffer.increment('node:abc12', {'total': 1}, db=request_db)
+        assert_true(mock_get_db.called)
+        assert_false(request_db.__getitem__.called)
+        assert_equal(self.db['pagecounters'].find_one({'_id': 'node:abc12'})['total'], 3)
+
+    def test_one_flusher_thread_per_process(self):
+        with mock.patch.object(counters.threading, 'Thread') as mock_thread:
+            mock_thread.return_value.is_alive.return_value = True
+            self.buffer.increment('node:abc12', {'total': 1})
+            self.buffer.increment('node:abc12', {'total': 1})
+        assert_equal(mock_thread.call_count, 1)
+        assert_true(mock_thread.return_value.start.called)
+
+    def test_failed_flush_keeps_increments(self):
+        self.buffer.increment('node:abc12', {'total': 1})
+        with mock.patch.object(self.buffer, '_write', side_effect=Exception):
+            assert_equal(self.buffer.flush(), 0)
+        assert_equal(self.buffer.get_pending('node:abc12'), {'total': 1})
+
+    def test_basic_counters_include_pending(self):
+        with mock.patch.object(counters, 'page_counters', self.buffer):
+            self.buffer.increment('node:abc12', {'total': 1, 'unique': 1})
+            assert_equal(analytics.get_basic_counters('node:abc12', db=self.db), (1, 1))
+            self.buffer.flush()
+            self.buffer.increment('node:abc12', {'total': 1})
+            assert_equal(analytics.get_basic_counters('node:abc12', db=self.db), (1, 2))
+
+
 class UpdateCountersTestCase(OsfTestCase):
 
     def setUp(self):
@@ -77,7 +181,7 @@ class TestUpdateCounters(UpdateCountersTestCase):
 
         page = 'download:{0}:{1}'.format(self.node, self.fid)
 
-        session.data['visited'].append(page)
+        assert_in(page, analytics.load_visited(session.data['visited']))
         download_file_(node=self.node, fid=self.fid)
 
         count = analytics.get_basic_counters('download:{0}:{1}'.format(self.node, self.fid), db=self.db)
@@ -98,7 +202,7 @@ class TestUpdateCounters(UpdateCountersTestCase):
 
         page = 'download:{0}:{1}:{2}'.format(self.node, self.fid, self.vid)
 
-        session.data['visited'].append(page)
+        assert_in(page, analytics.load_visited(session.data['visited']))
         download_file_version_(node=self.node, fid=self.fid, vid=self.vid)
 
         count = analytics.get_basic_counters('download:{0}:{1}:{2}'.format(self.node, self.fid, self.vid), db=self.db)
@@ -116,6 +220,26 @@ class TestUpdateCounters(UpdateCountersTestCase):
         count = analytics.get_basic_counters(page, db=self.db)
         assert_equal(count, (3, 5))
 
+    def test_update_counters_converts_visited_list(self):
+        page = 'node:{0}'.format(self.node._id)
+        session.data['visited'] = [page]
+        analytics.update_counter(page, db=self.db)
+        assert_equal(analytics.get_basic_counters(page, db=self.db), (0, 1))
+        other_page = 'node:other'
+        analytics.update_counter(other_page, db=self.db)
+        visited = analytics.load_visited(session.data['visited'])
+        assert_in(page, visited)
+        assert_in(other_page, visited)
+
+    def test_update_counters_daily_visits(self):
+        page = 'node:{0}'.format(self.node._id)
+        analytics.update_counter(page, db=self.db)
+        analytics.update_counter(page, db=self.db)
+        date = datetime.utcnow().strftime('%Y/%m/%d')
+        assert_equal(session.data['visited_by_date']['date'], date)
+        counters = self.db['pagecounters'].find_one({'_id': page})
+        assert_equal(counters['date'][date], {'unique': 1, 'total': 2})
+
     @unittest.skip('Reverted the fix for #2281. Unskip this once we use GUIDs for keys in the download counts collection')
     def test_update_counters_different_files(self):
         # Regression test for https://github.com/CenterForOpenScience/osf.io/issues/2281
@@ -135,7 +259,7 @@ class TestUpdateCounters(UpdateCountersTestCase):
 
         page = 'download:{0}:{1}'.format(self.node, fid1)
 
-        session.data['visited'].append(page)
+        assert_in(page, analytics.load_visited(session.data['visited']))
         download_file_(node=self.node, fid=fid1)
         download_file_(node=self.node, fid=fid2)
 
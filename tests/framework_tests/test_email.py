@@ -1,10 +1,16 @@
 # -*- coding: utf-8 -*-
+import smtpd
+import socket
+import asyncore
 import unittest
 import smtplib
+import threading
 
+import mock
 from nose.tools import *  # PEP8 asserts
 
 from framework.email.tasks import send_email
+from framework.email.mailer import Mailer, Message, SMTPConnectionPool
 from website import settings
 
 # Check if local mail server is running
@@ -27,5 +33,81 @@ class TestEmail(unittest.TestCase):
                                  message="<h1>Greetings!</h1>", ttls=False, login=False))
 
 
+class RecordingSMTPServer(smtpd.SMTPServer):
+    """Local SMTP server that keeps the messages it receives."""
+    def __init__(self):
+        smtpd.SMTPServer.__init__(self, ('localhost', 0), None)
+        self.messages = []
+        self.connections = 0
+
+    def handle_accept(self):
+        self.connections += 1
+        smtpd.SMTPServer.handle_accept(self)
+
+    def process_message(self, peer, mailfrom, rcpttos, data):
+        self.messages.append((mailfrom, rcpttos, data))
+
+
+class TestMailer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = RecordingSMTPServer()
+        self.thread = threading.Thread(target=asyncore.loop, kwargs={'timeout': 0.05})
+        self.thread.daemon = True
+        self.thread.start()
+        host, port = self.server.socket.getsockname()
+        self.mail_server = '{0}:{1}'.format(host, port)
+
+    def tearDown(self):
+        self.server.close()
+        asyncore.close_all()
+        self.thread.join()
+
+    def make_messages(self, count):
+        return [
+            Message('foo@bar.com', 'user{0}@quux.com'.format(index), 'subject', '<p>hi</p>', 'html')
+            for index in range(count)
+        ]
+
+    def make_mailer(self, **kwargs):
+        pool = SMTPConnectionPool(mail_server=self.mail_server, ttls=False, login=False, **kwargs)
+        return Mailer(pool=pool, retries=1, backoff=0)
+
+    def test_connections_are_reused(self):
+        mailer = self.make_mailer(size=1, batch_size=10)
+        assert_equal(mailer.send_many(self.make_messages(5)), [True] * 5)
+        mailer.close()
+        assert_equal(len(self.server.messages), 5)
+        assert_equal(self.server.messages[0][1], ['user0@quux.com'])
+        stats = mailer.get_stats()
+        assert_equal(stats['sent'], 5)
+        assert_equal(stats['connections_opened'], 1)
+        assert_greater(stats['messages_per_second'], 0)
+
+    def test_batch_size_limits_connection_use(self):
+        mailer = self.make_mailer(size=1, batch_size=2)
+        mailer.send_many(self.make_messages(5))
+        mailer.close()
+        assert_equal(mailer.get_stats()['connections_opened'], 3)
+
+    def test_retry_on_disconnect(self):
+        mailer = self.make_mailer(size=1)
+        message = self.make_messages(1)[0]
+        entry = mailer.pool.acquire()
+        mailer.pool.release(entry)
+        entry[0].close()
+        assert_true(mailer.send(message))
+        mailer.close()
+        assert_equal(mailer.get_stats()['retries'], 1)
+        assert_equal(len(self.server.messages), 1)
+
+    def test_failure_is_counted(self):
+        mailer = self.make_mailer(size=1)
+        with mock.patch.object(mailer.pool, 'acquire', side_effect=socket.error):
+            assert_false(mailer.send(self.make_messages(1)[0]))
+        assert_equal(mailer.get_stats()['failed'], 1)
+        assert_equal(mailer.get_stats()['retries'], 1)
+
+
 if __name__ == '__main__':
     unittest.main()
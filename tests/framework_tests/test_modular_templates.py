@@ -8,13 +8,14 @@ import unittest
 import os
 
 import flask
+import mock
 from lxml.html import fragment_fromstring
 import werkzeug.wrappers
 
 from framework.exceptions import HTTPError, http
 from framework.routing import (
-    Renderer, JSONRenderer, WebRenderer,
-    render_mako_string,
+    Renderer, JSONRenderer, WebRenderer, Include,
+    render_mako_string, compile_fragments, get_fragment_timings, mako_cache,
 )
 
 from tests.base import AppTestCase, OsfTestCase
@@ -319,6 +320,64 @@ class WebRendererTemplateTestCase(OsfTestCase):
         )
 
 
+class CompileFragmentsTestCase(unittest.TestCase):
+
+    def test_no_includes(self):
+        html = '<div><p>no includes</p></div>'
+        self.assertEqual([html], compile_fragments(html))
+
+    def test_includes_split_literals(self):
+        html = ''.join((
+            '<p>before</p>',
+            "<div class=\"widget\" mod-meta='{\"tpl\": \"a.html\"}'><div>placeholder</div></div>",
+            '<p>between</p>',
+            "<span mod-meta='{\"tpl\": \"b.html\", \"uri\": \"/a/?b=1&amp;c=2\"}'/>",
+            '<p>after</p>',
+        ))
+        plan = compile_fragments(html)
+        self.assertEqual(5, len(plan))
+        self.assertEqual('<p>before</p>', plan[0])
+        self.assertIsInstance(plan[1], Include)
+        self.assertEqual('a.html', json.loads(plan[1].meta)['tpl'])
+        self.assertEqual('</div>', plan[1].close_tag)
+        self.assertEqual('<p>between</p>', plan[2])
+        self.assertEqual('/a/?b=1&c=2', json.loads(plan[3].meta)['uri'])
+        self.assertEqual('', plan[3].close_tag)
+        self.assertEqual('<p>after</p>', plan[4])
+
+    def test_commented_includes_ignored(self):
+        html = "<!-- <div mod-meta='{\"tpl\": \"a.html\"}'></div> -->"
+        self.assertEqual([html], compile_fragments(html))
+
+
+class FragmentAssemblyTestCase(OsfTestCase):
+
+    def test_nested_template_timing_recorded(self):
+        self.app.app.preprocess_request()
+        r = WebRenderer(
+            'nested_parent.html',
+            render_mako_string,
+            template_dir=TEMPLATES_PATH,
+        )
+        r({})
+        timings = get_fragment_timings()
+        self.assertEqual(['nested_child.html'], [timing[0] for timing in timings])
+
+    @mock.patch('framework.routing.app')
+    def test_mako_cache_keys_on_trust(self, mock_app):
+        mock_app.debug = False
+        mako_cache.clear()
+        render_mako_string(TEMPLATES_PATH, 'nested_child.html', {}, trust=True)
+        render_mako_string(TEMPLATES_PATH, 'nested_child.html', {}, trust=False)
+        self.assertEqual(
+            set([
+                (TEMPLATES_PATH, 'nested_child.html', True),
+                (TEMPLATES_PATH, 'nested_child.html', False),
+            ]),
+            set(mako_cache.keys()),
+        )
+
+
 class JSONRendererEncoderTestCase(unittest.TestCase):
 
     def test_encode_custom_class(self):
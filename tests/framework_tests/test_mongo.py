@@ -3,11 +3,19 @@ Tests related to functions in framework.mongo
 """
 from unittest import TestCase
 
+import mock
 from nose.tools import *  # flake8: noqa
 
 from modularodm.exceptions import ValidationError, ValidationValueError
 
+from framework.auth import Auth, User
 from framework.mongo import validators
+from framework.mongo.handlers import ClientManager
+
+from tests.base import OsfTestCase
+from website.project.model import Node, Pointer
+
+from tests.factories import NodeFactory, ProjectFactory, UserFactory
 
 class TestValidators(TestCase):
 
@@ -62,3 +70,85 @@ class TestValidators(TestCase):
 
         with assert_raises(ValidationError):
             new_validator({'k': 'v', 'k2': 'v2'})
+
+
+class TestClientManager(TestCase):
+
+    def setUp(self):
+        self.factory = mock.Mock(side_effect=lambda: mock.Mock())
+        self.manager = ClientManager(factory=self.factory)
+
+    def test_client_is_created_lazily_and_reused(self):
+        assert_false(self.factory.called)
+        client = self.manager.client
+        assert_is(self.manager.client, client)
+        assert_equal(self.factory.call_count, 1)
+
+    @mock.patch('framework.mongo.handlers.os.getpid')
+    def test_client_is_recreated_after_fork(self, mock_getpid):
+        mock_getpid.return_value = 1
+        parent_client = self.manager.client
+        mock_getpid.return_value = 2
+        child_client = self.manager.client
+        assert_is_not(child_client, parent_client)
+        stats = self.manager.get_stats()
+        assert_equal(stats['clients_created'], 2)
+        assert_equal(stats['forks'], 1)
+
+    def test_start_and_end_request_pin_socket(self):
+        client = self.manager.start_request()
+        assert_true(client.start_request.called)
+        assert_equal(self.manager.get_stats()['requests_active'], 1)
+        self.manager.end_request(client)
+        assert_true(client.end_request.called)
+        assert_equal(self.manager.get_stats()['requests_active'], 0)
+
+
+class TestBulkLoading(OsfTestCase):
+
+    def setUp(self):
+        super(TestBulkLoading, self).setUp()
+        self.users = [UserFactory() for _ in range(3)]
+        User._clear_object_cache()
+
+    def test_load_many_preserves_order(self):
+        keys = [user._id for user in reversed(self.users)]
+        loaded = User.load_many(keys + ['notauser'])
+        assert_equal([user._id for user in loaded[:3]], keys)
+        assert_is_none(loaded[3])
+
+    def test_load_many_queries_once(self):
+        keys = [user._id for user in self.users]
+        with mock.patch.object(User, 'find', wraps=User.find) as mock_find:
+            User.load_many(keys)
+            User.load_many(keys)
+        assert_equal(mock_find.call_count, 1)
+
+    def test_prefetch_contributors(self):
+        project = ProjectFactory(creator=self.users[0])
+        for user in self.users[1:]:
+            project.add_contributor(user, auth=Auth(self.users[0]))
+        project.save()
+        User._clear_object_cache()
+        project.prefetch('contributors')
+        with mock.patch.object(User._storage[0], 'get', wraps=User._storage[0].get) as mock_get:
+            contributors = list(project.contributors)
+        assert_equal(mock_get.call_count, 0)
+        assert_equal(set(contributors), set(self.users))
+
+    def test_prefetch_abstract_list_queries_once_per_schema(self):
+        project = ProjectFactory(creator=self.users[0])
+        NodeFactory(parent=project, creator=self.users[0])
+        NodeFactory(parent=project, creator=self.users[0])
+        project.add_pointer(ProjectFactory(), auth=Auth(self.users[0]))
+        Node._clear_object_cache()
+        Pointer._clear_object_cache()
+        with mock.patch.object(Node, 'find', wraps=Node.find) as mock_node_find:
+            with mock.patch.object(Pointer, 'find', wraps=Pointer.find) as mock_pointer_find:
+                project.prefetch('nodes')
+        assert_equal(mock_node_find.call_count, 1)
+        assert_equal(mock_pointer_find.call_count, 1)
+        with mock.patch.object(Node._storage[0], 'get', wraps=Node._storage[0].get) as mock_get:
+            nodes = list(project.nodes)
+        assert_equal(mock_get.call_count, 0)
+        assert_equal(len(nodes), 3)
@@ -1,8 +1,13 @@
+import time
+
+import mock
 from nose.tools import *
 
-from framework.sessions import utils
+from framework.sessions import utils, touch_session
+from framework.sessions.backends import MemorySessionBackend, MongoSessionBackend
 from tests import factories
 from tests.base import DbTestCase
+from website import settings
 from website.models import User
 from website.models import Session
 
@@ -34,3 +39,94 @@ class SessionUtilsTestCase(DbTestCase):
 
         utils.remove_sessions_for_user(self.user)
         assert_equal(1, Session.find().count())
+
+
+class SessionDirtyTestCase(DbTestCase):
+
+    def tearDown(self, *args, **kwargs):
+        super(SessionDirtyTestCase, self).tearDown(*args, **kwargs)
+        User.remove()
+        Session.remove()
+
+    def test_new_session_is_dirty(self):
+        assert_true(Session().is_dirty)
+
+    def test_saved_session_is_clean(self):
+        session = factories.SessionFactory(user=factories.UserFactory())
+        assert_false(session.is_dirty)
+        session.data['status'] = ['message']
+        assert_true(session.is_dirty)
+        session.save()
+        assert_false(session.is_dirty)
+
+    def test_nested_change_is_dirty(self):
+        session = factories.SessionFactory(user=factories.UserFactory())
+        session.data['visited_by_date'] = {'date': '2015/01/01', 'pages': {}}
+        session.mark_clean()
+        session.data['visited_by_date']['date'] = '2015/01/02'
+        assert_true(session.is_dirty)
+
+
+class SessionBackendTestCase(DbTestCase):
+
+    def tearDown(self, *args, **kwargs):
+        super(SessionBackendTestCase, self).tearDown(*args, **kwargs)
+        Session.remove()
+
+    def _test_round_trip(self, backend):
+        session = Session(data={'auth_user_id': 'abc12'})
+        backend.save(session)
+        assert_false(session.is_dirty)
+        loaded = backend.load(session._id)
+        assert_equal(loaded.data, {'auth_user_id': 'abc12'})
+        assert_false(loaded.is_dirty)
+        backend.remove(session._id)
+        Session._clear_caches()
+        assert_is_none(backend.load(session._id))
+        stats = backend.get_stats()
+        assert_equal(stats['save_count'], 1)
+        assert_equal(stats['load_count'], 2)
+        assert_equal(stats['remove_count'], 1)
+        assert_greater_equal(stats['load_max_seconds'], stats['load_mean_seconds'])
+
+    def test_mongo_round_trip(self):
+        self._test_round_trip(MongoSessionBackend())
+
+    def test_memory_round_trip(self):
+        self._test_round_trip(MemorySessionBackend())
+
+    def test_memory_backend_copies_data(self):
+        backend = MemorySessionBackend()
+        session = Session(data={'status': []})
+        backend.save(session)
+        session.data['status'].append('message')
+        assert_equal(backend.load(session._id).data, {'status': []})
+        assert_equal(Session.find().count(), 0)
+
+
+class TouchSessionTestCase(DbTestCase):
+
+    def tearDown(self, *args, **kwargs):
+        super(TouchSessionTestCase, self).tearDown(*args, **kwargs)
+        User.remove()
+
+    def test_touch_is_throttled(self):
+        user = factories.UserFactory()
+        session = Session(data={'auth_user_id': user._id})
+        with mock.patch('framework.sessions.database') as mock_database:
+            touch_session(session)
+            touched = session.data['last_touched']
+            touch_session(session)
+        assert_equal(mock_database['user'].update.call_count, 1)
+        assert_equal(session.data['last_touched'], touched)
+
+    def test_touch_after_interval(self):
+        session = Session(data={
+            'auth_user_id': 'abc12',
+            'last_touched': time.time() - settings.SESSION_TOUCH_INTERVAL - 1,
+        })
+        session.mark_clean()
+        with mock.patch('framework.sessions.database') as mock_database:
+            touch_session(session)
+        assert_equal(mock_database['user'].update.call_count, 1)
+        assert_true(session.is_dirty)
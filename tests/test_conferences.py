@@ -17,7 +17,7 @@ from website import settings
 from website.models import User, Node
 from website.conferences import views
 from website.conferences.model import Conference
-from website.conferences import utils, message
+from website.conferences import utils, message, submissions
 from website.util import api_url_for, web_url_for
 
 from tests.base import OsfTestCase, fake
@@ -421,6 +421,7 @@ class TestConferenceEmailViews(OsfTestCase):
 
     def test_conference_submissions(self):
         Node.remove()
+        self.db[submissions.COLLECTION].remove()
         conference1 = ConferenceFactory()
         conference2 = ConferenceFactory()
         # Create conference nodes
@@ -502,6 +503,90 @@ class TestConferenceEmailViews(OsfTestCase):
         assert_equal(res.status_code, 200)
 
 
+class TestConferenceSubmissions(OsfTestCase):
+
+    def setUp(self):
+        super(TestConferenceSubmissions, self).setUp()
+        self.conference = ConferenceFactory()
+        self.nodes = create_fake_conference_nodes(3, self.conference.endpoint)
+        self.conference.reload()
+
+    def get_node_ids(self):
+        results, _ = submissions.get_submissions([self.conference.endpoint])
+        return {each['node'] for each in results}
+
+    def test_tagged_nodes_are_submissions(self):
+        assert_equal(self.get_node_ids(), {node._id for node in self.nodes})
+        assert_equal(self.conference.num_submissions, 3)
+
+    def test_untagged_node_is_removed(self):
+        node = self.nodes[0]
+        node.remove_tag(self.conference.endpoint, Auth(node.creator))
+        self.conference.reload()
+        assert_not_in(node._id, self.get_node_ids())
+        assert_equal(self.conference.num_submissions, 2)
+
+    def test_private_and_deleted_nodes_are_removed(self):
+        self.nodes[0].set_privacy('private', auth=Auth(self.nodes[0].creator))
+        self.nodes[1].is_deleted = True
+        self.nodes[1].save()
+        self.conference.reload()
+        assert_equal(self.get_node_ids(), {self.nodes[2]._id})
+        assert_equal(self.conference.num_submissions, 1)
+
+    def test_title_change_is_updated(self):
+        self.nodes[0].set_title('Changed title', auth=Auth(self.nodes[0].creator), save=True)
+        results, _ = submissions.get_submissions([self.conference.endpoint])
+        titles = [each['title'] for each in results]
+        assert_in('Changed title', titles)
+
+    def test_node_without_visible_contributors(self):
+        node = self.nodes[0]
+        with mock.patch.object(Node, 'visible_contributor_ids', []):
+            serialized = submissions.serialize_submission(node, self.conference.endpoint)
+        assert_is_none(serialized['authorId'])
+        results, _ = submissions.get_submissions([self.conference.endpoint])
+        rendered = submissions.render_submissions([dict(results[0], authorId=None)])
+        assert_equal(rendered[0]['author'], '')
+
+    def test_author_name_change_is_rendered(self):
+        node = self.nodes[0]
+        author = node.visible_contributors[0]
+        author.family_name = 'Renamed'
+        author.save()
+        results, _ = submissions.get_submissions([self.conference.endpoint])
+        rendered = submissions.render_submissions([each for each in results if each['node'] == node._id])
+        assert_equal(rendered[0]['author'], 'Renamed')
+
+    def test_conference_created_after_tagging(self):
+        node = ProjectFactory(is_public=True)
+        node.add_tag('lateconference', Auth(node.creator))
+        conference = ConferenceFactory(endpoint='lateconference')
+        results, total = submissions.get_submissions([conference.endpoint])
+        assert_equal(total, 1)
+        assert_equal(conference.num_submissions, 1)
+
+    def test_pagination(self):
+        results, total = submissions.get_submissions([self.conference.endpoint], page=1, size=2)
+        assert_equal(total, 3)
+        assert_equal(len(results), 1)
+
+    def test_conference_data_pagination(self):
+        url = api_url_for('conference_data', meeting=self.conference.endpoint)
+        res = self.app.get(url, {'page': 0, 'size': 2})
+        assert_equal(len(res.json), 2)
+        res = self.app.get(url, {'size': 0}, expect_errors=True)
+        assert_equal(res.status_code, 400)
+
+    def test_render_submissions(self):
+        results, _ = submissions.get_submissions([self.conference.endpoint])
+        rendered = submissions.render_submissions(results)
+        assert_equal(len(rendered), 3)
+        assert_equal(rendered[0]['confName'], self.conference.name)
+        assert_equal(rendered[0]['download'], 0)
+        assert_equal(rendered[0]['downloadUrl'], '')
+
+
 class TestConferenceModel(OsfTestCase):
 
     def test_endpoint_and_name_are_required(self):
@@ -11,9 +11,11 @@ from modularodm import Q
 from framework.auth.core import Auth
 from website import settings
 import website.search.search as search
-from website.search import elastic_search
+from website.search import elastic_search, index_queue
 from website.search.util import build_query
-from website.search_migration.migrate import migrate
+from website.search_migration.migrate import (
+    migrate, set_up_index, start_checkpoint, complete_shard, get_checkpoint, NODES
+)
 from website.models import Retraction, NodeLicense, Tag
 
 from tests.base import OsfTestCase
@@ -407,6 +409,18 @@ class TestPublicNodes(SearchTestCase):
         assert_equal(docs[0]['parent_title'], '-- private project --')
         assert_false(docs[0]['parent_url'])
 
+    def test_format_results_does_not_load_parent(self):
+        with mock.patch('website.search.elastic_search.Node.load') as mock_load:
+            docs = query('category:component AND ' + self.title)['results']
+        assert_equal(len(docs), 1)
+        assert_equal(docs[0]['parent_title'], self.project.title)
+        assert_false(mock_load.called)
+
+    def test_search_parent_title_does_not_match_component(self):
+        self.project.set_title('Unusual parent', self.consolidate_auth, save=True)
+        docs = query('category:component AND Unusual')['results']
+        assert_equal(len(docs), 0)
+
     def test_delete_project(self):
         self.component.remove_node(self.consolidate_auth)
         docs = query('category:component AND ' + self.title)['results']
@@ -616,6 +630,26 @@ class TestAddContributor(SearchTestCase):
         contribs = search.search_contributor(self.name4.split(' ')[0][:-1])
         assert_equal(len(contribs['users']), 0)
 
+    def test_search_long_name_prefix(self):
+        UserFactory(fullname='Supercalifragilisticexpialidocious Smith')
+        contribs = search.search_contributor('Supercalifragilisticexpiali')
+        assert_equal(len(contribs['users']), 1)
+
+    def test_search_excludes_users(self):
+        contribs = search.search_contributor(self.name1, exclude=[self.user])
+        assert_equal(len(contribs['users']), 0)
+
+    def test_search_projects_in_common(self):
+        project = ProjectFactory(creator=self.user)
+        project.add_contributor(self.user3, auth=Auth(self.user), save=True)
+        ProjectFactory(creator=self.user3)
+
+        contribs = search.search_contributor(self.name3, current_user=self.user)
+        assert_equal(contribs['users'][0]['n_projects_in_common'], 1)
+
+        contribs = search.search_contributor(self.name1, current_user=self.user)
+        assert_equal(contribs['users'][0]['n_projects_in_common'], -1)
+
 @requires_search
 class TestProjectSearchResults(SearchTestCase):
     def setUp(self):
@@ -747,6 +781,55 @@ class TestUserSearchResults(SearchTestCase):
             assert_in(name, were_starfleet_names)
 
 
+class TestBuildSearchBody(unittest.TestCase):
+
+    def setUp(self):
+        self.license_filter = {'terms': {'license.id': ['MIT']}}
+        self.query = build_query('science')
+        self.query['query'] = {
+            'filtered': {
+                'query': self.query['query'],
+                'filter': self.license_filter,
+            }
+        }
+
+    def test_filter_narrows_hits_and_tags(self):
+        body = elastic_search.build_search_body(self.query, '_all')
+        assert_not_in('filter', body['query']['filtered'])
+        assert_equal(body['post_filter'], self.license_filter)
+        assert_equal(body['aggregations']['tag_cloud']['filter'], self.license_filter)
+        assert_equal(body['aggregations']['licenses']['filter'], {'match_all': {}})
+        # The query passed in is left alone
+        assert_equal(self.query['query']['filtered']['filter'], self.license_filter)
+
+    def test_doc_type_narrows_hits_and_licenses(self):
+        body = elastic_search.build_search_body(self.query, 'project')
+        type_filter = {'type': {'value': 'project'}}
+        assert_equal(body['post_filter'], {'and': [self.license_filter, type_filter]})
+        assert_equal(body['aggregations']['licenses']['filter'], type_filter)
+        assert_equal(body['aggregations']['counts'], {'terms': {'field': '_type'}})
+
+    def test_no_filter(self):
+        body = elastic_search.build_search_body(build_query('science'), None)
+        assert_not_in('post_filter', body)
+        assert_equal(body['from'], 0)
+        assert_equal(body['size'], 10)
+
+    def test_parse_aggregations(self):
+        counts, aggs, tags = elastic_search.parse_aggregations({
+            'counts': {'buckets': [
+                {'key': 'project', 'doc_count': 3},
+                {'key': 'user', 'doc_count': 2},
+                {'key': 'unknown', 'doc_count': 7},
+            ]},
+            'tag_cloud': {'doc_count': 3, 'tags': {'buckets': [{'key': 'bio', 'doc_count': 1}]}},
+            'licenses': {'doc_count': 4, 'licenses': {'buckets': [{'key': 'MIT', 'doc_count': 1}]}},
+        })
+        assert_equal(counts, {'project': 3, 'user': 2, 'total': 5})
+        assert_equal(aggs, {'licenses': {'MIT': 1}, 'total': 4})
+        assert_equal(tags, [{'key': 'bio', 'doc_count': 1}])
+
+
 class TestSearchExceptions(OsfTestCase):
     # Verify that the correct exception is thrown when the connection is lost
 
@@ -823,6 +906,24 @@ class TestSearchMigration(SearchTestCase):
             assert_equal(var[settings.ELASTIC_INDEX + '_v{}'.format(n + 1)]['aliases'].keys()[0], settings.ELASTIC_INDEX)
             assert not var.get(settings.ELASTIC_INDEX + '_v{}'.format(n))
 
+    def test_migration_clears_checkpoint(self):
+        migrate(delete=False, index=settings.ELASTIC_INDEX, app=self.app.app)
+        assert_is_none(get_checkpoint(settings.ELASTIC_INDEX))
+
+    def test_resume_skips_completed_shards(self):
+        migrate(delete=False, index=settings.ELASTIC_INDEX, app=self.app.app)
+        new_index = set_up_index(settings.ELASTIC_INDEX)
+        start_checkpoint(settings.ELASTIC_INDEX, new_index, True, batch_size=1000)
+        complete_shard(settings.ELASTIC_INDEX, NODES, 0, 0)
+
+        migrate(delete=False, index=settings.ELASTIC_INDEX, app=self.app.app)
+
+        var = self.es.indices.get_aliases()
+        assert_equal(var[new_index]['aliases'].keys()[0], settings.ELASTIC_INDEX)
+        assert_equal(self.es.count(index=new_index, doc_type='project')['count'], 0)
+        assert_greater(self.es.count(index=new_index, doc_type='user')['count'], 0)
+        assert_is_none(get_checkpoint(settings.ELASTIC_INDEX))
+
 class TestSearchFiles(SearchTestCase):
 
     def setUp(self):
@@ -897,3 +998,64 @@ class TestSearchFiles(SearchTestCase):
         node.save()
         find = query_file('The Dock of the Bay.mp3')['results']
         assert_equal(len(find), 0)
+
+
+class TestSearchIndexQueue(OsfTestCase):
+
+    def setUp(self):
+        super(TestSearchIndexQueue, self).setUp()
+        index_queue.database[index_queue.COLLECTION].remove()
+
+    def tearDown(self):
+        super(TestSearchIndexQueue, self).tearDown()
+        index_queue.database[index_queue.COLLECTION].remove()
+
+    @mock.patch('website.search.index_queue.schedule_flush')
+    def test_repeated_updates_are_coalesced(self, mock_schedule):
+        index_queue.enqueue(index_queue.NODE, 'abcde', index=TEST_INDEX)
+        index_queue.enqueue(index_queue.NODE, 'abcde', index=TEST_INDEX, update_files=True)
+        index_queue.enqueue(index_queue.NODE, 'abcde', index=TEST_INDEX)
+        entries = list(index_queue.database[index_queue.COLLECTION].find())
+        assert_equal(len(entries), 1)
+        assert_true(entries[0]['update_files'])
+        mock_schedule.assert_called_once_with(TEST_INDEX)
+
+    @mock.patch('website.search.index_queue.schedule_flush')
+    def test_enqueue_many_coalesces_with_queued_entries(self, mock_schedule):
+        index_queue.enqueue(index_queue.FILE, 'abcde', index=TEST_INDEX, delete=True)
+        mock_schedule.reset_mock()
+
+        index_queue.enqueue_many(index_queue.FILE, ['abcde', 'fghij', 'klmno'], index=TEST_INDEX)
+
+        entries = list(index_queue.database[index_queue.COLLECTION].find())
+        assert_equal(sorted(entry['guid'] for entry in entries), ['abcde', 'fghij', 'klmno'])
+        assert_false(any(entry['delete'] for entry in entries))
+        mock_schedule.assert_called_once_with(TEST_INDEX)
+
+    @mock.patch('website.search.search.bulk_update')
+    @mock.patch('website.search.index_queue.schedule_flush')
+    def test_flush_indexes_and_drains_queue(self, mock_schedule, mock_bulk_update):
+        node = ProjectFactory(is_public=True)
+        user = UserFactory()
+        index_queue.enqueue(index_queue.NODE, node._id, index=TEST_INDEX, update_files=True)
+        index_queue.enqueue(index_queue.USER, user._id, index=TEST_INDEX)
+        index_queue.enqueue(index_queue.FILE, 'deleted', index=TEST_INDEX, delete=True)
+
+        assert_equal(index_queue.flush(index=TEST_INDEX), 3)
+
+        kwargs = mock_bulk_update.call_args[1]
+        assert_equal(kwargs['nodes'], [(node, True)])
+        assert_equal(kwargs['users'], [user])
+        assert_equal(kwargs['deleted_file_ids'], ['deleted'])
+        assert_equal(index_queue.database[index_queue.COLLECTION].count(), 0)
+
+    @mock.patch('website.search.search.update_node')
+    def test_files_not_reindexed_when_file_fields_unchanged(self, mock_update_node):
+        node = ProjectFactory(is_public=True)
+        mock_update_node.reset_mock()
+        node.description = 'Ain\'t too proud to beg'
+        node.save()
+        assert_false(mock_update_node.call_args[1]['update_files'])
+        node.title = 'My Girl'
+        node.save()
+        assert_true(mock_update_node.call_args[1]['update_files'])
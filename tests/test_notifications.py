@@ -13,14 +13,17 @@ from framework.auth import Auth
 from framework.auth.core import User
 from framework.auth.signals import contributor_removed
 from framework.auth.signals import node_deleted
-from website.notifications.tasks import get_users_emails, send_users_email, group_by_node, remove_notifications
+from website.notifications.tasks import (
+    get_users_emails, iter_users_emails, send_users_email, group_by_node, remove_notifications,
+)
 from website.notifications import constants
 from website.notifications.model import NotificationDigest
 from website.notifications.model import NotificationSubscription
 from website.notifications import emails
 from website.notifications import utils
+from website.notifications import index as subscription_index
 from website.project.model import Node
-from website import mails
+from website import mails, settings
 from website.util import api_url_for
 from website.util import web_url_for
 
@@ -1169,6 +1172,87 @@ class TestSendEmails(OsfTestCase):
         assert_equal(emails.localize_timestamp(timestamp, self.user), formatted_datetime)
 
 
+class TestSubscriptionIndex(OsfTestCase):
+
+    def setUp(self):
+        super(TestSubscriptionIndex, self).setUp()
+        self.project = factories.ProjectFactory()
+        self.node = factories.NodeFactory(parent=self.project, creator=self.project.creator)
+        self.subscription = factories.NotificationSubscriptionFactory(
+            _id=self.project._id + '_comments',
+            owner=self.project,
+            event_name='comments'
+        )
+        self.subscription.email_transactional.append(self.project.creator)
+        self.subscription.save()
+
+    def test_subscriptions_are_indexed(self):
+        expected = emails.compile_subscriptions(self.node, 'comments')
+        assert_equal(emails.get_subscriptions(self.node, 'comments'), expected)
+        assert_equal(subscription_index.load(self.node._id, 'comments'), expected)
+        with mock.patch('website.notifications.emails.compile_subscriptions') as mock_compile:
+            assert_equal(emails.get_subscriptions(self.node, 'comments'), expected)
+        assert_false(mock_compile.called)
+
+    def test_subscription_save_invalidates_descendants(self):
+        emails.get_subscriptions(self.node, 'comments')
+        user = factories.UserFactory()
+        self.project.add_contributor(user, auth=Auth(self.project.creator))
+        self.project.save()
+        assert_is_none(subscription_index.load(self.node._id, 'comments'))
+        emails.get_subscriptions(self.node, 'comments')
+        self.subscription.email_digest.append(user)
+        self.subscription.save()
+        assert_is_none(subscription_index.load(self.node._id, 'comments'))
+
+    def test_unrelated_node_is_not_invalidated(self):
+        emails.get_subscriptions(self.project, 'comments')
+        self.node.title = 'Changed'
+        self.node.save()
+        assert_is_not_none(subscription_index.load(self.project._id, 'comments'))
+        self.node.add_contributor(factories.UserFactory(), auth=Auth(self.project.creator))
+        self.node.save()
+        assert_is_not_none(subscription_index.load(self.project._id, 'comments'))
+
+    def test_node_deleted_invalidates(self):
+        emails.get_subscriptions(self.node, 'comments')
+        node_deleted.send(self.node)
+        assert_is_none(subscription_index.load(self.node._id, 'comments'))
+
+
+class TestStoreEmails(OsfTestCase):
+
+    def setUp(self):
+        super(TestStoreEmails, self).setUp()
+        self.project = factories.ProjectFactory()
+        self.user = factories.UserFactory()
+        self.timestamp = datetime.datetime.utcnow()
+
+    @mock.patch('website.mails.render_message', return_value='message')
+    def test_message_rendered_once_per_localization(self, mock_render):
+        recipients = [
+            factories.UserFactory(timezone='Etc/UTC', locale='en_US'),
+            factories.UserFactory(timezone='Etc/UTC', locale='en_US'),
+            factories.UserFactory(timezone='America/New_York', locale='en_US'),
+        ]
+        emails.store_emails(
+            [recipient._id for recipient in recipients], 'email_transactional', 'comments',
+            self.user, self.project, self.timestamp, content='hi'
+        )
+        assert_equal(mock_render.call_count, 2)
+        digests = NotificationDigest.find(Q('user_id', 'in', [recipient._id for recipient in recipients]))
+        assert_equal(digests.count(), 3)
+
+    @mock.patch('website.mails.render_message', return_value='message')
+    def test_sender_is_skipped(self, mock_render):
+        emails.store_emails(
+            [self.user._id], 'email_transactional', 'comments',
+            self.user, self.project, self.timestamp
+        )
+        assert_false(mock_render.called)
+        assert_equal(NotificationDigest.find(Q('user_id', 'eq', self.user._id)).count(), 0)
+
+
 class TestSendDigest(OsfTestCase):
     def setUp(self):
         super(TestSendDigest, self).setUp()
@@ -1224,7 +1308,7 @@ class TestSendDigest(OsfTestCase):
         ]
 
         assert_equal(len(user_groups), 2)
-        assert_equal(user_groups, expected)
+        assert_equal(user_groups, sorted(expected, key=lambda group: group['user_id']))
         digest_ids = [d._id, d2._id, d3._id]
         remove_notifications(email_notification_ids=digest_ids)
 
@@ -1275,12 +1359,13 @@ class TestSendDigest(OsfTestCase):
         ]
 
         assert_equal(len(user_groups), 2)
-        assert_equal(user_groups, expected)
+        assert_equal(user_groups, sorted(expected, key=lambda group: group['user_id']))
         digest_ids = [d._id, d2._id, d3._id]
         remove_notifications(email_notification_ids=digest_ids)
 
-    @mock.patch('website.mails.send_mail')
-    def test_send_users_email_called_with_correct_args(self, mock_send_mail):
+    @mock.patch('website.notifications.tasks.Mailer')
+    def test_send_users_email_called_with_correct_args(self, mock_mailer):
+        mock_mailer.return_value.send_many.return_value = [True]
         send_type = 'email_transactional'
         d = factories.NotificationDigestFactory(
             user_id=factories.UserFactory()._id,
@@ -1291,23 +1376,85 @@ class TestSendDigest(OsfTestCase):
         )
         d.save()
         user_groups = get_users_emails(send_type)
-        send_users_email(send_type)
-        assert_true(mock_send_mail.called)
-        assert_equals(mock_send_mail.call_count, len(user_groups))
-
-        last_user_index = len(user_groups) - 1
-        user = User.load(user_groups[last_user_index]['user_id'])
-        email_notification_ids = [message['_id'] for message in user_groups[last_user_index]['info']]
-
-        args, kwargs = mock_send_mail.call_args
-
-        assert_equal(kwargs['to_addr'], user.username)
-        assert_equal(kwargs['mimetype'], 'html')
-        assert_equal(kwargs['mail'], mails.DIGEST)
-        assert_equal(kwargs['name'], user.fullname)
-        message = group_by_node(user_groups[last_user_index]['info'])
-        assert_equal(kwargs['message'], message)
-        assert_equal(kwargs['callback'], remove_notifications(email_notification_ids=email_notification_ids))
+        with mock.patch.object(settings, 'USE_EMAIL', True):
+            send_users_email(send_type)
+        assert_equal(mock_mailer.return_value.send_many.call_count, 1)
+
+        user = User.load(user_groups[0]['user_id'])
+        args, kwargs = mock_mailer.return_value.send_many.call_args
+        messages = args[0]
+        assert_equal(len(messages), 1)
+        context = {'name': user.fullname, 'message': group_by_node(user_groups[0]['info'])}
+        assert_equal(messages[0].to_addr, user.username)
+        assert_equal(messages[0].mimetype, 'html')
+        assert_equal(messages[0].subject, mails.DIGEST.subject(**context))
+        assert_equal(messages[0].message, mails.DIGEST.html(**context))
+        assert_true(mock_mailer.return_value.close.called)
+        assert_equal(get_users_emails(send_type), [])
+
+    @mock.patch('website.notifications.tasks.Mailer')
+    def test_send_users_email_keeps_failed_notifications(self, mock_mailer):
+        mock_mailer.return_value.send_many.return_value = [False]
+        d = factories.NotificationDigestFactory(
+            user_id=factories.UserFactory()._id,
+            send_type='email_transactional',
+            timestamp=datetime.datetime.utcnow(),
+            message='Hello',
+            node_lineage=[factories.ProjectFactory()._id]
+        )
+        d.save()
+        with mock.patch.object(settings, 'USE_EMAIL', True):
+            send_users_email('email_transactional')
+        assert_equal(NotificationDigest.find(Q('_id', 'eq', d._id)).count(), 1)
+
+    @mock.patch('website.notifications.tasks.Mailer')
+    def test_send_users_email_skipped_without_credentials(self, mock_mailer):
+        d = factories.NotificationDigestFactory(
+            user_id=factories.UserFactory()._id,
+            send_type='email_transactional',
+            timestamp=datetime.datetime.utcnow(),
+            message='Hello',
+            node_lineage=[factories.ProjectFactory()._id]
+        )
+        d.save()
+        with mock.patch.multiple(settings, USE_EMAIL=True, DEBUG_MODE=False, MAIL_USERNAME=None):
+            send_users_email('email_transactional')
+        assert_false(mock_mailer.called)
+        assert_equal(NotificationDigest.find(Q('_id', 'eq', d._id)).count(), 1)
+
+    def test_iter_users_emails_pages_by_user(self):
+        users = sorted([factories.UserFactory() for _ in range(3)], key=lambda user: user._id)
+        for user, count in zip(users, [2, 1, 2]):
+            for _ in range(count):
+                factories.NotificationDigestFactory(
+                    user_id=user._id,
+                    send_type='email_digest',
+                    timestamp=datetime.datetime.utcnow(),
+                    message='Hello',
+                    node_lineage=[self.project._id]
+                ).save()
+        batches = list(iter_users_emails('email_digest', batch_size=2))
+        assert_equal(
+            [[(group['user_id'], len(group['info'])) for group in batch] for batch in batches],
+            [[(users[0]._id, 2)], [(users[1]._id, 1)], [(users[2]._id, 2)]]
+        )
+
+    def test_iter_users_emails_reads_all_notifications_of_large_user(self):
+        users = sorted([factories.UserFactory() for _ in range(2)], key=lambda user: user._id)
+        for user, count in zip(users, [3, 1]):
+            for _ in range(count):
+                factories.NotificationDigestFactory(
+                    user_id=user._id,
+                    send_type='email_digest',
+                    timestamp=datetime.datetime.utcnow(),
+                    message='Hello',
+                    node_lineage=[self.project._id]
+                ).save()
+        batches = list(iter_users_emails('email_digest', batch_size=2))
+        assert_equal(
+            [[(group['user_id'], len(group['info'])) for group in batch] for batch in batches],
+            [[(users[0]._id, 3)], [(users[1]._id, 1)]]
+        )
 
     def test_remove_sent_digest_notifications(self):
         d = factories.NotificationDigestFactory(
@@ -19,6 +19,7 @@ from modularodm import Q
 from scripts import cleanup_failed_registrations as scripts
 
 from framework.auth import Auth
+from framework.exceptions import HTTPError
 from framework.tasks import handlers
 
 from website.archiver import (
@@ -41,6 +42,8 @@ from website import settings
 from website.util import waterbutler_url_for
 from website.project.model import Node, NodeLog, ensure_schemas, MetaSchema
 from website.addons.base import StorageAddonBase
+from website.addons.base import signals as file_signals
+from website.addons.base.crawler import FileTreeCrawler, TokenBucket
 
 from tests import factories
 from tests.base import OsfTestCase, fake
@@ -162,7 +165,7 @@ class MockAddon(mock.MagicMock, StorageAddonBase):
 
     complete = True
 
-    def _get_file_tree(self, user, version):
+    def _get_file_tree(self, user, version, stats=None):
         return FILE_TREE
 
     def after_register(self, *args):
@@ -276,6 +279,65 @@ class TestStorageAddonBase(ArchiverTestCase):
         for addon in [a for a in settings.ADDONS_ARCHIVABLE if a not in ['wiki']]:
             self._test_addon(addon)
 
+class TestFileTreeCrawler(OsfTestCase):
+
+    LISTINGS = {
+        '/': FILE_TREE['children'],
+        '/qwerty': FILE_TREE['children'][1]['children'],
+    }
+
+    def setUp(self):
+        super(TestFileTreeCrawler, self).setUp()
+        self.listed = []
+
+    def list_folder(self, filenode, session):
+        self.listed.append(filenode['path'])
+        return copy.deepcopy(self.LISTINGS[filenode['path']])
+
+    def root(self):
+        return {'path': '/', 'name': '', 'kind': 'folder'}
+
+    def test_crawl_builds_tree(self):
+        crawler = FileTreeCrawler(self.list_folder, 'dropbox', max_workers=3)
+        assert_equal(crawler.crawl(self.root()), FILE_TREE)
+        assert_equal(sorted(self.listed), ['/', '/qwerty'])
+        assert_equal(crawler.stats['requests'], 2)
+        assert_equal(crawler.stats['folders'], 2)
+        assert_equal(crawler.stats['files'], 2)
+
+    @mock.patch('website.addons.base.crawler.time.sleep')
+    def test_crawl_retries_server_errors(self, mock_sleep):
+        failures = [HTTPError(503)]
+
+        def flaky_list_folder(filenode, session):
+            if failures:
+                raise failures.pop()
+            return self.list_folder(filenode, session)
+
+        crawler = FileTreeCrawler(flaky_list_folder, 'dropbox', max_workers=1, retries=2)
+        assert_equal(crawler.crawl(self.root()), FILE_TREE)
+        assert_equal(crawler.stats['retries'], 1)
+        assert_equal(crawler.stats['requests'], 3)
+
+    def test_crawl_raises_client_errors(self):
+        def forbidden(filenode, session):
+            raise HTTPError(403)
+
+        crawler = FileTreeCrawler(forbidden, 'dropbox', max_workers=2, retries=2)
+        with assert_raises(HTTPError):
+            crawler.crawl(self.root())
+        assert_equal(crawler.stats['requests'], 1)
+
+    @mock.patch('website.addons.base.crawler.time.sleep')
+    def test_token_bucket_throttles_after_burst(self, mock_sleep):
+        bucket = TokenBucket(rate=2)
+        assert_equal(bucket.acquire(), 0)
+        assert_equal(bucket.acquire(), 0)
+        with mock.patch('website.addons.base.crawler.time.time', return_value=bucket.updated):
+            mock_sleep.side_effect = lambda delay: setattr(bucket, 'tokens', 1)
+            assert_greater(bucket.acquire(), 0)
+
+
 class TestArchiverTasks(ArchiverTestCase):
 
     @use_fake_addons
@@ -842,6 +904,94 @@ class TestArchiverUtils(ArchiverTestCase):
         for patch in patches.values():
             patch.stop()
 
+    def test_get_file_map_invalidated_by_file_update(self):
+        node = factories.NodeFactory()
+        osfstorage = node.get_addon('osfstorage')
+        mocked = mock.Mock(return_value=file_tree_factory(1, 1, 1))
+        with mock.patch.object(osfstorage, '_get_file_tree', mocked):
+            list(archiver_utils.get_file_map(node))
+            list(archiver_utils.get_file_map(node))
+            assert_equal(mocked.call_count, 1)
+            file_signals.file_updated.send(node=node, user=self.user, event_type='file_added', payload={})
+            list(archiver_utils.get_file_map(node))
+            assert_equal(mocked.call_count, 2)
+
+    def test_file_update_invalidates_move_source(self):
+        node = factories.NodeFactory()
+        source = factories.NodeFactory()
+        before = archiver_utils.get_file_tree_version(source._id)
+        payload = {'source': {'nid': source._id}}
+        file_signals.file_updated.send(node=node, user=self.user, event_type='addon_file_moved', payload=payload)
+        assert_equal(archiver_utils.get_file_tree_version(source._id), before + 1)
+
+    def test_get_registration_file_index(self):
+        node = factories.NodeFactory()
+        registration = factories.RegistrationFactory(project=node)
+        file_tree = {
+            'path': '/',
+            'kind': 'folder',
+            'children': [file_factory(), file_factory()],
+        }
+        osfstorage = registration.get_addon('osfstorage')
+        with mock.patch.object(osfstorage, '_get_file_tree', mock.Mock(return_value=file_tree)):
+            index = get_registration_file_index(registration)
+        selected = file_tree['children'][0]
+        sha256 = selected['extra']['hashes']['sha256']
+        assert_equal(index[sha256], [(selected, registration._id, node._id)])
+        value = {
+            'extra': {
+                'sha256': sha256,
+                'selectedFileName': selected['name'],
+                'nodeId': node._id,
+            }
+        }
+        assert_equal(find_registration_file(value, registration, index=index), (selected, registration._id))
+
+
+class TestFileMapCache(OsfTestCase):
+
+    def test_hit_and_miss(self):
+        cache = archiver_utils.FileMapCache(max_size=2, ttl=60)
+        assert_is_none(cache.get(('abc12', 0)))
+        cache.set(('abc12', 0), {'sha': 'file'})
+        assert_equal(cache.get(('abc12', 0)), {'sha': 'file'})
+        stats = cache.get_stats()
+        assert_equal(stats['hits'], 1)
+        assert_equal(stats['misses'], 1)
+        assert_equal(stats['size'], 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = archiver_utils.FileMapCache(max_size=2, ttl=60)
+        cache.set(('abc12', 0), {})
+        cache.set(('def34', 0), {})
+        cache.get(('abc12', 0))
+        cache.set(('ghi56', 0), {})
+        assert_is_none(cache.get(('def34', 0)))
+        assert_is_not_none(cache.get(('abc12', 0)))
+        assert_is_not_none(cache.get(('ghi56', 0)))
+        assert_equal(cache.get_stats()['evictions'], 1)
+
+    def test_entries_expire(self):
+        cache = archiver_utils.FileMapCache(max_size=2, ttl=60)
+        with mock.patch('website.archiver.utils.time.time', return_value=1000):
+            cache.set(('abc12', 0), {})
+        with mock.patch('website.archiver.utils.time.time', return_value=1061):
+            assert_is_none(cache.get(('abc12', 0)))
+        stats = cache.get_stats()
+        assert_equal(stats['expirations'], 1)
+        assert_equal(stats['size'], 0)
+
+    def test_invalidate(self):
+        cache = archiver_utils.FileMapCache(max_size=4, ttl=60)
+        cache.set(('abc12', 0), {})
+        cache.set(('abc12', 1), {})
+        cache.set(('def34', 0), {})
+        cache.invalidate('abc12')
+        assert_is_none(cache.get(('abc12', 0)))
+        assert_is_none(cache.get(('abc12', 1)))
+        assert_is_not_none(cache.get(('def34', 0)))
+        assert_equal(cache.get_stats()['invalidations'], 2)
+
 
 class TestArchiverListeners(ArchiverTestCase):
 
@@ -5,6 +5,7 @@ import httplib as http
 
 import mock
 from nose.tools import *  # noqa
+from modularodm import Q
 from tests.base import fake, OsfTestCase
 from tests.factories import (
     AuthUserFactory, NodeFactory, ProjectFactory,
@@ -21,7 +22,7 @@ from website.exceptions import (
     InvalidSanctionApprovalToken, InvalidSanctionRejectionToken,
     NodeStateError,
 )
-from website.models import Retraction
+from website.models import Node, Retraction
 
 
 class RegistrationRetractionModelsTestCase(OsfTestCase):
@@ -424,6 +425,34 @@ class RegistrationWithChildNodesRetractionModelTestCase(OsfTestCase):
             assert_false(node.is_pending_retraction)
             assert_false(node.is_retracted)
 
+    def test_approval_denormalizes_retracted_on_descendant_nodes(self):
+        self.registration.retract_registration(self.user)
+        self.registration.save()
+        assert_false(self.registration.retracted)
+
+        approval_token = self.registration.retraction.approval_state[self.user._id]['approval_token']
+        self.registration.retraction.approve_retraction(self.user, approval_token)
+        self.registration.retraction.save()
+
+        nodes = [self.registration] + self.registration.get_descendants_recursive()
+        for node in nodes:
+            node.reload()
+            assert_true(node.retracted)
+        retracted = Node.find(Q('retracted', 'eq', True))
+        assert_equal(set(retracted.get_keys()), set(node._id for node in nodes))
+
+    def test_disapproval_does_not_denormalize_retracted(self):
+        self.registration.retract_registration(self.user)
+        self.registration.save()
+
+        rejection_token = self.registration.retraction.approval_state[self.user._id]['rejection_token']
+        self.registration.retraction.disapprove_retraction(self.user, rejection_token)
+        self.registration.retraction.save()
+
+        for node in [self.registration] + self.registration.get_descendants_recursive():
+            node.reload()
+            assert_false(node.retracted)
+
     def test_approval_cancels_pending_embargoes_on_descendant_nodes(self):
         # Initiate embargo for registration
         self.registration.embargo_registration(
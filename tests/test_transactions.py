@@ -14,7 +14,7 @@ from pymongo.errors import CollectionInvalid, OperationFailure
 from framework.flask import add_handlers
 from framework.mongo import database
 from framework.mongo import handlers as database_handlers
-from framework.transactions import context, handlers, commands, messages, utils
+from framework.transactions import context, handlers, commands, messages, utils, read_only
 
 from flask import Flask, abort
 app = Flask('test_transactions_app')
@@ -224,6 +224,58 @@ class TestSkipTransactions(DbTestCase):
         assert_false(mock_commit.called)
 
 
+@transaction_app.route('/read/only/bro/', methods=['GET', 'POST'])
+@read_only.read_only
+def read_only_view():
+    return make_response()
+
+
+@transaction_app.route('/read/only/write/', methods=['GET'])
+@read_only.read_only
+def read_only_write_view():
+    read_only.check_write('txn')
+    return make_response()
+
+
+class TestReadOnlyRequests(DbTestCase):
+
+    @mock.patch('framework.transactions.commands.commit')
+    @mock.patch('framework.transactions.commands.rollback')
+    @mock.patch('framework.transactions.commands.begin')
+    def test_read_only_view_skips_transaction(self, mock_begin, mock_rollback, mock_commit):
+        skipped = read_only.get_stats()['commands_skipped']
+        test_app.post('/read/only/bro/')
+        assert_false(mock_begin.called)
+        assert_false(mock_rollback.called)
+        assert_false(mock_commit.called)
+        assert_equal(read_only.get_stats()['commands_skipped'], skipped + 3)
+
+    @mock.patch('framework.transactions.commands.begin')
+    @mock.patch('website.settings.READ_ONLY_SAFE_METHODS', True)
+    def test_safe_method_skips_transaction(self, mock_begin):
+        test_app.get('/transact/me/bro/')
+        assert_false(mock_begin.called)
+
+    @mock.patch('framework.transactions.commands.commit')
+    @mock.patch('framework.transactions.commands.rollback')
+    @mock.patch('framework.transactions.commands.begin')
+    @mock.patch('website.settings.READ_ONLY_SAFE_METHODS', True)
+    def test_unsafe_method_keeps_transaction(self, mock_begin, mock_rollback, mock_commit):
+        test_app.post('/write/without/errors/')
+        assert_true(mock_begin.called)
+        assert_true(mock_commit.called)
+
+    def test_write_in_read_only_request_is_reported(self):
+        writes = read_only.get_stats()['writes_detected']
+        test_app.get('/read/only/write/')
+        assert_equal(read_only.get_stats()['writes_detected'], writes + 1)
+
+    def test_write_outside_read_only_request_is_not_reported(self):
+        writes = read_only.get_stats()['writes_detected']
+        read_only.check_write('txn')
+        assert_equal(read_only.get_stats()['writes_detected'], writes)
+
+
 @transaction_app.route('/write/without/errors/', methods=['POST'])
 def write_without_errors():
     database['txn'].insert({'_id': 'success'})
@@ -2647,6 +2647,21 @@ class TestWatchViews(OsfTestCase):
         assert_equal(res.json['pages'], 2)
         assert_equal(res.json['logs'][0]['action'], 'file_added')
 
+    def test_get_watched_logs_before(self):
+        project = ProjectFactory()
+        for _ in range(12):
+            project.logs.append(NodeLogFactory(user=self.user, action="file_added"))
+        project.save()
+        watch_cfg = WatchConfigFactory(node=project)
+        self.user.watch(watch_cfg)
+        self.user.save()
+        url = api_url_for("watched_logs_get")
+        res = self.app.get(url, auth=self.auth)
+        res = self.app.get(url, {'before': res.json['next']}, auth=self.auth)
+        assert_equal(len(res.json['logs']), 3)
+        assert_equal(res.json['total'], 12 + 1)
+        assert_is_none(res.json['next'])
+
     def test_get_more_watched_logs_invalid_page(self):
         project = ProjectFactory()
         watch_cfg = WatchConfigFactory(node=project)
@@ -4305,6 +4320,33 @@ class TestDashboardViews(OsfTestCase):
         res = self.app.get(url, auth=friend.auth)
         assert_equal(len(res.json['nodes']), 0)
 
+    def test_get_dashboard_nodes_paginated(self):
+        projects = [ProjectFactory(creator=self.creator) for _ in range(3)]
+        url = api_url_for('get_dashboard_nodes', page=1, size=2)
+        res = self.app.get(url, auth=self.creator.auth)
+        assert_equal(res.json['total'], 3)
+        assert_equal(res.json['pages'], 2)
+        assert_equal([node['id'] for node in res.json['nodes']], [projects[2]._id])
+
+    def test_get_dashboard_nodes_invalid_page(self):
+        ProjectFactory(creator=self.creator)
+        url = api_url_for('get_dashboard_nodes', page=3, size=2)
+        res = self.app.get(url, auth=self.creator.auth, expect_errors=True)
+        assert_equal(res.status_code, 400)
+
+    def test_get_dashboard_nodes_reflects_updates(self):
+        project = ProjectFactory(creator=self.creator)
+        project.set_title('Renamed', auth=Auth(self.creator), save=True)
+        url = api_url_for('get_dashboard_nodes')
+        res = self.app.get(url, auth=self.creator.auth)
+        assert_equal(res.json['nodes'][0]['title'], 'Renamed')
+        assert_equal(res.json['nodes'][0]['permissions'], 'admin')
+        assert_equal(res.json['rescale_ratio'], float(len(project.logs)))
+
+        project.remove_node(Auth(self.creator))
+        res = self.app.get(url, auth=self.creator.auth)
+        assert_equal(res.json['nodes'], [])
+
     def test_get_dashboard_nodes_invalid_permission(self):
         url = api_url_for('get_dashboard_nodes', permissions='not-valid')
         res = self.app.get(url, auth=self.creator.auth, expect_errors=True)
@@ -5,6 +5,7 @@ from __future__ import absolute_import
 import unittest
 import datetime as dt
 
+import mock
 from pytz import utc
 from nose.tools import *  # flake8: noqa (PEP8 asserts)
 from framework.auth import Auth
@@ -86,6 +87,54 @@ class TestWatching(OsfTestCase):
         day_log_ids = list(self.user.get_daily_digest_log_ids())
         assert_in(self.last_log._id, day_log_ids)
 
+    def test_get_recent_log_ids_newest_first(self):
+        self._watch_project(self.project)
+        log_ids = list(self.user.get_recent_log_ids())
+        assert_equal(log_ids, sorted(log_ids, reverse=True))
+        assert_equal(log_ids[0], self.last_log._id)
+
+    def test_get_recent_log_ids_merges_watched_nodes(self):
+        other = ProjectFactory(creator=self.user)
+        self._watch_project(self.project)
+        self._watch_project(other)
+        log_ids = list(self.user.get_recent_log_ids())
+        expected = self.project.logs._to_primary_keys() + other.logs._to_primary_keys()
+        assert_equal(log_ids, sorted(expected, reverse=True))
+
+    def test_get_recent_log_ids_before(self):
+        self._watch_project(self.project)
+        log_ids = list(self.user.get_recent_log_ids())
+        older = list(self.user.get_recent_log_ids(before=log_ids[0]))
+        assert_equal(older, log_ids[1:])
+
+    def test_get_recent_log_ids_offset_and_limit(self):
+        self._watch_project(self.project)
+        log_ids = list(self.user.get_recent_log_ids())
+        assert_equal(list(self.user.get_recent_log_ids(offset=1, limit=1)), log_ids[1:2])
+
+    def test_count_recent_logs(self):
+        self._watch_project(self.project)
+        assert_equal(
+            self.user.count_recent_logs(),
+            len(list(self.user.get_recent_log_ids()))
+        )
+
+    def test_count_recent_logs_not_watching(self):
+        assert_equal(self.user.count_recent_logs(), 0)
+        assert_equal(list(self.user.get_recent_log_ids()), [])
+
+    @mock.patch('framework.auth.core.settings.WATCHED_LOGS_MAX_QUERY_NODES', 0)
+    def test_get_recent_log_ids_merge_matches_query(self):
+        other = ProjectFactory(creator=self.user)
+        self._watch_project(self.project)
+        self._watch_project(other)
+        merged = list(self.user.get_recent_log_ids())
+        with mock.patch('framework.auth.core.settings.WATCHED_LOGS_MAX_QUERY_NODES', 1000):
+            queried = list(self.user.get_recent_log_ids())
+        assert_equal(merged, queried)
+        assert_equal(list(self.user.get_recent_log_ids(before=merged[0], limit=1)), merged[1:2])
+        assert_equal(self.user.count_recent_logs(), len(merged))
+
     def _watch_project(self, project):
         watch_config = WatchConfigFactory(node=project)
         self.user.watch(watch_config)
@@ -6,7 +6,6 @@ import mimetypes
 from bson import ObjectId
 from modularodm import fields
 from mako.lookup import TemplateLookup
-from time import sleep
 
 import requests
 from modularodm import Q
@@ -22,6 +21,7 @@ from framework.auth import Auth
 
 from website import settings
 from website.addons.base import serializer, logger
+from website.addons.base.crawler import FileTreeCrawler
 from website.project.model import Node
 from website.util import waterbutler_url_for
 
@@ -715,7 +715,7 @@ class StorageAddonBase(object):
             name = name + ": {folder}".format(folder=folder_name)
         return name
 
-    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None):
+    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None, session=None):
         kwargs = dict(
             provider=self.config.short_name,
             path=filenode.get('path', ''),
@@ -731,37 +731,39 @@ class StorageAddonBase(object):
             'metadata',
             **kwargs
         )
-        res = requests.get(metadata_url)
+        res = (session or requests).get(metadata_url)
         if res.status_code != 200:
             raise HTTPError(res.status_code, data={
                 'error': res.json(),
             })
-        # TODO: better throttling?
-        sleep(1.0 / 5.0)
         return res.json().get('data', [])
 
-    def _get_file_tree(self, filenode=None, user=None, cookie=None, version=None):
+    def _get_file_tree(self, filenode=None, user=None, cookie=None, version=None, stats=None):
         """
-        Recursively get file metadata
+        Get file metadata for the whole tree below ``filenode``, listing
+        folders concurrently. Crawl statistics are copied into ``stats``
+        if given.
         """
         filenode = filenode or {
             'path': '/',
             'kind': 'folder',
             'name': self.root_node.name,
         }
-        if filenode.get('kind') == 'file':
-            return filenode
-        elif 'size' in filenode:
-            return filenode
-        kwargs = {
-            'version': version,
-            'cookie': cookie,
-        }
-        filenode['children'] = [
-            self._get_file_tree(child, user, cookie=cookie)
-            for child in self._get_fileobj_child_metadata(filenode, user, **kwargs)
-        ]
-        return filenode
+        # Look up the cookie once rather than once per folder
+        if user and not cookie:
+            cookie = user.get_or_create_cookie()
+
+        def list_folder(folder, session):
+            return self._get_fileobj_child_metadata(
+                folder, user, cookie=cookie, version=version, session=session
+            )
+
+        crawler = FileTreeCrawler(list_folder, self.config.short_name)
+        try:
+            return crawler.crawl(filenode)
+        finally:
+            if stats is not None:
+                stats.update(crawler.stats)
 
 class AddonOAuthNodeSettingsBase(AddonNodeSettingsBase):
     _meta = {
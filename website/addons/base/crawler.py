@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""Concurrent crawler for addon file trees. Folders are listed by a bounded
+pool of threads sharing one keep-alive HTTP session; requests to each provider
+are throttled by a token bucket shared by every crawl in the process.
+"""
+
+import time
+import Queue
+import httplib
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from framework.exceptions import HTTPError
+
+from website import settings
+
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = frozenset([
+    429,  # Too Many Requests
+    httplib.INTERNAL_SERVER_ERROR,
+    httplib.BAD_GATEWAY,
+    httplib.SERVICE_UNAVAILABLE,
+    httplib.GATEWAY_TIMEOUT,
+])
+
+
+class TokenBucket(object):
+    """Thread-safe token bucket allowing ``rate`` requests per second with
+    bursts of up to ``capacity``.
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.time()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, sleeping until one is available. Return the time
+        spent waiting.
+        """
+        waited = 0
+        while True:
+            with self.lock:
+                now = time.time()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(provider):
+    """Return the process-wide token bucket for ``provider``."""
+    with _buckets_lock:
+        if provider not in _buckets:
+            rate = settings.ARCHIVE_CRAWL_RATE_LIMITS.get(
+                provider,
+                settings.ARCHIVE_CRAWL_DEFAULT_RATE_LIMIT
+            )
+            _buckets[provider] = TokenBucket(rate)
+        return _buckets[provider]
+
+
+def make_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class FileTreeCrawler(object):
+    """Build an addon file tree by listing folders concurrently.
+
+    :param list_folder: Callable ``(filenode, session) -> children`` returning
+        the metadata of the children of a folder; raises `HTTPError` on failure
+    :param str provider: Short name of the addon, used for rate limiting
+    """
+    def __init__(self, list_folder, provider, max_workers=None, retries=None, backoff=None):
+        self.list_folder = list_folder
+        self.bucket = get_bucket(provider)
+        self.max_workers = max_workers or settings.ARCHIVE_CRAWL_WORKERS
+        self.retries = settings.ARCHIVE_CRAWL_RETRIES if retries is None else retries
+        self.backoff = settings.ARCHIVE_CRAWL_BACKOFF if backoff is None else backoff
+        self.stats = {
+            'requests': 0,
+            'retries': 0,
+            'folders': 0,
+            'files': 0,
+            'throttled_seconds': 0,
+            'crawl_seconds': 0,
+        }
+        self._stats_lock = threading.Lock()
+        self._queue = Queue.Queue()
+        self._error = None
+
+    def _count(self, key, value=1):
+        with self._stats_lock:
+            self.stats[key] += value
+
+    def _fetch(self, filenode, session):
+        for attempt in range(self.retries + 1):
+            self._count('throttled_seconds', self.bucket.acquire())
+            self._count('requests')
+            try:
+                return self.list_folder(filenode, session)
+            except HTTPError as error:
+                if error.code not in RETRY_STATUS_CODES or attempt == self.retries:
+                    raise
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+            self._count('retries')
+            time.sleep(self.backoff * 2 ** attempt)
+
+    def _expand(self, filenode, session):
+        """Attach the children of ``filenode``; return the ones that are
+        folders still to be listed.
+        """
+        filenode['children'] = self._fetch(filenode, session)
+        self._count('folders')
+        folders = []
+        for child in filenode['children']:
+            if is_unexpanded_folder(child):
+                folders.append(child)
+            else:
+                self._count('files')
+        return folders
+
+    def _work(self, session):
+        while True:
+            filenode = self._queue.get()
+            try:
+                if filenode is None:
+                    return
+                if self._error is None:
+                    for child in self._expand(filenode, session):
+                        self._queue.put(child)
+            except Exception as error:
+                logger.exception(error)
+                self._error = self._error or error
+            finally:
+                self._queue.task_done()
+
+    def crawl(self, root):
+        """Fill in the ``children`` of ``root`` and of every folder below it.
+        Re-raise the first error encountered by any worker.
+        """
+        start = time.time()
+        if not is_unexpanded_folder(root):
+            return root
+        session = make_session(self.max_workers)
+        workers = [
+            threading.Thread(target=self._work, args=(session, ))
+            for _ in range(self.max_workers)
+        ]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+        try:
+            self._queue.put(root)
+            self._queue.join()
+        finally:
+            for _ in workers:
+                self._queue.put(None)
+            for worker in workers:
+                worker.join()
+            session.close()
+            self.stats['crawl_seconds'] = time.time() - start
+        if self._error is not None:
+            raise self._error
+        return root
+
+
+def is_unexpanded_folder(filenode):
+    return filenode.get('kind') != 'file' and 'size' not in filenode
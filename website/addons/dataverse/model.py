@@ -1,5 +1,4 @@
 # -*- coding: utf-8 -*-
-from time import sleep
 import requests
 import httplib as http
 
@@ -91,7 +90,7 @@ class AddonDataverseNodeSettings(StorageAddonBase, AddonOAuthNodeSettingsBase):
             auth=auth
         )
 
-    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None):
+    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None, session=None):
         kwargs = dict(
             provider=self.config.short_name,
             path=filenode.get('path', ''),
@@ -107,7 +106,7 @@ class AddonDataverseNodeSettings(StorageAddonBase, AddonOAuthNodeSettingsBase):
             'metadata',
             **kwargs
         )
-        res = requests.get(metadata_url)
+        res = (session or requests).get(metadata_url)
         if res.status_code != 200:
             # The Dataverse API returns a 404 if the dataset has no published files
             if res.status_code == http.NOT_FOUND and version == 'latest-published':
@@ -115,8 +114,6 @@ class AddonDataverseNodeSettings(StorageAddonBase, AddonOAuthNodeSettingsBase):
             raise HTTPError(res.status_code, data={
                 'error': res.json(),
             })
-        # TODO: better throttling?
-        sleep(1.0 / 5.0)
         return res.json().get('data', [])
 
     def delete(self, save=True):
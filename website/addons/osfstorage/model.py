@@ -4,7 +4,6 @@ import logging
 
 from modularodm import fields
 
-from website.files import utils as files_utils
 from website.files.models import OsfStorageFolder
 from website.addons.osfstorage import settings
 from website.addons.base import AddonNodeSettingsBase, StorageAddonBase
@@ -47,7 +46,7 @@ class OsfStorageNodeSettings(StorageAddonBase, AddonNodeSettingsBase):
         if not self.root_node:
             self.on_add()
 
-        clone.root_node = files_utils.copy_files(self.get_root(), clone.owner).stored_object
+        clone.root_node = self.get_root().copy_tree(clone.owner).stored_object
         clone.save()
 
         return clone, None
@@ -11,8 +11,10 @@ from website.addons.osfstorage.tests.utils import StorageTestCase
 
 import datetime
 
+from modularodm import Q
 from modularodm import exceptions as modm_errors
 
+from framework.mongo import database
 
 from website.files import models
 from website.addons.osfstorage import utils
@@ -235,6 +237,158 @@ class TestOsfstorageFileNode(StorageTestCase):
         child = self.node_settings.get_root().append_folder('Cloud').append_file('Carp')
         assert_equals('/Cloud/Carp', child.materialized_path)
 
+    def test_ancestors(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        child = folder.append_file('Carp')
+        assert_equal(root.ancestors, [])
+        assert_equal(child.ancestors, [root._id, folder._id])
+        assert_equal(child.stored_object.materialized_path, '/Cloud/Carp')
+
+    def test_move_updates_descendant_paths(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        child = folder.append_file('Carp')
+        destination = root.append_folder('Sky')
+
+        folder.move_under(destination, name='Storm')
+        child.reload()
+
+        assert_equal(child.materialized_path, '/Sky/Storm/Carp')
+        assert_equal(child.ancestors, [root._id, destination._id, folder._id])
+
+    def test_copy_folder_copies_tree(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        nested = folder.append_folder('Rain')
+        child = nested.append_file('Carp')
+        child.create_version(self.user, {
+            'service': 'cloud',
+            settings.WATERBUTLER_RESOURCE: 'osf',
+            'object': '06d80e',
+        }, {'size': 1337})
+        destination = root.append_folder('Sky')
+
+        copied = folder.copy_under(destination, name='Storm')
+
+        copied_nested = copied.find_child_by_name('Rain', kind=0)
+        copied_child = copied_nested.find_child_by_name('Carp')
+        assert_not_equal(copied._id, folder._id)
+        assert_not_equal(copied_child._id, child._id)
+        assert_equal(copied.name, 'Storm')
+        assert_equal(copied_child.materialized_path, '/Sky/Storm/Rain/Carp')
+        assert_equal(copied_child.ancestors, [root._id, destination._id, copied._id, copied_nested._id])
+        assert_equal(copied_child.versions, child.versions)
+        assert_equal(child.materialized_path, '/Cloud/Rain/Carp')
+
+    @mock.patch('website.search.search.update_files')
+    def test_copy_folder_queues_files_once(self, mock_update_files):
+        folder = self.node_settings.get_root().append_folder('Cloud')
+        folder.append_file('Carp')
+        folder.append_folder('Rain').append_file('Tuna')
+
+        copied = folder.copy_under(self.node_settings.get_root().append_folder('Sky'))
+
+        assert_equal(mock_update_files.call_count, 1)
+        assert_equal(
+            sorted(mock_update_files.call_args[0][0]),
+            sorted(each._id for each in models.OsfStorageFile.find(Q('ancestors', 'eq', copied._id)))
+        )
+
+    def test_copy_tree_as_root(self):
+        root = self.node_settings.get_root()
+        root.append_folder('Cloud').append_file('Carp')
+        fork = ProjectFactory()
+
+        copied = root.copy_tree(fork)
+
+        copied_child = copied.find_child_by_name('Cloud', kind=0).find_child_by_name('Carp')
+        assert_is_none(copied.parent)
+        assert_equal(copied.materialized_path, '/')
+        assert_equal(copied_child.node, fork)
+        assert_equal(copied_child.materialized_path, '/Cloud/Carp')
+
+    def test_copy_folder_without_stored_ancestors(self):
+        folder = self.node_settings.get_root().append_folder('Cloud')
+        child = folder.append_file('Carp')
+        database['storedfilenode'].update(
+            {'_id': child._id},
+            {'$unset': {'ancestors': True}},
+        )
+        models.StoredFileNode._clear_caches()
+
+        copied = folder.copy_under(self.node_settings.get_root().append_folder('Sky'))
+
+        assert_equal(copied.find_child_by_name('Carp').materialized_path, '/Sky/Cloud/Carp')
+
+    def test_move_folder_with_legacy_grandchild(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        nested = folder.append_folder('Rain')
+        child = nested.append_file('Carp')
+        database['storedfilenode'].update(
+            {'_id': child._id},
+            {'$unset': {'ancestors': True}},
+        )
+        models.StoredFileNode._clear_caches()
+
+        folder.move_under(root.append_folder('Sky'))
+        child.reload()
+
+        assert_equal(child.materialized_path, '/Sky/Cloud/Rain/Carp')
+
+    def test_copy_folder_without_search(self):
+        folder = self.node_settings.get_root().append_folder('Cloud')
+        folder.append_file('Carp')
+        destination = self.node_settings.get_root().append_folder('Sky')
+
+        with mock.patch('website.search.search.settings.USE_CELERY', False):
+            with mock.patch('website.search.search.search_engine', None):
+                copied = folder.copy_under(destination)
+
+        assert_equal(copied.find_child_by_name('Carp').materialized_path, '/Sky/Cloud/Carp')
+
+    @mock.patch('website.search.search.update_files')
+    def test_move_folder_moves_tree(self, mock_update_files):
+        new_project = ProjectFactory()
+        move_to = new_project.get_addon('osfstorage').get_root().append_folder('Sky')
+        folder = self.node_settings.get_root().append_folder('Cloud')
+        nested = folder.append_folder('Rain')
+        child = nested.append_file('Carp')
+
+        folder.move_under(move_to)
+        nested.reload()
+        child.reload()
+
+        assert_equal(nested.node, new_project)
+        assert_equal(child.node, new_project)
+        assert_equal(child.materialized_path, '/Sky/Cloud/Rain/Carp')
+        assert_equal(child.ancestors, [move_to.parent._id, move_to._id, folder._id, nested._id])
+        mock_update_files.assert_called_once_with([child._id])
+
+    def test_ancestors_under_folder_without_stored_ancestors(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        nested = folder.append_folder('Rain')
+        database['storedfilenode'].update(
+            {'_id': nested._id},
+            {'$unset': {'ancestors': True}},
+        )
+        models.StoredFileNode._clear_caches()
+        nested = models.OsfStorageFolder.load(nested._id)
+
+        child = nested.append_file('Carp')
+
+        assert_equal(child.ancestors, [root._id, folder._id, nested._id])
+        assert_equal([each._id for each in child.get_lineage()], [child._id, nested._id, folder._id, root._id])
+
+    def test_get_lineage(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        child = folder.append_file('Carp')
+        assert_equal(child.get_lineage(), [child, folder, root])
+        assert_equal(root.get_lineage(), [root])
+
     def test_copy(self):
         to_copy = self.node_settings.get_root().append_file('Carp')
         copy_to = self.node_settings.get_root().append_folder('Cloud')
@@ -508,6 +662,42 @@ class TestOsfStorageCheckout(StorageTestCase):
         with assert_raises(FileNodeCheckedOutError):
             folder.delete()
 
+    def test_folder_with_nested_checked_out_file(self):
+        folder = self.root_node.append_folder('folder')
+        nested = folder.append_folder('nested')
+        self.file.move_under(nested)
+        assert_false(folder.is_checked_out)
+
+        self.file.checkout = self.user
+        self.file.save()
+        assert_true(folder.is_checked_out)
+        assert_true(self.root_node.is_checked_out)
+
+    def test_folder_with_checked_out_file_without_stored_ancestors(self):
+        folder = self.root_node.append_folder('folder')
+        nested = folder.append_folder('nested')
+        self.file.move_under(nested)
+        self.file.checkout = self.user
+        self.file.save()
+        database['storedfilenode'].update(
+            {'_id': self.file._id},
+            {'$unset': {'ancestors': True}},
+        )
+
+        assert_true(folder.has_legacy_lineage())
+        assert_true(folder.is_checked_out)
+
+    def test_legacy_lineage_not_checked_once_populated(self):
+        database['storedfilenode'].update(
+            {'_id': self.file._id},
+            {'$unset': {'ancestors': True}},
+        )
+        assert_true(self.root_node.has_legacy_lineage())
+        with mock.patch('website.files.models.osfstorage.settings.OSFSTORAGE_ANCESTORS_POPULATED', True):
+            with mock.patch('website.files.models.osfstorage.database') as mock_database:
+                assert_false(self.root_node.has_legacy_lineage())
+        assert_false(mock_database.__getitem__.called)
+
     def test_move_checked_out_file(self):
         self.file.checkout = self.user
         self.file.save()
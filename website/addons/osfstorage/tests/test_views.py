@@ -626,6 +626,54 @@ class TestMoveHook(HookTestCase):
         )
         assert_equal(res.status_code, 405)
 
+class TestCopyHook(HookTestCase):
+
+    def setUp(self):
+        super(TestCopyHook, self).setUp()
+        self.root_node = self.node_settings.get_root()
+
+    def send_copy_hook(self, source, destination, name, **kwargs):
+        return self.send_hook(
+            'osfstorage_copy_hook',
+            {'nid': self.root_node.node._id},
+            payload={
+                'source': source._id,
+                'node': self.root_node._id,
+                'user': self.user._id,
+                'destination': {
+                    'parent': destination._id,
+                    'node': destination.node._id,
+                    'name': name,
+                }
+            },
+            method='post_json',
+            **kwargs
+        )
+
+    def test_copy_hook(self):
+        folder = self.root_node.append_folder('Nina Simone')
+        folder.append_file('Ain\'t_got_no,_I_got_life')
+        destination = self.root_node.append_folder('Albums')
+        res = self.send_copy_hook(folder, destination, folder.name)
+        assert_equal(res.status_code, 201)
+        assert_equal(res.json['name'], folder.name)
+
+    def test_copy_file_onto_existing_name(self):
+        file = self.root_node.append_file('Ain\'t_got_no,_I_got_life')
+        folder = self.root_node.append_folder('Nina Simone')
+        folder.append_file(file.name)
+        res = self.send_copy_hook(file, folder, file.name, expect_errors=True)
+        assert_equal(res.status_code, 409)
+
+    def test_copy_folder_onto_existing_name(self):
+        folder = self.root_node.append_folder('Nina Simone')
+        folder.append_file('Ain\'t_got_no,_I_got_life')
+        destination = self.root_node.append_folder('Albums')
+        destination.append_folder(folder.name)
+        res = self.send_copy_hook(folder, destination, folder.name, expect_errors=True)
+        assert_equal(res.status_code, 409)
+
+
 class TestFileTags(StorageTestCase):
 
     def test_file_add_tag(self):
@@ -14,6 +14,7 @@ from modularodm import fields
 
 from framework.forms.utils import sanitize
 from framework.guid.model import GuidStoredObject
+from framework.mongo import database
 
 from website import settings
 from website.addons.base import AddonNodeSettingsBase
@@ -32,6 +33,9 @@ from .exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Rendered HTML and text of wiki pages, keyed by page and node URL
+RENDERED_COLLECTION = 'wikipagerendered'
+
 
 class AddonWikiNodeSettings(AddonNodeSettingsBase):
 
@@ -152,6 +156,10 @@ def render_content(content, node):
     return sanitized_content
 
 
+def get_rendered_key(page_id, node_url):
+    return '{0}:{1}'.format(page_id, node_url)
+
+
 class NodeWikiPage(GuidStoredObject):
 
     _id = fields.StringField(primary=True)
@@ -179,20 +187,54 @@ class NodeWikiPage(GuidStoredObject):
 
     def html(self, node):
         """The cleaned HTML of the page"""
+        return self.get_rendered(node)['html']
+
+    def raw_text(self, node):
+        """ The raw text of the page, suitable for using in a test search"""
+        return self.get_rendered(node)['text']
+
+    def render(self, node):
+        """Render the page as seen from ``node``, which builds the targets of
+        wikilinks. Return a dict with the cleaned ``html`` and plain ``text``.
+        """
         sanitized_content = render_content(self.content, node=node)
         try:
-            return linkify(
+            html = linkify(
                 sanitized_content,
                 [nofollow, ],
             )
         except TypeError:
             logger.warning('Returning unlinkified content.')
-            return sanitized_content
-
-    def raw_text(self, node):
-        """ The raw text of the page, suitable for using in a test search"""
+            html = sanitized_content
+        return {
+            'html': html,
+            'text': sanitize(html, tags=[], strip=True),
+        }
+
+    def get_rendered(self, node):
+        """Return the rendering of the page as seen from ``node``, rendering
+        and storing it on first read. The content of a page never changes, and
+        the rendering only depends on the URL of ``node``, so the stored
+        rendering is keyed by both and never goes stale.
+        """
+        key = get_rendered_key(self._id, node.url)
+        rendered = database[RENDERED_COLLECTION].find_one({'_id': key})
+        if rendered is None:
+            rendered = self.render(node)
+            database[RENDERED_COLLECTION].update(
+                {'_id': key},
+                {'$set': {
+                    'page': self._id,
+                    'html': rendered['html'],
+                    'text': rendered['text'],
+                }},
+                upsert=True,
+            )
+        return rendered
 
-        return sanitize(self.html(node), tags=[], strip=True)
+    def invalidate_rendered(self):
+        """Drop every stored rendering of the page."""
+        database[RENDERED_COLLECTION].remove({'page': self._id})
 
     def get_draft(self, node):
         """
@@ -223,6 +265,7 @@ class NodeWikiPage(GuidStoredObject):
 
     def rename(self, new_name, save=True):
         self.page_name = new_name
+        self.invalidate_rendered()
         if save:
             self.save()
 
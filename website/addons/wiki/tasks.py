@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+
+from framework.tasks import app as celery_app
+
+
+@celery_app.task(name='wiki.render_wiki_page')
+def render_wiki_page(page_id, node_id):
+    """Store the rendering of a new wiki page ahead of its first view."""
+    from website.models import Node
+    from website.addons.wiki.model import NodeWikiPage
+
+    page = NodeWikiPage.load(page_id)
+    node = Node.load(node_id)
+    if page and node:
+        page.get_rendered(node)
@@ -20,13 +20,16 @@ from website.exceptions import NodeStateError
 from website.addons.wiki import settings
 from website.addons.wiki import views
 from website.addons.wiki.exceptions import InvalidVersionError
-from website.addons.wiki.model import NodeWikiPage, render_content
+from website.addons.wiki.model import (
+    NodeWikiPage, render_content, RENDERED_COLLECTION, get_rendered_key,
+)
 from website.addons.wiki.utils import (
     get_sharejs_uuid, generate_private_uuid, share_db, delete_share_doc,
     migrate_uuid, format_wiki_version, serialize_wiki_settings,
 )
 from website.addons.wiki.tests.config import EXAMPLE_DOCS, EXAMPLE_OPS
 from framework.auth import Auth
+from framework.mongo import database
 from framework.mongo.utils import to_mongo_key
 
 # forward slashes are not allowed, typically they would be replaced with spaces
@@ -708,6 +711,47 @@ class TestWikiLinks(OsfTestCase):
         assert_equal(expected, wiki.html(node))
 
 
+class TestWikiRenderedCache(OsfTestCase):
+
+    def setUp(self):
+        super(TestWikiRenderedCache, self).setUp()
+        self.user = AuthUserFactory()
+        self.project = ProjectFactory(creator=self.user)
+        self.wiki = NodeWikiFactory(
+            content='[[wiki2]] *text*',
+            user=self.user,
+            node=self.project,
+        )
+
+    def tearDown(self):
+        super(TestWikiRenderedCache, self).tearDown()
+        database[RENDERED_COLLECTION].remove()
+
+    def test_rendered_once(self):
+        with mock.patch('website.addons.wiki.model.render_content', wraps=render_content) as mock_render:
+            html = self.wiki.html(self.project)
+            assert_equal(self.wiki.html(self.project), html)
+            assert_equal(self.wiki.raw_text(self.project), 'wiki2 text')
+        assert_equal(mock_render.call_count, 1)
+
+    def test_rendered_per_node_url(self):
+        fork = self.project.fork_node(Auth(self.user))
+        assert_in(self.project.url, self.wiki.html(self.project))
+        assert_in(fork.url, self.wiki.html(fork))
+        assert_true(database[RENDERED_COLLECTION].find_one({'_id': get_rendered_key(self.wiki._id, fork.url)}))
+
+    def test_rename_invalidates(self):
+        self.wiki.html(self.project)
+        self.wiki.rename('renamed')
+        assert_equal(database[RENDERED_COLLECTION].find({'page': self.wiki._id}).count(), 0)
+
+    def test_update_node_wiki_renders_page(self):
+        self.project.update_node_wiki('home', 'Hello world', Auth(self.user))
+        page = self.project.get_wiki_page('home')
+        key = get_rendered_key(page._id, self.project.url)
+        assert_equal(database[RENDERED_COLLECTION].find_one({'_id': key})['text'], 'Hello world')
+
+
 class TestWikiUuid(OsfTestCase):
 
     def setUp(self):
@@ -9,6 +9,7 @@ from website.archiver import (
 from website.archiver import signals as archiver_signals
 
 from website.project import signals as project_signals
+from website.addons.base import signals as file_signals
 
 @project_signals.after_create_registration.connect
 def after_register(src, dst, user):
@@ -74,3 +75,15 @@ def archive_fail(dst, errors):
         dst.root.registered_user,
         errors
     )
+
+
+@file_signals.file_updated.connect
+def invalidate_file_map(sender, node=None, user=None, event_type=None, payload=None):
+    """Blinker listener for file changes. Drops cached file maps of the
+    changed node, and of the source node of a move or copy.
+    """
+    archiver_utils.invalidate_file_map(node._id)
+    source = (payload or {}).get('source') or {}
+    source_id = source.get('nid')
+    if source_id and source_id != node._id:
+        archiver_utils.invalidate_file_map(source_id)
@@ -39,6 +39,9 @@ class ArchiveTarget(StoredObject):
     # }
     stat_result = fields.DictionaryField()
     errors = fields.StringField(list=True)
+    # Statistics from crawling the addon's file tree: request and retry
+    # counts, folders and files seen, and time spent crawling and throttled
+    crawl_stats = fields.DictionaryField()
 
     def __repr__(self):
         return '<{0}(_id={1}, name={2}, status={3})>'.format(
@@ -174,6 +177,13 @@ class ArchiveJob(StoredObject):
             self._set_target(addon)
         self.save()
 
+    def update_target_crawl_stats(self, addon_short_name, crawl_stats):
+        target = self.get_target(addon_short_name)
+        if not target:
+            return
+        target.crawl_stats = crawl_stats
+        target.save()
+
     def update_target(self, addon_short_name, status, stat_result=None, errors=None):
         stat_result = stat_result or {}
         errors = errors or []
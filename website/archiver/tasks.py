@@ -1,5 +1,6 @@
 import requests
 import json
+import collections
 
 import celery
 from celery.utils.log import get_task_logger
@@ -104,8 +105,9 @@ def stat_addon(addon_short_name, job_pk):
     job = ArchiveJob.load(job_pk)
     src, dst, user = job.info()
     src_addon = src.get_addon(addon_name)
+    crawl_stats = {}
     try:
-        file_tree = src_addon._get_file_tree(user=user, version=version)
+        file_tree = src_addon._get_file_tree(user=user, version=version, stats=crawl_stats)
     except HTTPError as e:
         dst.archive_job.update_target(
             addon_short_name,
@@ -113,6 +115,8 @@ def stat_addon(addon_short_name, job_pk):
             errors=[e.data['error']],
         )
         raise
+    finally:
+        job.update_target_crawl_stats(addon_short_name, crawl_stats)
     result = AggregateStatResult(
         src_addon._id,
         addon_short_name,
@@ -269,14 +273,29 @@ def archive(job_pk):
         ]
     )
 
-def find_registration_file(value, node):
+def get_registration_file_index(node):
+    """Index the files of registration ``node`` and its primary descendants by
+    sha256, loading each component only once.
+
+    :return: dict mapping sha256 to a list of ``(file_metadata, node_id,
+        registered_from_id)`` triples
+    """
+    index = collections.defaultdict(list)
+    registered_from = {}
+    for sha256, value, node_id in utils.get_file_map(node):
+        if node_id not in registered_from:
+            registered_from[node_id] = Node.load(node_id).registered_from._id
+        index[sha256].append((value, node_id, registered_from[node_id]))
+    return index
+
+def find_registration_file(value, node, index=None):
     orig_sha256 = value['extra']['sha256']
     orig_name = value['extra']['selectedFileName']
     orig_node = value['extra']['nodeId']
-    file_map = utils.get_file_map(node)
-    for sha256, value, node_id in file_map:
-        registered_from_id = Node.load(node_id).registered_from._id
-        if sha256 == orig_sha256 and registered_from_id == orig_node and orig_name == value['name']:
+    if index is None:
+        index = get_registration_file_index(node)
+    for value, node_id, registered_from_id in index.get(orig_sha256, []):
+        if registered_from_id == orig_node and orig_name == value['name']:
             return value, node_id
     raise RuntimeError()
 
@@ -290,13 +309,9 @@ def archive_success(dst_pk):
 
     :param str dst_pk: primary key of registration Node
 
-    note:: At first glance this task makes redundant calls to utils.get_file_map (which
-    returns a generator yielding  (<sha256>, <file_metadata>) pairs) on the dst Node. Two
-    notes about utils.get_file_map: 1) this function memoizes previous results to reduce
-    overhead and 2) this function returns a generator that lazily fetches the file metadata
-    of child Nodes (it is possible for a selected file to belong to a child Node) using a
-    non-recursive DFS. Combined this allows for a relatively effient implementation with
-    seemingly redundant calls.
+    note:: The file maps of the dst Node and its children (it is possible for a selected
+    file to belong to a child Node) are walked once to build an index keyed by sha256;
+    each selected file is then found with a single lookup.
     """
     create_app_context()
     dst = Node.load(dst_pk)
@@ -311,13 +326,14 @@ def archive_success(dst_pk):
     )
     if prereg_schema in dst.registered_schema:
         prereg_metadata = dst.registered_meta[prereg_schema._id]
+        file_index = get_registration_file_index(dst)
         updated_metadata = {}
         for key, question in prereg_metadata.items():
             if isinstance(question['value'], dict):
                 for subkey, subvalue in question['value'].items():
                     registration_file = None
                     if subvalue.get('extra', {}).get('sha256'):
-                        registration_file, node_id = find_registration_file(subvalue, dst)
+                        registration_file, node_id = find_registration_file(subvalue, dst, index=file_index)
                         subvalue['extra'].update({
                             'viewUrl': Node.load(node_id).web_url_for(
                                 'addon_view_or_download_file',
@@ -328,7 +344,7 @@ def archive_success(dst_pk):
                     question['value'][subkey] = subvalue
             else:
                 if question.get('extra', {}).get('sha256'):
-                    registration_file, node_id = find_registration_file(question, dst)
+                    registration_file, node_id = find_registration_file(question, dst, index=file_index)
                     question['extra'].update({
                         'viewUrl': Node.load(node_id).web_url_for(
                             'addon_view_or_download_file',
@@ -1,6 +1,9 @@
+import time
 import functools
+import collections
 
 from framework.auth import Auth
+from framework.mongo import database
 
 from website.archiver import (
     StatResult, AggregateStatResult,
@@ -153,15 +156,99 @@ def _do_get_file_map(file_tree):
             stack = stack + tree_node['children']
     return file_map
 
+# Per-node counters bumped whenever a node's files change, so that workers in
+# other processes stop using cached file maps for the node
+FILE_TREE_VERSION_COLLECTION = 'archiverfiletreeversion'
+
+
+def get_file_tree_version(node_id):
+    doc = database[FILE_TREE_VERSION_COLLECTION].find_one({'_id': node_id})
+    return doc['version'] if doc else 0
+
+
+def bump_file_tree_version(node_id):
+    database[FILE_TREE_VERSION_COLLECTION].update(
+        {'_id': node_id},
+        {'$inc': {'version': 1}},
+        upsert=True,
+    )
+
+
+class FileMapCache(object):
+    """LRU cache of file maps keyed by ``(node_id, file tree version)``.
+    Entries expire after ``ttl`` seconds and the least recently used entry is
+    evicted once ``max_size`` entries are held.
+    """
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = collections.OrderedDict()
+        self._stats = collections.Counter()
+
+    def get(self, key):
+        try:
+            expires, value = self._entries.pop(key)
+        except KeyError:
+            self._stats['misses'] += 1
+            return None
+        if expires < time.time():
+            self._stats['expirations'] += 1
+            self._stats['misses'] += 1
+            return None
+        self._entries[key] = (expires, value)
+        self._stats['hits'] += 1
+        return value
+
+    def set(self, key, value):
+        self._entries.pop(key, None)
+        self._entries[key] = (time.time() + self.ttl, value)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def invalidate(self, node_id):
+        for key in [key for key in self._entries if key[0] == node_id]:
+            del self._entries[key]
+            self._stats['invalidations'] += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self):
+        stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+        }
+        stats.update(self._stats)
+        stats['size'] = len(self._entries)
+        return stats
+
+
+file_map_cache = FileMapCache(
+    max_size=settings.ARCHIVE_FILE_MAP_CACHE_SIZE,
+    ttl=settings.ARCHIVE_FILE_MAP_CACHE_TTL,
+)
+
+
+def invalidate_file_map(node_id):
+    bump_file_tree_version(node_id)
+    file_map_cache.invalidate(node_id)
+
+
 def _memoize_get_file_map(func):
-    cache = {}
     @functools.wraps(func)
     def wrapper(node):
-        if node._id not in cache:
+        key = (node._id, get_file_tree_version(node._id))
+        file_map = file_map_cache.get(key)
+        if file_map is None:
             osf_storage = node.get_addon('osfstorage')
             file_tree = osf_storage._get_file_tree(user=node.creator)
-            cache[node._id] = _do_get_file_map(file_tree)
-        return func(node, cache[node._id])
+            file_map = _do_get_file_map(file_tree)
+            file_map_cache.set(key, file_map)
+        return func(node, file_map)
     return wrapper
 
 @_memoize_get_file_map
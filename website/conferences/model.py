@@ -44,6 +44,15 @@ class Conference(StoredObject):
     # Cached number of submissions
     num_submissions = fields.IntegerField(default=0)
 
+    def save(self, *args, **kwargs):
+        first_save = not self._is_loaded
+        rv = super(Conference, self).save(*args, **kwargs)
+        if first_save:
+            # Nodes may have been tagged before the conference was created
+            from website.conferences.submissions import rebuild_submissions
+            rebuild_submissions(self)
+        return rv
+
     @classmethod
     def get_by_endpoint(cls, endpoint, active=True):
         query = Q('endpoint', 'iexact', endpoint)
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""Materialized list of conference submissions. The collection holds one
+document per public, undeleted node tagged with the endpoint of a conference,
+and is updated whenever such a node is tagged, untagged, published, made
+private, deleted or edited. `Conference.num_submissions` is recounted from it
+when the membership of a conference changes.
+"""
+
+import operator
+import functools
+
+from modularodm import Q
+
+from framework.mongo import database
+from framework.auth.core import User
+
+from website.util import web_url_for
+from website.conferences.model import Conference
+
+
+COLLECTION = 'conferencesubmission'
+
+
+def get_collection():
+    collection = database[COLLECTION]
+    # Cached by pymongo, so only sent to the server once in a while
+    collection.ensure_index([('conference', 1), ('dateCreated', -1)])
+    collection.ensure_index('node')
+    return collection
+
+
+def get_submission_id(endpoint, node_id):
+    return u'{0}:{1}'.format(endpoint, node_id)
+
+
+def get_conferences(node):
+    """Return the conferences ``node`` is a submission to."""
+    if not node.is_public or node.is_deleted or not node.tags:
+        return []
+    query = functools.reduce(operator.or_, [
+        Q('endpoint', 'iexact', tag._id)
+        for tag in node.tags
+    ])
+    return list(Conference.find(query))
+
+
+def serialize_submission(node, endpoint):
+    # Only the id of the author is stored, so that a change of name shows up
+    # without updating the submissions
+    visible_contributor_ids = node.visible_contributor_ids
+    return {
+        'conference': endpoint,
+        'node': node._id,
+        'title': node.title,
+        'nodeUrl': node.url,
+        'authorId': visible_contributor_ids[0] if visible_contributor_ids else None,
+        'authorUrl': node.creator.url,
+        'systemTags': list(node.system_tags),
+        'dateCreated': str(node.date_created),
+        'tags': ' '.join(tag._id for tag in node.tags),
+    }
+
+
+def update_submissions(node):
+    """Add, update or remove the submissions of ``node``."""
+    collection = get_collection()
+    endpoints = [conf.endpoint for conf in get_conferences(node)]
+    previous = [
+        each['conference']
+        for each in collection.find({'node': node._id}, {'conference': 1})
+    ]
+    if previous:
+        collection.remove({'node': node._id, 'conference': {'$nin': endpoints}})
+    for endpoint in endpoints:
+        collection.update(
+            {'_id': get_submission_id(endpoint, node._id)},
+            {'$set': serialize_submission(node, endpoint)},
+            upsert=True,
+        )
+    for endpoint in set(previous).symmetric_difference(endpoints):
+        update_count(Conference.load(endpoint))
+
+
+def update_count(conf):
+    if conf is None:
+        return
+    conf.num_submissions = get_collection().find({'conference': conf.endpoint}).count()
+    conf.save()
+
+
+def rebuild_submissions(conf):
+    """Recompute every submission to ``conf`` from its tagged nodes."""
+    from website.models import Tag
+
+    collection = get_collection()
+    node_ids = set()
+    for tag in Tag.find(Q('_id', 'iexact', conf.endpoint)):
+        for node in tag.node__tagged:
+            if not node or not node.is_public or node.is_deleted:
+                continue
+            node_ids.add(node._id)
+            collection.update(
+                {'_id': get_submission_id(conf.endpoint, node._id)},
+                {'$set': serialize_submission(node, conf.endpoint)},
+                upsert=True,
+            )
+    collection.remove({'conference': conf.endpoint, 'node': {'$nin': list(node_ids)}})
+    update_count(conf)
+
+
+def get_submissions(endpoints=None, page=None, size=None):
+    """Return a page of submissions, most recent first, with the total number
+    of submissions.
+
+    :param list endpoints: Conferences to list; all if `None`
+    """
+    query = {'conference': {'$in': endpoints}} if endpoints is not None else {}
+    cursor = get_collection().find(query).sort('dateCreated', -1)
+    total = cursor.count()
+    if size:
+        cursor = cursor.skip((page or 0) * size).limit(size)
+    return list(cursor), total
+
+
+def get_downloads(node_ids):
+    """Return the download URL and count of the first file of each node, with
+    one query for the files and one for their counts.
+    """
+    from website.files.models import StoredFileNode
+
+    files = {}
+    for record in StoredFileNode.find(Q('node', 'in', list(node_ids)) & Q('is_file', 'eq', True)):
+        files.setdefault(record.to_storage()['node'], record)
+    pages = {
+        u'download:{0}:{1}'.format(node_id, record._id): node_id
+        for node_id, record in files.items()
+    }
+    counts = {
+        pages[counter['_id']]: counter.get('total', 0)
+        for counter in database['pagecounters'].find({'_id': {'$in': pages.keys()}}, {'total': 1})
+    }
+    return {
+        node_id: {
+            'downloadUrl': web_url_for(
+                'addon_view_or_download_file',
+                pid=node_id,
+                path=record.path.strip('/'),
+                provider='osfstorage',
+                action='download',
+                _absolute=True,
+            ),
+            'download': counts.get(node_id, 0),
+        }
+        for node_id, record in files.items()
+    }
+
+
+def render_submissions(submissions):
+    """Format materialized submissions for the meetings pages."""
+    conferences = {
+        conf.endpoint: conf
+        for conf in Conference.find(Q('endpoint', 'in', list({each['conference'] for each in submissions})))
+    }
+    downloads = get_downloads({each['node'] for each in submissions})
+    author_ids = list({each['authorId'] for each in submissions if each.get('authorId')})
+    authors = {
+        author._id: author.family_name if author.family_name else author.fullname
+        for author in User.load_many(author_ids)
+        if author
+    }
+    rendered = []
+    for idx, each in enumerate(submissions):
+        conf = conferences.get(each['conference'])
+        if conf is None:
+            continue
+        field_names = conf.field_names
+        download = downloads.get(each['node'], {'downloadUrl': '', 'download': 0})
+        rendered.append({
+            'id': idx,
+            'title': each['title'],
+            'nodeUrl': each['nodeUrl'],
+            'author': authors.get(each.get('authorId'), each.get('author', '')),
+            'authorUrl': each['authorUrl'],
+            'category': field_names['submission1'] if field_names['submission1'] in each['systemTags'] else field_names['submission2'],
+            'download': download['download'],
+            'downloadUrl': download['downloadUrl'],
+            'dateCreated': each['dateCreated'],
+            'confName': conf.name,
+            'confUrl': web_url_for('conference_results', meeting=conf.endpoint),
+            'tags': each['tags'],
+        })
+    return rendered
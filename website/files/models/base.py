@@ -53,6 +53,7 @@ class TrashedFileNode(StoredObject):
     name = fields.StringField(required=True)
     path = fields.StringField(required=True)
     materialized_path = fields.StringField(required=True)
+    ancestors = fields.StringField(list=True)
 
     checkout = fields.AbstractForeignField('User')
     deleted_by = fields.AbstractForeignField('User')
@@ -103,6 +104,12 @@ class StoredFileNode(StoredObject):
             ('is_file', pymongo.ASCENDING),
             ('provider', pymongo.ASCENDING)
         ]
+    }, {
+        'unique': False,
+        'key_or_list': [
+            ('ancestors', pymongo.ASCENDING),
+            ('checkout', pymongo.ASCENDING)
+        ]
     }]
 
     _id = fields.StringField(primary=True, default=lambda: str(bson.ObjectId()))
@@ -125,6 +132,9 @@ class StoredFileNode(StoredObject):
     name = fields.StringField(required=True)
     path = fields.StringField(required=True)
     materialized_path = fields.StringField(required=True)
+    # Ids of the folders above this file node, root first
+    # Should only be used for OsfStorage
+    ancestors = fields.StringField(list=True)
 
     # The User that has this file "checked out"
     # Should only be used for OsfStorage
@@ -417,6 +427,7 @@ class FileNode(object):
             versions=self.versions,
             last_touched=self.last_touched,
             materialized_path=self.materialized_path,
+            ancestors=self.ancestors,
 
             deleted_by=user
         )
@@ -2,15 +2,69 @@ from __future__ import unicode_literals
 
 import os
 
+import bson
 from modularodm import Q
 
+from framework.mongo import database
+
+from website import settings
+from website.files import utils
 from website.files import exceptions
-from website.files.models.base import File, Folder, FileNode, FileVersion
+from website.files.models.base import File, Folder, FileNode, FileVersion, StoredFileNode
 
 
 __all__ = ('OsfStorageFile', 'OsfStorageFolder', 'OsfStorageFileNode')
 
 
+# Number of file nodes written per insert when copying or moving a folder
+TREE_WRITE_BATCH_SIZE = 1000
+
+
+def _rebuild_tree(docs, parents, node_id, copy=False):
+    """Recompute the node, ancestors and materialized path of the raw file node
+    documents ``docs`` in memory.
+
+    :param list docs: Documents of a subtree, parents before their children
+    :param dict parents: Maps the id of the parent of the topmost documents to
+        the ``_id``, ``ancestors`` and ``materialized_path`` of their new parent
+    :param bool copy: Give every document a new id and drop its backrefs
+    :return list: The updated documents
+    """
+    parents = dict(parents)
+    rebuilt = []
+    for doc in docs:
+        original_id = doc['_id']
+        doc = dict(doc)
+        parent = parents[doc['parent']]
+        if copy:
+            doc.pop('__backrefs', None)
+            doc['_id'] = str(bson.ObjectId())
+        doc['node'] = node_id
+        doc['parent'] = parent['_id']
+        doc['ancestors'] = list(parent['ancestors'] or []) + [parent['_id']]
+        doc['materialized_path'] = parent['materialized_path'] + doc['name'] + ('' if doc['is_file'] else '/')
+        if not doc['is_file']:
+            parents[original_id] = doc
+        rebuilt.append(doc)
+    return rebuilt
+
+
+def _write_tree(docs, replace=False):
+    """Insert ``docs`` in batches of ``TREE_WRITE_BATCH_SIZE``. With
+    ``replace``, each batch replaces the documents with the same ids; there is
+    no multi-document update that sets a different value on each of them.
+    """
+    collection = database[StoredFileNode._name]
+    for start in range(0, len(docs), TREE_WRITE_BATCH_SIZE):
+        batch = docs[start:start + TREE_WRITE_BATCH_SIZE]
+        if replace:
+            collection.remove({'_id': {'$in': [doc['_id'] for doc in batch]}})
+        collection.insert(batch)
+        if replace:
+            for doc in batch:
+                StoredFileNode._clear_caches(doc['_id'])
+
+
 class OsfStorageFileNode(FileNode):
     provider = 'osfstorage'
 
@@ -39,16 +93,14 @@ class OsfStorageFileNode(FileNode):
 
     @property
     def materialized_path(self):
-        """creates the full path to a the given filenode
-        Note: Possibly high complexity/ many database calls
-        USE SPARINGLY
+        """The full path to the given filenode, stored on save. File nodes
+        saved before paths were stored build it from their parents.
         """
+        if self.stored_object.materialized_path:
+            return self.stored_object.materialized_path
         if not self.parent:
             return '/'
-        # Note: ODM cache can be abused here
-        # for highly nested folders calling
-        # list(self.__class__.find(Q(nodesetting),Q(folder))
-        # may result in a massive increase in performance
+
         def lineage():
             current = self
             while current:
@@ -60,6 +112,43 @@ class OsfStorageFileNode(FileNode):
             return '/{}'.format(path)
         return '/{}/'.format(path)
 
+    def get_lineage(self):
+        """Return this file node followed by its ancestors, nearest first.
+        The ancestors are loaded with a single query.
+        """
+        if not self.ancestors and self.stored_object.parent:
+            # Saved before ancestors were stored
+            lineage = []
+            current = self
+            while current:
+                lineage.append(current)
+                current = current.parent
+            return lineage
+        loaded = {
+            each._id: each
+            for each in StoredFileNode.find(Q('_id', 'in', list(self.ancestors)))
+        }
+        return [self] + [
+            loaded[_id].wrapped()
+            for _id in reversed(self.ancestors)
+            if _id in loaded
+        ]
+
+    def has_legacy_lineage(self):
+        """Whether any OsfStorage file node of this node was saved before
+        ancestors were stored, in which case queries on ``ancestors`` can miss
+        some of the file nodes under this one. Always False once
+        ``settings.OSFSTORAGE_ANCESTORS_POPULATED`` is set.
+        """
+        if settings.OSFSTORAGE_ANCESTORS_POPULATED:
+            return False
+        return database[StoredFileNode._name].find_one({
+            'node': self.node._id,
+            'provider': self.provider,
+            'parent': {'$ne': None},
+            'ancestors.0': {'$exists': False},
+        }, {'_id': 1}) is not None
+
     @property
     def path(self):
         """Path is dynamically computed as storedobject.path is stored
@@ -76,14 +165,104 @@ class OsfStorageFileNode(FileNode):
             raise exceptions.FileNodeCheckedOutError()
         return super(OsfStorageFileNode, self).delete(user=user, parent=parent)
 
+    def copy_tree(self, target_node, parent=None, name=None):
+        """Copy this file node and everything under it to ``target_node``. The
+        copy of this file node is saved first, so that a name conflict raises
+        `KeyExistsException`; the file nodes under it are read with a single
+        query, cloned in memory and inserted in batches. The copied files are
+        queued for search indexing together.
+
+        :param Node target_node: The node to copy the file nodes to
+        :param OsfStorageFolder parent: The folder to copy into, or None to
+            copy as a root folder
+        :return: The copy of this file node
+        """
+        from website.search import search
+
+        if not self.is_file and self.has_legacy_lineage():
+            return utils.copy_files(self, target_node, parent=parent, name=name)
+
+        copied = self.stored_object.clone().wrapped()
+        copied.parent = parent.stored_object if parent else None
+        copied.node = target_node
+        copied.name = name or self.name
+        if self.is_file:
+            copied.versions = self.versions
+            copied.save(skip_search=True)
+            search.update_files([copied._id])
+            return copied
+        copied.save()
+
+        docs = sorted(
+            database[StoredFileNode._name].find({'ancestors': self._id}),
+            key=lambda doc: len(doc['ancestors']),
+        )
+        clones = _rebuild_tree(docs, {
+            self._id: {
+                '_id': copied._id,
+                'ancestors': copied.ancestors,
+                'materialized_path': copied.materialized_path,
+            },
+        }, target_node._id, copy=True)
+        _write_tree(clones)
+
+        search.update_files([clone['_id'] for clone in clones if clone['is_file']])
+        return copied
+
+    def copy_under(self, destination_parent, name=None):
+        return self.copy_tree(destination_parent.node, parent=destination_parent, name=name)
+
     def move_under(self, destination_parent, name=None):
+        """Move this file node under ``destination_parent``. The file nodes
+        under a folder are read with a single query and rewritten in batches
+        rather than saved one at a time; their ids do not change, so neither
+        do their guids.
+        """
+        from website.search import search
+
         if self.is_checked_out:
             raise exceptions.FileNodeCheckedOutError()
-        return super(OsfStorageFileNode, self).move_under(destination_parent, name)
+        if self.is_file or self.has_legacy_lineage():
+            return super(OsfStorageFileNode, self).move_under(destination_parent, name)
+
+        self.name = name or self.name
+        self.parent = destination_parent.stored_object
+        self.node = destination_parent.node
+        self.save()
+
+        docs = sorted(
+            database[StoredFileNode._name].find({'ancestors': self._id}),
+            key=lambda doc: len(doc['ancestors']),
+        )
+        moved = _rebuild_tree(docs, {
+            self._id: {
+                '_id': self._id,
+                'ancestors': self.ancestors,
+                'materialized_path': self.materialized_path,
+            },
+        }, self.node._id)
+        _write_tree(moved, replace=True)
+
+        search.update_files([doc['_id'] for doc in moved if doc['is_file']])
+        return self
 
     def save(self):
         self.path = ''
-        self.materialized_path = ''
+        # Children are saved after their parents, see `_update_node` and
+        # `copy_files`, so the parent's path and ancestors are up to date
+        parent = self.parent
+        if parent is None:
+            self.ancestors = []
+            self.materialized_path = '/'
+        else:
+            parent = parent.wrapped()
+            if parent.ancestors or parent.parent is None:
+                ancestors = list(parent.ancestors or [])
+            else:
+                # The parent was saved before ancestors were stored
+                ancestors = [each._id for each in reversed(parent.get_lineage()[1:])]
+            self.ancestors = ancestors + [parent._id]
+            self.materialized_path = parent.materialized_path + self.name + ('' if self.is_file else '/')
         return super(OsfStorageFileNode, self).save()
 
 
@@ -161,8 +340,18 @@ class OsfStorageFolder(OsfStorageFileNode, Folder):
     def is_checked_out(self):
         if self.checkout:
             return True
+        if self.has_legacy_lineage():
+            return self._has_checked_out_descendant()
+        return StoredFileNode.find(
+            Q('ancestors', 'eq', self._id) &
+            Q('checkout', 'ne', None)
+        ).count() > 0
+
+    def _has_checked_out_descendant(self):
         for child in self.children:
-            if child.is_checked_out:
+            if child.checkout:
+                return True
+            if not child.is_file and child._has_checked_out_descendant():
                 return True
         return False
 
@@ -3,6 +3,7 @@ from babel import dates, core, Locale
 from website import mails
 from website import models as website_models
 from website.notifications import constants
+from website.notifications import index as subscription_index
 from website.notifications import utils
 from website.notifications.model import NotificationDigest
 from website.notifications.model import NotificationSubscription
@@ -21,7 +22,7 @@ def notify(event, user, node, timestamp, **context):
     :return: List of user ids notifications were sent to
     """
     event_type = utils.find_subscription_type(event)
-    subscriptions = compile_subscriptions(node, event_type, event)
+    subscriptions = get_subscriptions(node, event_type, event)
     sent_users = []
     target_user = context.get('target_user', None)
     if target_user:
@@ -63,24 +64,40 @@ def store_emails(recipient_ids, notification_type, event, user, node, timestamp,
     context['user'] = user
     node_lineage_ids = get_node_lineage(node) if node else []
 
-    for user_id in recipient_ids:
-        if user_id == user._id:
+    recipient_ids = [user_id for user_id in recipient_ids if user_id != user._id]
+    # The message only depends on the recipient through the localized
+    # timestamp, so render it once per timezone and locale
+    messages = {}
+    for user_id, recipient in zip(recipient_ids, website_models.User.load_many(recipient_ids)):
+        if recipient is None:
             continue
-        recipient = website_models.User.load(user_id)
-        context['localized_timestamp'] = localize_timestamp(timestamp, recipient)
-        message = mails.render_message(template, **context)
+        localization = (recipient.timezone, recipient.locale)
+        if localization not in messages:
+            context['localized_timestamp'] = localize_timestamp(timestamp, recipient)
+            messages[localization] = mails.render_message(template, **context)
 
         digest = NotificationDigest(
             timestamp=timestamp,
             send_type=notification_type,
             event=event,
             user_id=user_id,
-            message=message,
+            message=messages[localization],
             node_lineage=node_lineage_ids
         )
         digest.save()
 
 
+def get_subscriptions(node, event_type, event=None):
+    """Return the subscriptions of `compile_subscriptions`, from the
+    subscription index if possible.
+    """
+    subscriptions = subscription_index.load(node._id, event_type, event)
+    if subscriptions is None:
+        subscriptions = compile_subscriptions(node, event_type, event)
+        subscription_index.store(node._id, event_type, event, get_node_lineage(node), subscriptions)
+    return subscriptions
+
+
 def compile_subscriptions(node, event_type, event=None, level=0):
     """Recurse through node and parents for subscriptions.
 
@@ -116,6 +133,8 @@ def check_node(node, event):
     node_subscriptions = {key: [] for key in constants.NOTIFICATION_TYPES}
     if node:
         subscription = NotificationSubscription.load(utils.to_subscription_key(node._id, event))
+        if subscription:
+            subscription.prefetch(*constants.NOTIFICATION_TYPES)
         for notification_type in node_subscriptions:
             users = getattr(subscription, notification_type, [])
             for user in users:
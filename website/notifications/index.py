@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Index of the effective subscriptions of nodes. An entry holds, for one node
+and event, the ids of the users to notify grouped by notification type, as
+computed by `emails.compile_subscriptions`, together with the lineage of the
+node. An entry is computed on first use and dropped whenever a subscription,
+the permissions or the children of a node in its lineage change.
+"""
+
+from framework.mongo import database
+
+
+COLLECTION = 'notificationsubscriptionindex'
+
+
+def get_entry_id(node_id, event_type, event=None):
+    return u'{0}:{1}:{2}'.format(node_id, event_type, event or '')
+
+
+def load(node_id, event_type, event=None):
+    """Return the indexed subscriptions of a node and event, or `None`."""
+    entry = database[COLLECTION].find_one({'_id': get_entry_id(node_id, event_type, event)})
+    return entry['subscriptions'] if entry else None
+
+
+def store(node_id, event_type, event, lineage, subscriptions):
+    # Cached by pymongo, so only sent to the server once in a while
+    database[COLLECTION].ensure_index('lineage')
+    database[COLLECTION].update(
+        {'_id': get_entry_id(node_id, event_type, event)},
+        {'$set': {'lineage': lineage, 'subscriptions': subscriptions}},
+        upsert=True,
+    )
+
+
+def invalidate(node_id):
+    """Drop the entries of ``node_id`` and of every node below it."""
+    database[COLLECTION].remove({'lineage': node_id})
@@ -4,6 +4,7 @@ from framework.mongo import StoredObject, ObjectId
 from modularodm.exceptions import ValidationValueError
 
 from website.project.model import Node
+from website.notifications import index as subscription_index
 from website.notifications.constants import NOTIFICATION_TYPES
 
 
@@ -18,11 +19,22 @@ class NotificationSubscription(StoredObject):
     event_name = fields.StringField()      # wiki_updated, comment_replies
     owner = fields.AbstractForeignField()
 
+    __prefetch__ = {
+        notification_type: 'user'
+        for notification_type in NOTIFICATION_TYPES
+    }
+
     # Notification types
     none = fields.ForeignField('user', list=True, backref='none')
     email_digest = fields.ForeignField('user', list=True, backref='email_digest')
     email_transactional = fields.ForeignField('user', list=True, backref='email_transactional')
 
+    def save(self, *args, **kwargs):
+        rv = super(NotificationSubscription, self).save(*args, **kwargs)
+        if isinstance(self.owner, Node):
+            subscription_index.invalidate(self.owner._id)
+        return rv
+
     def add_user_to_subscription(self, user, notification_type, save=True):
         for nt in NOTIFICATION_TYPES:
             if user in getattr(self, nt):
@@ -1,19 +1,22 @@
 """
 Tasks for making even transactional emails consolidated.
 """
-from bson.code import Code
+import logging
+
 from modularodm import Q
 
 from framework.tasks import app as celery_app
 from framework.mongo import database as db
 from framework.auth.core import User
 from framework.sentry import log_exception
-
-from framework.transactions.context import TokuTransaction
+from framework.email.mailer import Mailer, Message, SMTPConnectionPool
 
 from website.notifications.utils import NotificationsDict
 from website.notifications.model import NotificationDigest
-from website import mails
+from website import mails, settings
+
+
+logger = logging.getLogger(__name__)
 
 
 @celery_app.task(name='notify.send_users_email', max_retries=0)
@@ -23,26 +26,54 @@ def send_users_email(send_type):
     :param send_type
     :return:
     """
-    grouped_emails = get_users_emails(send_type)
-    if not grouped_emails:
+    # Don't use ttls and login in DEBUG_MODE
+    ttls = login = not settings.DEBUG_MODE
+    if settings.USE_EMAIL and login and (settings.MAIL_USERNAME is None or settings.MAIL_PASSWORD is None):
+        # Notifications are kept for the next run
+        logger.error('Mail username and password not set; skipping send.')
         return
-    for group in grouped_emails:
-        user = User.load(group['user_id'])
+    mailer = Mailer(pool=SMTPConnectionPool(ttls=ttls, login=login))
+    try:
+        for grouped_emails in iter_users_emails(send_type):
+            send_digests(mailer, grouped_emails)
+    finally:
+        mailer.close()
+    logger.info('Sent {0} digests: {1}'.format(send_type, mailer.get_stats()))
+
+
+def send_digests(mailer, grouped_emails):
+    """Send one digest to each user in ``grouped_emails``, as returned by
+    `get_users_emails`, and remove the notifications that were sent.
+    """
+    users = User.load_many([group['user_id'] for group in grouped_emails])
+    messages = []
+    notification_ids = []
+    for user, group in zip(users, grouped_emails):
         if not user:
             log_exception()
             continue
         info = group['info']
-        notification_ids = [message['_id'] for message in info]
         sorted_messages = group_by_node(info)
         if sorted_messages:
-            mails.send_mail(
+            context = {'name': user.fullname, 'message': sorted_messages}
+            messages.append(Message(
+                from_addr=settings.FROM_EMAIL,
                 to_addr=user.username,
+                subject=mails.DIGEST.subject(**context),
+                message=mails.DIGEST.html(**context),
                 mimetype='html',
-                mail=mails.DIGEST,
-                name=user.fullname,
-                message=sorted_messages,
-                callback=remove_notifications(email_notification_ids=notification_ids)
-            )
+            ))
+            notification_ids.append([message['_id'] for message in info])
+    if settings.USE_EMAIL:
+        results = mailer.send_many(messages)
+    else:
+        results = [True] * len(messages)
+    # Notifications that failed to send are kept for the next run
+    remove_notifications(email_notification_ids=[
+        notification_id
+        for ids, sent in zip(notification_ids, results) if sent
+        for notification_id in ids
+    ])
 
 
 def get_users_emails(send_type):
@@ -65,26 +96,64 @@ def get_users_emails(send_type):
                 'user_id': ...
               }]
     """
-    with TokuTransaction():
-        emails = db['notificationdigest'].group(
-            key={'user_id': 1},
-            condition={
-                'send_type': send_type
-            },
-            initial={'info': []},
-            reduce=Code(
-                """
-                function(curr, result) {
-                    result.info.push({
-                        'message': curr.message,
-                        'node_lineage': curr.node_lineage,
-                        '_id': curr._id
-                    });
-                };
-                """
-            )
-        )
-    return emails
+    return [
+        group
+        for grouped_emails in iter_users_emails(send_type)
+        for group in grouped_emails
+    ]
+
+
+def iter_users_emails(send_type, batch_size=None):
+    """Yield the emails of `get_users_emails` in lists ordered by user id. Each
+    list is built by one aggregation over at most ``batch_size`` notifications,
+    except that a user with more notifications than that has all of them read
+    with one more query, since they are sent as a single digest.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_DIGEST_BATCH_SIZE
+    last_user_id = None
+    while True:
+        match = {'send_type': send_type}
+        if last_user_id is not None:
+            match['user_id'] = {'$gt': last_user_id}
+        groups = db['notificationdigest'].aggregate([
+            {'$match': match},
+            {'$sort': {'user_id': 1, 'timestamp': 1}},
+            {'$limit': batch_size},
+            {'$group': {
+                '_id': '$user_id',
+                'info': {'$push': {
+                    'message': '$message',
+                    'node_lineage': '$node_lineage',
+                    '_id': '$_id',
+                }},
+            }},
+            {'$sort': {'_id': 1}},
+        ])['result']
+        if not groups:
+            return
+        count = sum(len(group['info']) for group in groups)
+        # The notifications of the last user may continue past the limit; leave
+        # them for the next batch, or read the rest if no other user fits in
+        # this one
+        if count == batch_size:
+            if len(groups) > 1:
+                groups.pop()
+            else:
+                groups[0]['info'] = get_user_notifications(send_type, groups[0]['_id'])
+        yield [{'user_id': group['_id'], 'info': group['info']} for group in groups]
+        if count < batch_size:
+            return
+        last_user_id = groups[-1]['_id']
+
+
+def get_user_notifications(send_type, user_id):
+    """Return every ``send_type`` notification of ``user_id``, oldest first, in
+    the format of the ``info`` of `get_users_emails`.
+    """
+    return list(db['notificationdigest'].find(
+        {'send_type': send_type, 'user_id': user_id},
+        {'message': True, 'node_lineage': True},
+    ).sort('timestamp', 1))
 
 
 def group_by_node(notifications):
@@ -105,5 +174,5 @@ def remove_notifications(email_notification_ids=None):
     :param email_notification_ids:
     :return:
     """
-    for email_id in email_notification_ids:
-        NotificationDigest.remove(Q('_id', 'eq', email_id))
+    if email_notification_ids:
+        NotificationDigest.remove(Q('_id', 'in', email_notification_ids))
@@ -6,6 +6,7 @@ from modularodm.exceptions import NoResultsFound
 from framework.auth import signals
 from website.models import Node, User
 from website.notifications import constants
+from website.notifications import index as subscription_index
 from website.notifications import model
 from website.notifications.model import NotificationSubscription
 
@@ -70,6 +71,7 @@ def remove_contributor_from_subscriptions(contributor, node):
 @signals.node_deleted.connect
 def remove_subscription(node):
     model.NotificationSubscription.remove(Q('owner', 'eq', node))
+    subscription_index.invalidate(node._id)
     parent = node.parent_node
 
     if parent and parent.child_node_subscriptions:
@@ -36,6 +36,7 @@ from framework.exceptions import PermissionsError
 from framework.guid.model import GuidStoredObject
 from framework.auth.utils import privacy_info_handle
 from framework.analytics import tasks as piwik_tasks
+from framework.tasks.handlers import enqueue_task
 from framework.mongo.utils import to_mongo_key, unique_on
 from framework.analytics import (
     get_basic_counters, increment_user_activity_counters
@@ -54,6 +55,8 @@ from website.exceptions import (
 )
 from website.citations.utils import datetime_to_csl
 from website.identifiers.model import IdentifierMixin
+from website.conferences import submissions as conference_submissions
+from website.notifications import index as subscription_index
 from website.util.permissions import expand_permissions
 from website.util.permissions import CREATOR_PERMISSIONS, DEFAULT_CONTRIBUTOR_PERMISSIONS, ADMIN
 from website.project.metadata.schemas import OSF_META_SCHEMAS
@@ -63,6 +66,7 @@ from website.project.licenses import (
     NodeLicenseRecord,
 )
 from website.project import signals as project_signals
+from website.project import summaries as node_summaries
 
 logger = logging.getLogger(__name__)
 
@@ -330,6 +334,15 @@ class Comment(GuidStoredObject):
 @unique_on(['params.node', '_id'])
 class NodeLog(StoredObject):
 
+    # Logs of a set of nodes, newest first, as read by the watched logs feed
+    __indices__ = [{
+        'unique': False,
+        'key_or_list': [
+            ('__backrefs.logged.node.logs', pymongo.ASCENDING),
+            ('_id', pymongo.DESCENDING),
+        ]
+    }]
+
     _id = fields.StringField(primary=True, default=lambda: str(ObjectId()))
 
     date = fields.DateTimeField(default=datetime.datetime.utcnow, index=True)
@@ -624,6 +637,11 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     #: Whether this is a pointer or not
     primary = True
 
+    __prefetch__ = {
+        'contributors': 'user',
+        'nodes': None,
+    }
+
     __indices__ = [{
         'unique': False,
         'key_or_list': [
@@ -651,6 +669,53 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         'node_license',
     }
 
+    # Node fields copied into the search documents of the node's files
+    FILE_SEARCH_UPDATE_FIELDS = {
+        'title',
+        'is_public',
+        'is_deleted',
+        'is_registration',
+    }
+
+    # Node fields copied into the search documents of the node's components
+    # and their files
+    SEARCH_PARENT_FIELDS = {
+        'title',
+        'is_public',
+        'is_registration',
+    }
+
+    # Fields that change the conference submissions of the node
+    CONFERENCE_SUBMISSION_FIELDS = {
+        'title',
+        'tags',
+        'system_tags',
+        'is_public',
+        'is_deleted',
+        'contributors',
+        'visible_contributor_ids',
+    }
+
+    # Fields that change the users notified of events on the node or its
+    # descendants
+    SUBSCRIPTION_INDEX_FIELDS = {
+        'contributors',
+        'permissions',
+        'nodes',
+    }
+
+    # Fields that change the dashboard summary of the node
+    DASHBOARD_SUMMARY_FIELDS = {
+        'title',
+        'category',
+        'is_deleted',
+        'is_registration',
+        'is_folder',
+        'contributors',
+        'permissions',
+        'logs',
+    }
+
     # Maps category identifier => Human-readable representation for use in
     # titles, menus, etc.
     # Use an OrderedDict so that menu items show in the correct order
@@ -724,6 +789,9 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     registered_meta = fields.DictionaryField()
     registration_approval = fields.ForeignField('registrationapproval')
     retraction = fields.ForeignField('retraction')
+    # Denormalized `is_retracted`, set on a retracted registration and its
+    # primary descendants by `Retraction.save` so lists can exclude them in a query
+    retracted = fields.BooleanField(default=False, index=True)
     embargo = fields.ForeignField('embargo')
 
     is_fork = fields.BooleanField(default=False, index=True)
@@ -1149,10 +1217,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
 
     @property
     def visible_contributors(self):
-        return [
-            User.load(_id)
-            for _id in self.visible_contributor_ids
-        ]
+        return User.load_many(self.visible_contributor_ids)
 
     @property
     def parents(self):
@@ -1406,7 +1471,23 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if self.is_folder or self.archiving:
             need_update = False
         if need_update:
-            self.update_search()
+            self.update_search(
+                update_files=bool(self.FILE_SEARCH_UPDATE_FIELDS.intersection(saved_fields))
+            )
+
+        if not first_save and self.SEARCH_PARENT_FIELDS.intersection(saved_fields):
+            for child in self.nodes_primary:
+                if child.is_public and not child.is_deleted:
+                    child.update_search()
+
+        if self.SUBSCRIPTION_INDEX_FIELDS.intersection(saved_fields):
+            subscription_index.invalidate(self._id)
+
+        if self.CONFERENCE_SUBMISSION_FIELDS.intersection(saved_fields):
+            conference_submissions.update_submissions(self)
+
+        if self.DASHBOARD_SUMMARY_FIELDS.intersection(saved_fields):
+            node_summaries.update_summary(self)
 
         if 'node_license' in saved_fields:
             children = [c for c in self.get_descendants_recursive(
@@ -1657,6 +1738,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         return ret
 
     def get_descendants_recursive(self, include=lambda n: True):
+        self.prefetch('nodes')
         for node in self.nodes:
             if include(node):
                 yield node
@@ -1859,10 +1941,10 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             self.save()
         return None
 
-    def update_search(self):
+    def update_search(self, update_files=True):
         from website import search
         try:
-            search.search.update_node(self, bulk=False, async=True)
+            search.search.update_node(self, bulk=False, async=True, update_files=update_files)
         except search.exceptions.SearchUnavailableError as e:
             logger.exception(e)
             log_exception()
@@ -1871,7 +1953,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     def bulk_update_search(cls, nodes):
         from website import search
         try:
-            serialize = functools.partial(search.search.update_node, bulk=True, async=False)
+            serialize = functools.partial(search.search.update_node, bulk=True, async=False, update_files=False)
             search.search.bulk_update_nodes(serialize, nodes)
         except search.exceptions.SearchUnavailableError as e:
             logger.exception(e)
@@ -2984,6 +3066,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         :param auth: All the auth information including user, API key.
         """
         from website.addons.wiki.model import NodeWikiPage
+        from website.addons.wiki.tasks import render_wiki_page
 
         name = (name or '').strip()
         key = to_mongo_key(name)
@@ -3029,6 +3112,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             save=False,
         )
         self.save()
+        enqueue_task(render_wiki_page.si(new_page._id, self._id))
 
     # TODO: Move to wiki add-on
     def rename_node_wiki(self, name, new_name, auth):
@@ -3949,6 +4033,27 @@ class Retraction(EmailApprovableSanction):
             node.set_privacy('public', auth=auth, save=True)
             node.update_search()
 
+    def save(self, *args, **kwargs):
+        saved_fields = super(Retraction, self).save(*args, **kwargs)
+        if 'state' in saved_fields:
+            self._update_registration_retracted()
+        return saved_fields
+
+    def _update_registration_retracted(self):
+        """Copy the approval state of this retraction onto `Node.retracted` of
+        the registration and its primary descendants.
+        """
+        try:
+            parent_registration = Node.find_one(Q('retraction', 'eq', self))
+        except NoResultsFound:
+            # Not yet attached to a registration
+            return
+        retracted = self.is_approved
+        for node in parent_registration.node_and_primary_descendants():
+            if node.retracted != retracted:
+                node.retracted = retracted
+                node.save()
+
     def approve_retraction(self, user, token):
         self.approve(user, token)
 
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Compact summaries of nodes for the dashboard. The collection holds one
+document per node with the fields the dashboard filters and renders on, and is
+updated whenever one of those fields changes, so the dashboard lists a user's
+nodes with a single query and without loading their contributors or logs.
+"""
+
+from framework.mongo import database
+from framework.utils import iso8601format
+
+from website.util import permissions
+
+
+COLLECTION = 'nodesummary'
+
+
+def get_collection():
+    collection = database[COLLECTION]
+    # Cached by pymongo, so only sent to the server once in a while
+    collection.ensure_index([('contributors', 1), ('isProject', -1), ('dateCreated', 1)])
+    return collection
+
+
+def serialize_summary(node):
+    return {
+        'title': node.title,
+        'url': node.url,
+        'apiUrl': node.api_url,
+        'category': node.category,
+        'isProject': node.category == 'project',
+        'is_deleted': node.is_deleted,
+        'is_registration': node.is_registration,
+        'is_folder': node.is_folder,
+        'contributors': node.contributors._to_primary_keys(),
+        'permissions': dict(node.permissions),
+        'dateCreated': node.date_created,
+        'dateModified': node.date_modified,
+        'logCount': len(node.logs),
+    }
+
+
+def update_summary(node):
+    get_collection().update(
+        {'_id': node._id},
+        {'$set': serialize_summary(node)},
+        upsert=True,
+    )
+
+
+def get_dashboard_query(user, components=True, permission=None):
+    """Return the query for the undeleted projects and components that
+    ``user`` contributes to, excluding registrations and folders.
+
+    :param str permission: Only include nodes on which ``user`` has this
+        permission
+    """
+    projects = {'category': 'project', 'is_folder': False}
+    query = {
+        'contributors': user._id,
+        'is_deleted': False,
+        'is_registration': False,
+    }
+    if components:
+        query['$or'] = [projects, {'category': {'$ne': 'project'}}]
+    else:
+        query.update(projects)
+    if permission:
+        query['permissions.{0}'.format(user._id)] = permission
+    return query
+
+
+def get_dashboard_summaries(user, components=True, permission=None, page=None, size=None):
+    """Return a page of the summaries of the dashboard nodes of ``user``,
+    projects first, with the total number of nodes and the largest number of
+    logs of any of them.
+    """
+    collection = get_collection()
+    query = get_dashboard_query(user, components=components, permission=permission)
+    cursor = collection.find(query).sort([('isProject', -1), ('dateCreated', 1)])
+    if not size:
+        summaries = list(cursor)
+        max_logs = max([each['logCount'] for each in summaries] or [0])
+        return summaries, len(summaries), max_logs
+    total = cursor.count()
+    summaries = list(cursor.skip((page or 0) * size).limit(size))
+    busiest = list(collection.find(query, {'logCount': 1}).sort('logCount', -1).limit(1))
+    max_logs = busiest[0]['logCount'] if busiest else 0
+    return summaries, total, max_logs
+
+
+def render_summary(summary, user):
+    """Format a summary like `website.views._render_node`."""
+    perm_list = summary['permissions'].get(user._id)
+    return {
+        'title': summary['title'],
+        'id': summary['_id'],
+        'url': summary['url'],
+        'api_url': summary['apiUrl'],
+        'primary': True,
+        'date_modified': iso8601format(summary['dateModified']),
+        'category': summary['category'],
+        'permissions': permissions.reduce_permissions(perm_list) if perm_list else None,
+        # Only registrations are archived, and the dashboard never lists them
+        'archiving': False,
+    }
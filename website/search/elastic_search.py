@@ -3,8 +3,8 @@
 from __future__ import division
 
 import re
-import copy
 import math
+import time
 import logging
 import unicodedata
 import functools
@@ -28,7 +28,6 @@ from website import settings
 from website.filters import gravatar
 from website.models import User, Node
 from website.search import exceptions
-from website.search.util import build_query
 from website.util import sanitize
 from website.views import validate_page_num
 from website.project.licenses import serialize_node_license_record
@@ -52,6 +51,50 @@ NOT_ANALYZED_PROPERTY = {'type': 'string', 'index': 'not_analyzed'}
 # Perform stemming on the field it's applied to.
 ENGLISH_ANALYZER_PROPERTY = {'type': 'string', 'analyzer': 'english'}
 
+# Index user names by the prefixes of each word, so that contributor search
+# can match partial names without wildcard and fuzzy expansion. Search terms
+# are truncated to the longest indexed prefix.
+AUTOCOMPLETE_MAX_GRAM = 20
+
+INDEX_SETTINGS = {
+    'analysis': {
+        'filter': {
+            'autocomplete_filter': {
+                'type': 'edge_ngram',
+                'min_gram': 1,
+                'max_gram': AUTOCOMPLETE_MAX_GRAM,
+            },
+            'autocomplete_truncate': {
+                'type': 'truncate',
+                'length': AUTOCOMPLETE_MAX_GRAM,
+            },
+        },
+        'analyzer': {
+            'autocomplete': {
+                'type': 'custom',
+                'tokenizer': 'standard',
+                'filter': ['lowercase', 'asciifolding', 'autocomplete_filter'],
+            },
+            'autocomplete_search': {
+                'type': 'custom',
+                'tokenizer': 'standard',
+                'filter': ['lowercase', 'asciifolding', 'autocomplete_truncate'],
+            },
+        },
+    },
+}
+
+AUTOCOMPLETE_PROPERTY = {
+    'type': 'string',
+    'fields': {
+        'autocomplete': {
+            'type': 'string',
+            'index_analyzer': 'autocomplete',
+            'search_analyzer': 'autocomplete_search',
+        },
+    },
+}
+
 INDEX = settings.ELASTIC_INDEX
 
 try:
@@ -91,57 +134,84 @@ def requires_search(func):
     return wrapped
 
 
-@requires_search
-def get_aggregations(query, doc_type):
-    query['aggregations'] = {
-        'licenses': {
-            'terms': {
-                'field': 'license.id'
-            }
-        }
-    }
-
-    res = es.search(index=INDEX, doc_type=doc_type, search_type='count', body=query)
-    ret = {
-        doc_type: {
-            item['key']: item['doc_count']
-            for item in agg['buckets']
-        }
-        for doc_type, agg in res['aggregations'].iteritems()
+def get_type_filter(doc_type):
+    """Return a filter restricting hits to the comma-separated ``doc_type``,
+    or None for all types.
+    """
+    if not doc_type or doc_type == '_all':
+        return None
+    type_filters = [{'type': {'value': each}} for each in doc_type.split(',')]
+    if len(type_filters) == 1:
+        return type_filters[0]
+    return {'or': type_filters}
+
+
+def build_search_body(query, doc_type):
+    """Build a single search request returning the hits of ``query`` together
+    with the tag cloud, license and per-type counts. The filter of a filtered
+    query is moved to a post filter, so that it only narrows the hits and
+    the tag cloud; license counts cover ``doc_type`` and type counts cover
+    every type.
+    """
+    body = {
+        key: value
+        for key, value in query.items()
+        if key not in ('aggregations', 'aggs', 'post_filter')
     }
-    ret['total'] = res['hits']['total']
-    return ret
-
-
-@requires_search
-def get_counts(count_query, clean=True):
-    count_query['aggregations'] = {
+    query_filter = None
+    filtered = body.get('query', {}).get('filtered')
+    if filtered and 'filter' in filtered:
+        filtered = dict(filtered)
+        query_filter = filtered.pop('filter')
+        body['query'] = {'filtered': filtered}
+    type_filter = get_type_filter(doc_type)
+
+    hit_filters = [each for each in (query_filter, type_filter) if each]
+    if len(hit_filters) == 1:
+        body['post_filter'] = hit_filters[0]
+    elif hit_filters:
+        body['post_filter'] = {'and': hit_filters}
+
+    body['aggregations'] = {
         'counts': {
-            'terms': {
-                'field': '_type',
-            }
-        }
-    }
-
-    res = es.search(index=INDEX, doc_type=None, search_type='count', body=count_query)
-    counts = {x['key']: x['doc_count'] for x in res['aggregations']['counts']['buckets'] if x['key'] in ALIASES.keys()}
-
-    counts['total'] = sum([val for val in counts.values()])
-    return counts
-
-
-@requires_search
-def get_tags(query, index):
-    query['aggregations'] = {
+            'terms': {'field': '_type'},
+        },
         'tag_cloud': {
-            'terms': {'field': 'tags'}
-        }
+            'filter': query_filter or {'match_all': {}},
+            'aggregations': {
+                'tags': {'terms': {'field': 'tags'}},
+            },
+        },
+        'licenses': {
+            'filter': type_filter or {'match_all': {}},
+            'aggregations': {
+                'licenses': {'terms': {'field': 'license.id'}},
+            },
+        },
     }
+    return body
 
-    results = es.search(index=index, doc_type=None, body=query)
-    tags = results['aggregations']['tag_cloud']['buckets']
 
-    return tags
+def parse_aggregations(aggregations):
+    """Split the aggregations of a `build_search_body` request into the
+    ``counts``, ``aggs`` and ``tags`` of a search response.
+    """
+    counts = {
+        bucket['key']: bucket['doc_count']
+        for bucket in aggregations['counts']['buckets']
+        if bucket['key'] in ALIASES.keys()
+    }
+    counts['total'] = sum(counts.values())
+    licenses = aggregations['licenses']
+    aggs = {
+        'licenses': {
+            bucket['key']: bucket['doc_count']
+            for bucket in licenses['licenses']['buckets']
+        },
+        'total': licenses['doc_count'],
+    }
+    tags = aggregations['tag_cloud']['tags']['buckets']
+    return counts, aggs, tags
 
 
 @requires_search
@@ -159,30 +229,12 @@ def search(query, index=None, doc_type='_all'):
         typeAliases: the doc_types that exist in the search database
     """
     index = index or INDEX
-    tag_query = copy.deepcopy(query)
-    aggs_query = copy.deepcopy(query)
-    count_query = copy.deepcopy(query)
-
-    for key in ['from', 'size', 'sort']:
-        try:
-            del tag_query[key]
-            del aggs_query[key]
-            del count_query[key]
-        except KeyError:
-            pass
-
-    tags = get_tags(tag_query, index)
-    try:
-        del aggs_query['query']['filtered']['filter']
-        del count_query['query']['filtered']['filter']
-    except KeyError:
-        pass
-    aggregations = get_aggregations(aggs_query, doc_type=doc_type)
-    counts = get_counts(count_query, index)
-
-    # Run the real query and get the results
-    raw_results = es.search(index=index, doc_type=doc_type, body=query)
+    tick = time.time()
+    body = build_search_body(query, doc_type)
+    raw_results = es.search(index=index, doc_type=None, body=body)
+    searched = time.time()
 
+    counts, aggregations, tags = parse_aggregations(raw_results['aggregations'])
     results = [hit['_source'] for hit in raw_results['hits']['hits']]
     return_value = {
         'results': format_results(results),
@@ -191,6 +243,13 @@ def search(query, index=None, doc_type='_all'):
         'tags': tags,
         'typeAliases': ALIASES
     }
+    formatted = time.time()
+    logger.info('Search of {0} took {1:.3f}s ({2}ms in Elasticsearch), formatting took {3:.3f}s'.format(
+        index,
+        searched - tick,
+        raw_results.get('took'),
+        formatted - searched,
+    ))
     return return_value
 
 
@@ -200,16 +259,15 @@ def format_results(results):
         if result.get('category') == 'user':
             result['url'] = '/profile/' + result['id']
         elif result.get('category') == 'file':
-            parent_info = load_parent(result.get('parent_id'))
+            parent_info = get_parent_info(result)
             result['parent_url'] = parent_info.get('url') if parent_info else None
             result['parent_title'] = parent_info.get('title') if parent_info else None
         elif result.get('category') in {'project', 'component', 'registration'}:
-            result = format_result(result, result.get('parent_id'))
+            result = format_result(result, get_parent_info(result))
         ret.append(result)
     return ret
 
-def format_result(result, parent_id=None):
-    parent_info = load_parent(parent_id)
+def format_result(result, parent_info=None):
     formatted_result = {
         'contributors': result['contributors'],
         'wiki_link': result['url'] + 'wiki/',
@@ -237,22 +295,39 @@ def format_result(result, parent_id=None):
     return formatted_result
 
 
-def load_parent(parent_id):
-    parent = Node.load(parent_id)
+def get_parent_info(result):
+    """Return the parent information stored in the search document
+    ``result``. Documents indexed before parent information was stored
+    fall back to loading the parent.
+    """
+    if 'parent_info' in result:
+        return result['parent_info']
+    return load_parent(result.get('parent_id'))
+
+
+def serialize_parent(parent):
+    """Return the information about ``parent`` displayed with the search
+    results of its components and their files.
+    """
     if parent is None:
         return None
-    parent_info = {}
-    if parent is not None and parent.is_public:
-        parent_info['title'] = parent.title
-        parent_info['url'] = parent.url
-        parent_info['is_registration'] = parent.is_registration
-        parent_info['id'] = parent._id
-    else:
-        parent_info['title'] = '-- private project --'
-        parent_info['url'] = ''
-        parent_info['is_registration'] = None
-        parent_info['id'] = None
-    return parent_info
+    if parent.is_public:
+        return {
+            'title': parent.title,
+            'url': parent.url,
+            'is_registration': parent.is_registration,
+            'id': parent._id,
+        }
+    return {
+        'title': '-- private project --',
+        'url': '',
+        'is_registration': None,
+        'id': None,
+    }
+
+
+def load_parent(parent_id):
+    return serialize_parent(Node.load(parent_id))
 
 
 COMPONENT_CATEGORIES = set([k for k in Node.CATEGORY_MAP.keys() if not k == 'project'])
@@ -267,85 +342,114 @@ def get_doctype_from_node(node):
         return node.category
 
 @celery_app.task(bind=True, max_retries=5, default_retry_delay=60)
-def update_node_async(self, node_id, index=None, bulk=False):
+def update_node_async(self, node_id, index=None, bulk=False, update_files=True):
     node = Node.load(node_id)
     try:
-        update_node(node=node, index=index, bulk=bulk)
+        update_node(node=node, index=index, bulk=bulk, update_files=update_files)
     except Exception as exc:
         self.retry(exc=exc)
 
+
+def serialize_node(node, category, parent_id=None):
+    from website.addons.wiki.model import NodeWikiPage
+
+    try:
+        normalized_title = six.u(node.title)
+    except TypeError:
+        normalized_title = node.title
+    normalized_title = unicodedata.normalize('NFKD', normalized_title).encode('ascii', 'ignore')
+
+    elastic_document = {
+        'id': node._id,
+        'contributors': [
+            {
+                'fullname': x.fullname,
+                'url': x.profile_url if x.is_active else None
+            }
+            for x in node.visible_contributors
+            if x is not None
+        ],
+        'title': node.title,
+        'normalized_title': normalized_title,
+        'category': category,
+        'public': node.is_public,
+        'tags': [tag._id for tag in node.tags if tag],
+        'description': node.description,
+        'url': node.url,
+        'is_registration': node.is_registration,
+        'is_pending_registration': node.is_pending_registration,
+        'is_retracted': node.is_retracted,
+        'is_pending_retraction': node.is_pending_retraction,
+        'embargo_end_date': node.embargo_end_date.strftime("%A, %b. %d, %Y") if node.embargo_end_date else False,
+        'is_pending_embargo': node.is_pending_embargo,
+        'registered_date': node.registered_date,
+        'wikis': {},
+        'parent_id': parent_id,
+        'parent_info': serialize_parent(node.node__parent[0]) if parent_id else None,
+        'date_created': node.date_created,
+        'license': serialize_node_license_record(node.license),
+        'boost': int(not node.is_registration) + 1,  # This is for making registered projects less relevant
+    }
+    if not node.is_retracted:
+        for wiki in [
+            NodeWikiPage.load(x)
+            for x in node.wiki_pages_current.values()
+        ]:
+            elastic_document['wikis'][wiki.page_name] = wiki.raw_text(node)
+
+    return elastic_document
+
+
+def get_node_parent_id(node, category):
+    """Return the parent id of ``node``; raise `IndexError` for orphaned
+    components.
+    """
+    if category == 'project':
+        return None
+    return node.parent_id
+
+
+def is_node_searchable(node):
+    return not (node.is_deleted or not node.is_public or node.archiving)
+
+
 @requires_search
-def update_node(node, index=None, bulk=False):
+def update_node(node, index=None, bulk=False, update_files=True):
+    """Index ``node``, or remove it from the index if it is no longer public.
+
+    :param bool bulk: Return the document instead of indexing it
+    :param bool update_files: Also re-index the node's OsfStorage files; only
+        needed when a field the file documents depend on has changed
+    """
     index = index or INDEX
-    from website.addons.wiki.model import NodeWikiPage
 
     category = get_doctype_from_node(node)
 
-    if category == 'project':
-        elastic_document_id = node._id
-        parent_id = None
-    else:
-        try:
-            elastic_document_id = node._id
-            parent_id = node.parent_id
-        except IndexError:
-            # Skip orphaned components
-            return
+    try:
+        parent_id = get_node_parent_id(node, category)
+    except IndexError:
+        # Skip orphaned components
+        return
 
-    from website.files.models.osfstorage import OsfStorageFile
-    for file_ in paginated(OsfStorageFile, Q('node', 'eq', node)):
-        update_file(file_, index=index)
+    if update_files:
+        update_node_files(node, index=index, refresh=not bulk)
 
-    if node.is_deleted or not node.is_public or node.archiving:
-        delete_doc(elastic_document_id, node)
+    if not is_node_searchable(node):
+        delete_doc(node._id, node)
     else:
-        try:
-            normalized_title = six.u(node.title)
-        except TypeError:
-            normalized_title = node.title
-        normalized_title = unicodedata.normalize('NFKD', normalized_title).encode('ascii', 'ignore')
-
-        elastic_document = {
-            'id': elastic_document_id,
-            'contributors': [
-                {
-                    'fullname': x.fullname,
-                    'url': x.profile_url if x.is_active else None
-                }
-                for x in node.visible_contributors
-                if x is not None
-            ],
-            'title': node.title,
-            'normalized_title': normalized_title,
-            'category': category,
-            'public': node.is_public,
-            'tags': [tag._id for tag in node.tags if tag],
-            'description': node.description,
-            'url': node.url,
-            'is_registration': node.is_registration,
-            'is_pending_registration': node.is_pending_registration,
-            'is_retracted': node.is_retracted,
-            'is_pending_retraction': node.is_pending_retraction,
-            'embargo_end_date': node.embargo_end_date.strftime("%A, %b. %d, %Y") if node.embargo_end_date else False,
-            'is_pending_embargo': node.is_pending_embargo,
-            'registered_date': node.registered_date,
-            'wikis': {},
-            'parent_id': parent_id,
-            'date_created': node.date_created,
-            'license': serialize_node_license_record(node.license),
-            'boost': int(not node.is_registration) + 1,  # This is for making registered projects less relevant
-        }
-        if not node.is_retracted:
-            for wiki in [
-                NodeWikiPage.load(x)
-                for x in node.wiki_pages_current.values()
-            ]:
-                elastic_document['wikis'][wiki.page_name] = wiki.raw_text(node)
+        elastic_document = serialize_node(node, category, parent_id)
 
         if bulk:
             return elastic_document
         else:
-            es.index(index=index, doc_type=category, id=elastic_document_id, body=elastic_document, refresh=True)
+            es.index(index=index, doc_type=category, id=node._id, body=elastic_document, refresh=True)
+
+
+def update_node_files(node, index=None, refresh=False):
+    """Re-index every OsfStorage file of ``node`` through the bulk API."""
+    from website.files.models.osfstorage import OsfStorageFile
+    files = paginated(OsfStorageFile, Q('node', 'eq', node))
+    return bulk_update_files(files, index=index, refresh=refresh)
 
 def bulk_update_nodes(serialize, nodes, index=None):
     """Updates the list of input projects
@@ -397,6 +501,11 @@ def update_user(user, index=None):
             pass
         return
 
+    user_doc = serialize_user(user)
+    es.index(index=index, doc_type='user', body=user_doc, id=user._id, refresh=True)
+
+
+def serialize_user(user):
     names = dict(
         fullname=user.fullname,
         given_name=user.given_name,
@@ -431,23 +540,13 @@ def update_user(user, index=None):
         'boost': 2,  # TODO(fabianvf): Probably should make this a constant or something
     }
 
-    es.index(index=index, doc_type='user', body=user_doc, id=user._id, refresh=True)
+    return user_doc
 
-@requires_search
-def update_file(file_, index=None, delete=False):
+def is_file_searchable(file_):
+    return not (not file_.node.is_public or file_.node.is_deleted or file_.node.archiving)
 
-    index = index or INDEX
-
-    if not file_.node.is_public or delete or file_.node.is_deleted or file_.node.archiving:
-        es.delete(
-            index=index,
-            doc_type='file',
-            id=file_._id,
-            refresh=True,
-            ignore=[404]
-        )
-        return
 
+def serialize_file(file_):
     # We build URLs manually here so that this function can be
     # run outside of a Flask request context (e.g. in a celery task)
     file_deep_url = '/{node_id}/files/{provider}{path}/'.format(
@@ -457,7 +556,7 @@ def update_file(file_, index=None, delete=False):
     )
     node_url = '/{node_id}/'.format(node_id=file_.node._id)
 
-    file_doc = {
+    return {
         'id': file_._id,
         'deep_url': file_deep_url,
         'tags': [tag._id for tag in file_.tags],
@@ -466,17 +565,132 @@ def update_file(file_, index=None, delete=False):
         'node_url': node_url,
         'node_title': file_.node.title,
         'parent_id': file_.node.parent_node._id if file_.node.parent_node else None,
+        'parent_info': serialize_parent(file_.node.parent_node),
         'is_registration': file_.node.is_registration,
     }
 
+
+@requires_search
+def update_file(file_, index=None, delete=False):
+
+    index = index or INDEX
+
+    if delete or not is_file_searchable(file_):
+        es.delete(
+            index=index,
+            doc_type='file',
+            id=file_._id,
+            refresh=True,
+            ignore=[404]
+        )
+        return
+
     es.index(
         index=index,
         doc_type='file',
-        body=file_doc,
+        body=serialize_file(file_),
         id=file_._id,
         refresh=True
     )
 
+
+def get_delete_action(doc_id, doc_type, index):
+    return {
+        '_op_type': 'delete',
+        '_index': index,
+        '_type': doc_type,
+        '_id': doc_id,
+    }
+
+
+def get_index_action(doc_id, doc_type, index, document):
+    return {
+        '_op_type': 'index',
+        '_index': index,
+        '_type': doc_type,
+        '_id': doc_id,
+        '_source': document,
+    }
+
+
+def get_file_action(file_, index, delete=False):
+    if delete or not is_file_searchable(file_):
+        return get_delete_action(file_._id, 'file', index)
+    return get_index_action(file_._id, 'file', index, serialize_file(file_))
+
+
+def get_node_actions(node, index, update_files=False):
+    """Yield the bulk actions needed to bring ``node`` (and, if requested, its
+    OsfStorage files) up to date in ``index``.
+    """
+    category = get_doctype_from_node(node)
+    try:
+        parent_id = get_node_parent_id(node, category)
+    except IndexError:
+        # Skip orphaned components
+        return
+    if update_files:
+        from website.files.models.osfstorage import OsfStorageFile
+        for file_ in paginated(OsfStorageFile, Q('node', 'eq', node)):
+            yield get_file_action(file_, index)
+    if is_node_searchable(node):
+        yield get_index_action(node._id, category, index, serialize_node(node, category, parent_id))
+    else:
+        yield get_delete_action(node._id, category, index)
+
+
+def get_user_action(user, index):
+    if not user.is_active:
+        return get_delete_action(user._id, 'user', index)
+    return get_index_action(user._id, 'user', index, serialize_user(user))
+
+
+def bulk_index(actions, refresh=False):
+    """Send ``actions`` to Elasticsearch in chunks. Missing documents in delete
+    actions are not treated as failures.
+    """
+    success, errors = helpers.bulk(es, actions, raise_on_error=False, refresh=refresh)
+    errors = [
+        error for error in errors
+        if error.get('delete', {}).get('status') != 404
+    ]
+    if errors:
+        logger.error('{0} search documents failed to index: {1!r}'.format(len(errors), errors[:10]))
+    return success, errors
+
+
+@requires_search
+def bulk_update_files(files, index=None, refresh=False):
+    index = index or INDEX
+    return bulk_index((get_file_action(file_, index) for file_ in files), refresh=refresh)
+
+
+@requires_search
+def bulk_update(index=None, nodes=None, users=None, files=None, deleted_file_ids=None):
+    """Index a coalesced batch of objects with a single stream of bulk requests
+    and no per-document refresh.
+
+    :param list nodes: Pairs of ``(node, update_files)``
+    :param list users: `User` objects
+    :param list files: OsfStorage file objects
+    :param list deleted_file_ids: Ids of file documents to remove
+    """
+    index = index or INDEX
+
+    def actions():
+        for node, update_files in (nodes or []):
+            for action in get_node_actions(node, index, update_files=update_files):
+                yield action
+        for user in (users or []):
+            yield get_user_action(user, index)
+        for file_ in (files or []):
+            yield get_file_action(file_, index)
+        for file_id in (deleted_file_ids or []):
+            yield get_delete_action(file_id, 'file', index)
+
+    return bulk_index(actions())
+
+
 @requires_search
 def delete_all():
     delete_index(INDEX)
@@ -497,11 +711,14 @@ def create_index(index=None):
     project_like_types = ['project', 'component', 'registration']
     analyzed_fields = ['title', 'description']
 
-    es.indices.create(index, ignore=[400])  # HTTP 400 if index already exists
+    es.indices.create(index, body={'settings': INDEX_SETTINGS}, ignore=[400])  # HTTP 400 if index already exists
     for type_ in document_types:
         mapping = {
             'properties': {
                 'tags': NOT_ANALYZED_PROPERTY,
+                # Only stored for display; searching a parent's title should
+                # not match its components
+                'parent_info': {'type': 'object', 'enabled': False},
                 'license': {
                     'properties': {
                         'id': NOT_ANALYZED_PROPERTY,
@@ -533,6 +750,7 @@ def create_index(index=None):
                     'type': 'string',
                     'boost': '0.01'
                 },
+                'normalized_user': AUTOCOMPLETE_PROPERTY,
             }
             mapping['properties'].update(fields)
         es.indices.put_mapping(index=index, doc_type=type_, body=mapping, ignore=[400, 404])
@@ -572,29 +790,49 @@ def search_contributor(query, page=0, size=10, exclude=None, current_user=None):
         normalized_items.append(normalized_item)
     items = normalized_items
 
-    query = "  AND ".join('{}*~'.format(re.escape(item)) for item in items) + \
-            "".join(' NOT id:"{}"'.format(excluded._id) for excluded in exclude)
+    query = {
+        'query': {
+            'bool': {
+                'must': {
+                    'match': {
+                        'normalized_user.autocomplete': {
+                            'query': ' '.join(items),
+                            'operator': 'and',
+                        },
+                    },
+                },
+                'must_not': {
+                    'ids': {'values': [excluded._id for excluded in exclude]},
+                },
+            },
+        },
+        'from': start,
+        'size': size,
+    }
 
-    results = search(build_query(query, start=start, size=size), index=INDEX, doc_type='user')
+    results = search(query, index=INDEX, doc_type='user')
     docs = results['results']
     pages = math.ceil(results['counts'].get('user', 0) / size)
     validate_page_num(page, pages)
 
+    # Projects of the current user, intersected with the projects of each hit
+    current_projects = set(current_user.node__contributed._to_primary_keys()) if current_user else set()
+    loaded = User.load_many(doc['id'] for doc in docs)
+
     users = []
-    for doc in docs:
+    for doc, user in zip(docs, loaded):
         # TODO: use utils.serialize_user
-        user = User.load(doc['id'])
+        if user is None:
+            logger.error('Could not load user {0}'.format(doc['id']))
+            continue
 
         if current_user and current_user._id == user._id:
             n_projects_in_common = -1
         elif current_user:
-            n_projects_in_common = current_user.n_projects_in_common(user)
+            n_projects_in_common = len(current_projects.intersection(user.node__contributed._to_primary_keys()))
         else:
             n_projects_in_common = 0
 
-        if user is None:
-            logger.error('Could not load user {0}'.format(doc['id']))
-            continue
         if user.is_active:  # exclude merged, unregistered, etc.
             current_employment = None
             education = None
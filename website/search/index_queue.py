@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""Queue of pending search index updates. Updates are recorded in a MongoDB
+collection keyed by document kind and id, so repeated updates to the same
+node, user or file within the flush window collapse into a single entry. The
+queue is drained by `flush_index_queue`, which indexes each batch through the
+Elasticsearch bulk API.
+
+Entries are written inside the request transaction, so a flush never sees an
+update whose data has not been committed.
+"""
+
+import logging
+import datetime
+import collections
+
+from flask import has_request_context
+from modularodm import Q
+from pymongo.errors import DuplicateKeyError
+
+from framework.mongo import database
+from framework.tasks import app as celery_app
+from framework.tasks.handlers import enqueue_task
+
+from website import settings
+
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = 'searchindexqueue'
+
+NODE = 'node'
+USER = 'user'
+FILE = 'file'
+
+
+def get_entry_id(kind, guid, index):
+    return '{0}:{1}:{2}'.format(index, kind, guid)
+
+
+def enqueue(kind, guid, index=None, update_files=False, delete=False):
+    """Record that the ``kind`` document ``guid`` needs to be re-indexed. The
+    first update to a document schedules a flush after
+    ``settings.SEARCH_INDEX_WINDOW`` seconds; later updates in that window only
+    touch the existing entry.
+
+    :param bool update_files: For nodes, also re-index the node's files
+    :param bool delete: For files, remove the document instead
+    """
+    index = index or settings.ELASTIC_INDEX
+    now = datetime.datetime.utcnow()
+    update = {
+        '$set': {
+            'kind': kind,
+            'guid': guid,
+            'index': index,
+            'delete': delete,
+            'date_queued': now,
+        },
+    }
+    # Never clear a pending request to re-index files
+    if update_files:
+        update['$set']['update_files'] = True
+    result = database[COLLECTION].update(
+        {'_id': get_entry_id(kind, guid, index)},
+        update,
+        upsert=True,
+    )
+    if not result or not result.get('updatedExisting'):
+        schedule_flush(index)
+
+
+def enqueue_many(kind, guids, index=None):
+    """Like `enqueue`, for many ``kind`` documents at once. Entries already
+    queued are touched with a single update and the others are inserted in one
+    batch, which schedules a single flush.
+    """
+    index = index or settings.ELASTIC_INDEX
+    now = datetime.datetime.utcnow()
+    collection = database[COLLECTION]
+    entry_ids = dict((get_entry_id(kind, guid, index), guid) for guid in guids)
+    if not entry_ids:
+        return
+    queued = set(
+        entry['_id']
+        for entry in collection.find({'_id': {'$in': entry_ids.keys()}}, {'_id': 1})
+    )
+    if queued:
+        collection.update(
+            {'_id': {'$in': list(queued)}},
+            {'$set': {'delete': False, 'date_queued': now}},
+            multi=True,
+        )
+    entries = [
+        {
+            '_id': entry_id,
+            'kind': kind,
+            'guid': guid,
+            'index': index,
+            'delete': False,
+            'date_queued': now,
+        }
+        for entry_id, guid in entry_ids.items()
+        if entry_id not in queued
+    ]
+    if entries:
+        try:
+            collection.insert(entries, continue_on_error=True)
+        except DuplicateKeyError:
+            pass  # Queued by another request since the lookup
+        schedule_flush(index)
+
+
+def schedule_flush(index):
+    signature = flush_index_queue.si(index=index).set(countdown=settings.SEARCH_INDEX_WINDOW)
+    if has_request_context():
+        enqueue_task(signature)
+    else:
+        signature.apply_async()
+
+
+def load_entries(entries):
+    """Group queue entries by kind and load the objects they refer to with one
+    query per kind.
+    """
+    from website.models import Node, User
+    from website.files.models.osfstorage import OsfStorageFile
+
+    by_kind = collections.defaultdict(dict)
+    for entry in entries:
+        by_kind[entry['kind']][entry['guid']] = entry
+
+    nodes = by_kind[NODE]
+    users = by_kind[USER]
+    files = by_kind[FILE]
+    deleted_file_ids = [guid for guid, entry in files.items() if entry['delete']]
+    live_file_ids = [guid for guid, entry in files.items() if not entry['delete']]
+
+    return {
+        'nodes': [
+            (node, nodes[node._id].get('update_files', False))
+            for node in Node.find(Q('_id', 'in', nodes.keys()))
+        ] if nodes else [],
+        'users': list(User.find(Q('_id', 'in', users.keys()))) if users else [],
+        'files': list(OsfStorageFile.find(Q('_id', 'in', live_file_ids))) if live_file_ids else [],
+        'deleted_file_ids': deleted_file_ids,
+    }
+
+
+def flush(index=None, batch_size=None):
+    """Index every entry queued for ``index`` before the flush started. An
+    entry updated while its batch is being indexed stays queued for the next
+    flush.
+
+    :return: Number of queue entries processed
+    """
+    from website.search import search
+
+    index = index or settings.ELASTIC_INDEX
+    batch_size = batch_size or settings.SEARCH_INDEX_BATCH_SIZE
+    collection = database[COLLECTION]
+    started = datetime.datetime.utcnow()
+    processed = 0
+
+    while True:
+        entries = list(
+            collection.find({
+                'index': index,
+                'date_queued': {'$lte': started},
+            }).sort('date_queued', 1).limit(batch_size)
+        )
+        if not entries:
+            break
+        search.bulk_update(index=index, **load_entries(entries))
+        collection.remove({
+            '$or': [
+                {'_id': entry['_id'], 'date_queued': entry['date_queued']}
+                for entry in entries
+            ]
+        })
+        processed += len(entries)
+        if len(entries) < batch_size:
+            break
+
+    # Entries re-queued while this flush ran did not schedule their own flush
+    if collection.find_one({'index': index, 'date_queued': {'$gt': started}}):
+        schedule_flush(index)
+
+    logger.info('Flushed {0} search index updates to {1}'.format(processed, index))
+    return processed
+
+
+@celery_app.task(bind=True, name='search.flush_index_queue', max_retries=5, default_retry_delay=60)
+def flush_index_queue(self, index=None):
+    try:
+        return flush(index=index)
+    except Exception as exc:
+        self.retry(exc=exc)
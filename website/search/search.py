@@ -1,9 +1,9 @@
 import logging
 
-from framework.tasks.handlers import enqueue_task
+from modularodm import Q
 
 from website import settings
-from website.search import share_search
+from website.search import share_search, index_queue
 
 logger = logging.getLogger(__name__)
 
@@ -26,20 +26,27 @@ def search(query, index=None, doc_type=None):
     return search_engine.search(query, index=index, doc_type=doc_type)
 
 @requires_search
-def update_node(node, index=None, bulk=False, async=True):
+def update_node(node, index=None, bulk=False, async=True, update_files=True):
+    """Update the search document for ``node``. With ``async``, the update is
+    queued and coalesced with other updates to the same node when Celery is
+    enabled.
+
+    :param bool update_files: Also re-index the node's files; pass False when
+        no field the file documents depend on has changed
+    """
     if async:
         node_id = node._id
         # We need the transaction to be committed before trying to run celery tasks.
         # For example, when updating a Node's privacy, is_public must be True in the
         # database in order for method that updates the Node's elastic search document
-        # to run correctly.
+        # to run correctly. Queue entries are written in the same transaction.
         if settings.USE_CELERY:
-            enqueue_task(search_engine.update_node_async.s(node_id=node_id, index=index, bulk=bulk))
+            index_queue.enqueue(index_queue.NODE, node_id, index=index, update_files=update_files)
         else:
-            search_engine.update_node_async(node_id=node_id, index=index, bulk=bulk)
+            search_engine.update_node_async(node_id=node_id, index=index, bulk=bulk, update_files=update_files)
     else:
         index = index or settings.ELASTIC_INDEX
-        return search_engine.update_node(node, index=index, bulk=bulk)
+        return search_engine.update_node(node, index=index, bulk=bulk, update_files=update_files)
 
 @requires_search
 def bulk_update_nodes(serialize, nodes, index=None):
@@ -59,15 +66,42 @@ def update_contributors(nodes):
 
 
 @requires_search
-def update_user(user, index=None):
+def update_user(user, index=None, async=True):
+    if async and settings.USE_CELERY:
+        index_queue.enqueue(index_queue.USER, user._id, index=index)
+        return
     index = index or settings.ELASTIC_INDEX
     search_engine.update_user(user, index=index)
 
 @requires_search
-def update_file(file_, index=None, delete=False):
+def update_file(file_, index=None, delete=False, async=True):
+    if async and settings.USE_CELERY:
+        index_queue.enqueue(index_queue.FILE, file_._id, index=index, delete=delete)
+        return
     index = index or settings.ELASTIC_INDEX
     search_engine.update_file(file_, index=index, delete=delete)
 
+@requires_search
+def update_files(file_ids, index=None, async=True):
+    """Re-index the OsfStorage files ``file_ids`` together, with one coalesced
+    queue update when Celery is enabled and one bulk request otherwise.
+    """
+    if not file_ids:
+        return
+    if async and settings.USE_CELERY:
+        index_queue.enqueue_many(index_queue.FILE, file_ids, index=index)
+        return
+    from website.files.models.osfstorage import OsfStorageFile
+    index = index or settings.ELASTIC_INDEX
+    files = list(OsfStorageFile.find(Q('_id', 'in', list(file_ids))))
+    search_engine.bulk_update(index=index, files=files)
+
+@requires_search
+def bulk_update(index=None, nodes=None, users=None, files=None, deleted_file_ids=None):
+    index = index or settings.ELASTIC_INDEX
+    return search_engine.bulk_update(index=index, nodes=nodes, users=users, files=files,
+                                     deleted_file_ids=deleted_file_ids)
+
 @requires_search
 def delete_all():
     search_engine.delete_all()
@@ -4,48 +4,218 @@
 from __future__ import absolute_import
 
 import logging
+import datetime
+import multiprocessing
 
-from elasticsearch import helpers
+from elasticsearch import Elasticsearch, helpers
 from modularodm.query.querydialect import DefaultQueryDialect as Q
 
 from website import settings
 from framework.auth import User
+from framework.mongo import database, StoredObject
 from website.models import Node
 from website.app import init_app
 import website.search.search as search
 from scripts import utils as script_utils
+from website.search import elastic_search
 from website.search.elastic_search import es
 
 
 logger = logging.getLogger(__name__)
 
-def migrate_nodes(index):
-    logger.info("Migrating nodes to index: {}".format(index))
-    n_iter = 0
-    nodes = Node.find(Q('is_public', 'eq', True) & Q('is_deleted', 'eq', False))
-    for node in nodes:
-        logger.info('Updating node {}'.format(node._id))
-        search.update_node(node, index=index, async=False)
-        n_iter += 1
+# Progress of in-flight migrations, one document per alias
+CHECKPOINT_COLLECTION = 'searchmigration'
 
-    logger.info('Nodes migrated: {}'.format(n_iter))
+NODES = 'nodes'
+USERS = 'users'
 
+NODE_QUERY = {'is_public': True, 'is_deleted': False}
 
-def migrate_users(index):
-    logger.info("Migrating users to index: {}".format(index))
-    n_migr = 0
-    n_iter = 0
-    for user in User.find():
-        if user.is_active:
-            search.update_user(user, index=index)
-            n_migr += 1
-        n_iter += 1
 
-    logger.info('Users iterated: {0}\nUsers migrated: {1}'.format(n_iter, n_migr))
+class MigrationError(Exception):
+    pass
 
 
-def migrate(delete, index=None, app=None):
+def get_shard_boundaries(collection, query, batch_size):
+    """Split the ids matching ``query`` into ranges of ``batch_size`` ids. The
+    first range is open below and the last open above, so objects created
+    after planning are still covered when a migration resumes.
+    """
+    ids = [
+        doc['_id'] for doc in
+        database[collection].find(query, fields=['_id']).sort('_id', 1)
+    ]
+    boundaries = ids[::batch_size] or ['']
+    boundaries[0] = ''
+    return boundaries
+
+
+def get_shards(checkpoint):
+    """Return ``(kind, number, lower, upper)`` for every shard of the
+    migration that has not been completed yet.
+    """
+    shards = []
+    for kind in (NODES, USERS):
+        boundaries = checkpoint['boundaries'][kind]
+        for number, lower in enumerate(boundaries):
+            upper = boundaries[number + 1] if number + 1 < len(boundaries) else None
+            if get_shard_key(kind, number) not in checkpoint['completed']:
+                shards.append((kind, number, lower, upper))
+    return shards
+
+
+def get_shard_key(kind, number):
+    return '{0}_{1}'.format(kind, number)
+
+
+def start_checkpoint(alias, new_index, fresh, batch_size):
+    checkpoint = {
+        '_id': alias,
+        'new_index': new_index,
+        'fresh': fresh,
+        'boundaries': {
+            NODES: get_shard_boundaries(Node._name, NODE_QUERY, batch_size),
+            USERS: get_shard_boundaries(User._name, {}, batch_size),
+        },
+        'completed': {},
+        'date_started': datetime.datetime.utcnow(),
+    }
+    database[CHECKPOINT_COLLECTION].save(checkpoint)
+    return checkpoint
+
+
+def complete_shard(alias, kind, number, indexed):
+    database[CHECKPOINT_COLLECTION].update(
+        {'_id': alias},
+        {'$set': {'completed.{0}'.format(get_shard_key(kind, number)): indexed}},
+    )
+
+
+def get_checkpoint(alias):
+    return database[CHECKPOINT_COLLECTION].find_one({'_id': alias})
+
+
+def clear_checkpoint(alias):
+    database[CHECKPOINT_COLLECTION].remove({'_id': alias})
+
+
+def get_shard_query(lower, upper):
+    query = Q('_id', 'gte', lower)
+    if upper is not None:
+        query &= Q('_id', 'lt', upper)
+    return query
+
+
+def iter_shard_actions(kind, lower, upper, index):
+    if kind == NODES:
+        query = Q('is_public', 'eq', True) & Q('is_deleted', 'eq', False)
+        for node in Node.find(query & get_shard_query(lower, upper)):
+            for action in elastic_search.get_node_actions(node, index, update_files=True):
+                yield action
+    else:
+        for user in User.find(get_shard_query(lower, upper)):
+            if user.is_active:
+                yield elastic_search.get_user_action(user, index)
+
+
+def index_shard(kind, lower, upper, index):
+    """Index one shard into ``index``, which is new, so only index actions
+    are sent.
+
+    :return: Number of documents indexed
+    """
+    bulk = getattr(helpers, 'parallel_bulk', helpers.streaming_bulk)
+    actions = (
+        action for action in iter_shard_actions(kind, lower, upper, index)
+        if action['_op_type'] == 'index'
+    )
+    indexed = 0
+    failed = 0
+    for ok, item in bulk(elastic_search.es, actions, raise_on_error=False):
+        if ok:
+            indexed += 1
+        else:
+            failed += 1
+            logger.error('Failed to index {0!r}'.format(item))
+    StoredObject._clear_caches()
+    if failed:
+        raise MigrationError('{0} documents in {1} shard starting at {2!r} failed to index'.format(
+            failed, kind, lower
+        ))
+    return indexed
+
+
+def init_worker():
+    """Give each pool process its own Elasticsearch connections; the MongoDB
+    client is replaced after fork by the client manager.
+    """
+    elastic_search.es = Elasticsearch(
+        settings.ELASTIC_URI,
+        request_timeout=settings.ELASTIC_TIMEOUT
+    )
+    StoredObject._clear_caches()
+
+
+def index_shard_worker(args):
+    kind, number, lower, upper, index = args
+    return kind, number, index_shard(kind, lower, upper, index)
+
+
+def migrate_shards(alias, checkpoint, processes=1):
+    """Index every pending shard of the migration, recording each one in the
+    checkpoint as it finishes.
+    """
+    index = checkpoint['new_index']
+    shards = [shard + (index, ) for shard in get_shards(checkpoint)]
+    logger.info('Migrating {0} shards to index: {1}'.format(len(shards), index))
+
+    if processes > 1:
+        pool = multiprocessing.Pool(processes=processes, initializer=init_worker)
+        try:
+            results = pool.imap_unordered(index_shard_worker, shards)
+            for kind, number, indexed in results:
+                complete_shard(alias, kind, number, indexed)
+                logger.info('{0} shard {1} migrated: {2} documents'.format(kind, number, indexed))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for shard in shards:
+            kind, number, indexed = index_shard_worker(shard)
+            complete_shard(alias, kind, number, indexed)
+            logger.info('{0} shard {1} migrated: {2} documents'.format(kind, number, indexed))
+
+
+def set_refresh_interval(index, interval):
+    es.indices.put_settings(index=index, body={'index': {'refresh_interval': interval}})
+
+
+def verify_index(checkpoint):
+    """Check that the new index holds every document the migration indexed. A
+    first migration copies the old index, so it may hold more.
+    """
+    index = checkpoint['new_index']
+    expected = sum(checkpoint['completed'].values())
+    actual = es.count(index=index)['count']
+    logger.info('Index {0} holds {1} documents; {2} were migrated'.format(index, actual, expected))
+    if actual < expected or (checkpoint['fresh'] and actual != expected):
+        raise MigrationError('Index {0} holds {1} documents but {2} were migrated'.format(
+            index, actual, expected
+        ))
+
+
+def migrate(delete, index=None, app=None, processes=1, batch_size=None, resume=True):
+    """Rebuild ``index`` into a new versioned index and point the alias at it.
+
+    Progress is checkpointed per shard, so an interrupted migration picks up
+    where it stopped when run again with ``resume``. The alias is only moved
+    once the new index passes `verify_index`.
+
+    :param int processes: Number of worker processes indexing shards
+    :param int batch_size: Number of objects per shard
+    """
     index = index or settings.ELASTIC_INDEX
+    batch_size = batch_size or settings.SEARCH_MIGRATION_BATCH_SIZE
     app = app or init_app("website.settings", set_backends=True, routes=True)
 
     script_utils.add_file_logger(logger, __file__)
@@ -55,12 +225,27 @@ def migrate(delete, index=None, app=None):
     ctx = app.test_request_context()
     ctx.push()
 
-    new_index = set_up_index(index)
+    checkpoint = get_checkpoint(index) if resume else None
+    if checkpoint:
+        logger.info('Resuming migration to {0}'.format(checkpoint['new_index']))
+    else:
+        clear_checkpoint(index)
+        new_index = set_up_index(index)
+        # The first version is seeded with a copy of the unversioned index
+        fresh = new_index != '{}_v1'.format(index)
+        checkpoint = start_checkpoint(index, new_index, fresh, batch_size)
+    new_index = checkpoint['new_index']
 
-    migrate_nodes(new_index)
-    migrate_users(new_index)
+    set_refresh_interval(new_index, '-1')
+    try:
+        migrate_shards(index, checkpoint, processes=processes)
+    finally:
+        set_refresh_interval(new_index, '1s')
+    es.indices.refresh(index=new_index)
 
+    verify_index(get_checkpoint(index))
     set_up_alias(index, new_index)
+    clear_checkpoint(index)
 
     if delete:
         delete_old(new_index)
@@ -67,6 +67,12 @@ SEARCH_ENGINE = 'elastic'  # Can be 'elastic', or None
 ELASTIC_URI = 'localhost:9200'
 ELASTIC_TIMEOUT = 10
 ELASTIC_INDEX = 'website'
+# Seconds to collect updates to the same node, user or file before indexing them
+SEARCH_INDEX_WINDOW = 5
+# Number of queued search updates indexed per bulk batch
+SEARCH_INDEX_BATCH_SIZE = 500
+# Number of nodes or users in each shard of a full reindex
+SEARCH_MIGRATION_BATCH_SIZE = 1000
 SHARE_ELASTIC_URI = ELASTIC_URI
 SHARE_ELASTIC_INDEX = 'share'
 # For old indices
@@ -91,6 +97,12 @@ SUPPORT_EMAIL = 'support@osf.io'
 MAIL_SERVER = 'smtp.sendgrid.net'
 MAIL_USERNAME = 'osf-smtp'
 MAIL_PASSWORD = ''  # Set this in local.py
+# Batched deliveries, e.g. notification digests, share up to MAIL_POOL_SIZE
+# connections, each reused for MAIL_BATCH_SIZE messages
+MAIL_POOL_SIZE = 2
+MAIL_BATCH_SIZE = 100
+MAIL_RETRIES = 2
+MAIL_RETRY_BACKOFF = 1
 
 # Mandrill
 MANDRILL_USERNAME = None
@@ -137,6 +149,21 @@ DB_NAME = 'osf20130903'
 DB_USER = None
 DB_PASS = None
 
+# MongoDB connection pool; one pooled client is shared by every request in a process
+DB_MAX_POOL_SIZE = 100
+
+# Serve GET, HEAD and OPTIONS requests without a TokuMX transaction. Writes made
+# during such requests are logged by framework.transactions.read_only
+READ_ONLY_SAFE_METHODS = False
+
+# Number of pending notifications read per aggregation when sending digests
+NOTIFICATION_DIGEST_BATCH_SIZE = 500
+
+# Set once scripts/migration/populate_osfstorage_materialized_paths.py has run.
+# Until then, OsfStorage checks each project for file nodes saved before their
+# ancestors were stored and falls back to walking the tree when it finds one
+OSFSTORAGE_ANCESTORS_POPULATED = False
+
 # Cache settings
 SESSION_HISTORY_LENGTH = 5
 SESSION_HISTORY_IGNORE_RULES = [
@@ -145,6 +172,25 @@ SESSION_HISTORY_IGNORE_RULES = [
     lambda url: url.startswith('/api/'),
 ]
 
+# Storage of sessions; one of 'mongo' or 'memory'
+SESSION_BACKEND = 'mongo'
+# Sessions are removed by MongoDB once they have not been saved for this many
+# seconds. Activity on an authenticated session changes it at most once every
+# SESSION_TOUCH_INTERVAL seconds, which also updates the user's date_last_login
+SESSION_TTL = 60 * 60 * 24 * 30
+SESSION_TOUCH_INTERVAL = 60 * 5
+
+# Size of the Bloom filters recording the pages a session has visited for
+# unique page counts. A filter is cleared once it holds ``CAPACITY`` pages,
+# which keeps the false positive rate around 2%
+SESSION_VISITED_FILTER_BITS = 8192
+SESSION_VISITED_FILTER_HASHES = 4
+SESSION_VISITED_FILTER_CAPACITY = 1000
+
+# Users watching more nodes than this get their watched logs by merging each
+# node's log ids rather than with a single query on the watched nodes
+WATCHED_LOGS_MAX_QUERY_NODES = 1000
+
 # TODO: Configuration should not change between deploys - this should be dynamic.
 CANONICAL_DOMAIN = 'openscienceframework.org'
 COOKIE_DOMAIN = '.openscienceframework.org'  # Beaker
@@ -208,6 +254,12 @@ SYSTEM_ADDED_ADDONS = {
     'node': [],
 }
 
+# Page view and user activity counters are written behind: increments are
+# aggregated in memory and flushed once this many are pending, or once the
+# oldest is this many seconds old. A size of 0 writes every increment through
+ANALYTICS_COUNTER_BUFFER_SIZE = 500
+ANALYTICS_COUNTER_FLUSH_INTERVAL = 10
+
 # Piwik
 
 # TODO: Override in local.py in production
@@ -274,6 +326,18 @@ ARCHIVE_TIMEOUT_TIMEDELTA = timedelta(1)  # 24 hours
 
 ENABLE_ARCHIVER = True
 
+# Folder listings made concurrently while crawling an addon's file tree
+ARCHIVE_CRAWL_WORKERS = 4
+# Folder listing requests per second, per provider, in each worker process
+ARCHIVE_CRAWL_DEFAULT_RATE_LIMIT = 5
+ARCHIVE_CRAWL_RATE_LIMITS = {}
+# Retries of a failed folder listing, with exponential backoff from ARCHIVE_CRAWL_BACKOFF seconds
+ARCHIVE_CRAWL_RETRIES = 3
+ARCHIVE_CRAWL_BACKOFF = 0.5
+# File maps built by the archiver, cached per process and invalidated when a node's files change
+ARCHIVE_FILE_MAP_CACHE_SIZE = 100
+ARCHIVE_FILE_MAP_CACHE_TTL = 60 * 60
+
 JWT_SECRET = 'changeme'
 JWT_ALGORITHM = 'HS256'
 
@@ -295,6 +359,8 @@ CELERY_IMPORTS = (
     'website.notifications.tasks',
     'website.archiver.tasks',
     'website.search.search',
+    'website.search.index_queue',
+    'website.addons.wiki.tasks',
 )
 
 # celery.schedule will not be installed when running invoke requirements the first time.
@@ -315,6 +381,10 @@ else:
             'schedule': crontab(minute=0, hour=0),
             'args': ('email_digest',),
         },
+        'search-index-queue': {
+            'task': 'search.flush_index_queue',
+            'schedule': crontab(minute='*'),
+        },
     }
 
 WATERBUTLER_JWE_SALT = 'yusaltydough'
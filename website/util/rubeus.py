@@ -172,6 +172,7 @@ class NodeProjectCollector(object):
 
     def _collect_components(self, node, visited):
         rv = []
+        node.resolve().prefetch('nodes')
         for child in reversed(node.nodes):  # (child.resolve()._id not in visited or node.is_folder) and
             if child is not None and not child.is_deleted and child.resolve().can_view(auth=self.auth) and node.can_view(self.auth):
                 # visited.append(child.resolve()._id)
@@ -282,6 +283,7 @@ class NodeProjectCollector(object):
         modified_delta = delta_date(node.date_modified)
         date_modified = node.date_modified.isoformat()
         contributors = []
+        node.resolve().prefetch('contributors', 'nodes')
         for contributor in node.contributors:
             if contributor._id in node.visible_contributor_ids:
                 contributor_name = [
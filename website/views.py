@@ -30,6 +30,7 @@ from website.project import model
 from website.util import web_url_for
 from website.util import permissions
 from website.project import new_dashboard
+from website.project import summaries as node_summaries
 from website.settings import ALL_MY_PROJECTS_ID
 from website.settings import ALL_MY_REGISTRATIONS_ID
 
@@ -188,31 +189,13 @@ def get_dashboard_nodes(auth):
         parameter forces ALL components to be excluded from the request.
     :param-query permissions: Filter upon projects for which the current user
         has the specified permissions. Examples: 'write', 'admin'
+    :param-query page: Page of nodes to return, starting at 0
+    :param-query size: Number of nodes per page. All nodes are returned if
+        omitted
     """
     user = auth.user
 
-    contributed = user.node__contributed  # nodes user contributed to
-
-    nodes = contributed.find(
-        Q('category', 'eq', 'project') &
-        Q('is_deleted', 'eq', False) &
-        Q('is_registration', 'eq', False) &
-        Q('is_folder', 'eq', False)
-    )
-
-    if request.args.get('no_components') not in [True, 'true', 'True', '1', 1]:
-        comps = contributed.find(
-            # components only
-            Q('category', 'ne', 'project') &
-            # exclude deleted nodes
-            Q('is_deleted', 'eq', False) &
-            # exclude registrations
-            Q('is_registration', 'eq', False)
-        )
-    else:
-        comps = []
-
-    nodes = list(nodes) + list(comps)
+    perm = None
     if request.args.get('permissions'):
         perm = request.args['permissions'].strip().lower()
         if perm not in permissions.PERMISSIONS:
@@ -220,10 +203,26 @@ def get_dashboard_nodes(auth):
                 message_short='Invalid query parameter',
                 message_long='{0} is not in {1}'.format(perm, permissions.PERMISSIONS)
             ))
-        response_nodes = [node for node in nodes if node.has_permission(user, permission=perm)]
-    else:
-        response_nodes = nodes
-    return _render_nodes(response_nodes, auth)
+    page, size = get_page_args()
+
+    summaries, total, max_logs = node_summaries.get_dashboard_summaries(
+        user,
+        components=request.args.get('no_components') not in [True, 'true', 'True', '1', 1],
+        permission=perm,
+        page=page,
+        size=size,
+    )
+    pages = math.ceil(total / float(size)) if size else 1
+    if size:
+        validate_page_num(page, pages)
+    return {
+        'nodes': [node_summaries.render_summary(summary, user) for summary in summaries],
+        'rescale_ratio': float(max_logs),
+        'show_path': False,
+        'total': total,
+        'pages': pages,
+        'page': page,
+    }
 
 
 @must_be_logged_in
@@ -242,6 +241,22 @@ def validate_page_num(page, pages):
         ))
 
 
+def get_page_args():
+    """Return the optional ``page`` and ``size`` query parameters."""
+    try:
+        page = int(request.args.get('page', 0))
+        size = int(request.args['size']) if 'size' in request.args else None
+    except ValueError:
+        raise HTTPError(http.BAD_REQUEST, data=dict(
+            message_long='Invalid value for "page" or "size".'
+        ))
+    if page < 0 or (size is not None and size < 1):
+        raise HTTPError(http.BAD_REQUEST, data=dict(
+            message_long='Invalid value for "page" or "size".'
+        ))
+    return page, size
+
+
 def paginate(items, total, page, size):
     pages = math.ceil(total / float(size))
     validate_page_num(page, pages)
@@ -268,15 +283,24 @@ def watched_logs_get(**kwargs):
             message_long='Invalid value for "size".'
         ))
 
-    total = sum(1 for x in user.get_recent_log_ids())
-    paginated_logs, pages = paginate(user.get_recent_log_ids(), total, page, size)
-    logs = (model.NodeLog.load(id) for id in paginated_logs)
+    # Logs older than the log with this id, for paginating with a cursor
+    before = request.args.get('before')
+
+    total = user.count_recent_logs()
+    pages = math.ceil(total / float(size))
+    if before:
+        log_ids = list(user.get_recent_log_ids(before=before, limit=size))
+    else:
+        validate_page_num(page, pages)
+        log_ids = list(user.get_recent_log_ids(offset=page * size, limit=size))
+    logs = [log for log in model.NodeLog.load_many(log_ids) if log is not None]
 
     return {
         "logs": [serialize_log(log) for log in logs],
         "total": total,
         "pages": pages,
-        "page": page
+        "page": page,
+        "next": log_ids[-1] if len(log_ids) == size else None,
     }
 
 